@@ -0,0 +1,212 @@
+"""Stage-level timing of the cme_core pipeline on synthetic corpora built from sample_data.
+
+Usage:
+    python benchmarks/stage_benchmarks.py                      # compare against benchmarks/baseline.json
+    python benchmarks/stage_benchmarks.py --update-baseline    # record a new baseline on this machine
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import platform
+import random
+import re
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from cme_core import extract, ingest, outputs, rank  # noqa: E402
+from cme_core.scoring import score_text  # noqa: E402
+from cme_core.testing import build_text_pdf, wrap_line  # noqa: E402
+from cme_core.topics import propose_topic_seeds  # noqa: E402
+
+SAMPLE_DIR = ROOT / "sample_data"
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+DEFAULT_SCALES = (1, 100, 1000)
+DEFAULT_THRESHOLD = 0.25
+# Differences below this many seconds are timer noise, whatever the ratio.
+NOISE_FLOOR_SECONDS = 0.002
+PARAGRAPHS_PER_SECTION = 8
+LINES_PER_PAGE = 48
+STAGES = (
+    "ingest_pdf_bytes",
+    "document_from_html",
+    "extract_chunks",
+    "propose_topic_seeds",
+    "score_text",
+    "rank_chunks",
+    "export_topics_json",
+    "export_topics_jsonl",
+    "export_topics_csv",
+    "export_topics_markdown",
+    "export_anki_tsv",
+)
+
+
+@dataclass(frozen=True)
+class Corpus:
+    scale: int
+    paragraphs: List[Tuple[str, str]]
+    html: str
+    pdf_bytes: bytes
+
+
+def build_corpus(scale: int, seed: int = 7) -> Corpus:
+    """Synthesize ``scale`` times the sample article's paragraph count from sample sentences.
+
+    Paragraphs are random draws of 3-5 sample sentences under the sample headings,
+    so larger scales keep realistic term density without exact repetition.
+    """
+    article = ingest.document_from_html((SAMPLE_DIR / "sample_article.html").read_text(encoding="utf-8"), url="bench")
+    chapter = (SAMPLE_DIR / "sample_chapter.txt").read_text(encoding="utf-8")
+    sample_text = " ".join([chapter, *(paragraph.text for paragraph in article.paragraphs)])
+    sentences = [sentence for sentence in re.split(r"(?<=[.!?])\s+", re.sub(r"\s+", " ", sample_text)) if len(sentence) > 35]
+    headings = sorted({paragraph.section_heading for paragraph in article.paragraphs if paragraph.section_heading})
+
+    rng = random.Random(seed)
+    paragraphs = []
+    for index in range(len(article.paragraphs) * scale):
+        heading = f"{headings[(index // PARAGRAPHS_PER_SECTION) % len(headings)]} {index // PARAGRAPHS_PER_SECTION + 1}"
+        paragraphs.append((heading, " ".join(rng.sample(sentences, rng.randint(3, 5)))))
+    return Corpus(scale, paragraphs, _corpus_html(scale, paragraphs), _corpus_pdf(scale, paragraphs))
+
+
+def stage_runners(corpus: Corpus) -> Dict[str, Callable[[], object]]:
+    """One zero-argument callable per stage, each fed with precomputed inputs."""
+    document = ingest.document_from_html(corpus.html, url=f"https://bench.test/{corpus.scale}")
+    chunks = extract.extract_chunks(document)
+    topics = rank.rank_chunks(chunks)
+    return {
+        "ingest_pdf_bytes": lambda: ingest.ingest_pdf_bytes(corpus.pdf_bytes, source_name="bench.pdf"),
+        "document_from_html": lambda: ingest.document_from_html(corpus.html, url="https://bench.test/html"),
+        "extract_chunks": lambda: extract.extract_chunks(document),
+        "propose_topic_seeds": lambda: propose_topic_seeds(chunks),
+        "score_text": lambda: [score_text(chunk.text, rank.AnalysisOptions()) for chunk in chunks],
+        "rank_chunks": lambda: rank.rank_chunks(chunks),
+        "export_topics_json": lambda: outputs.export_topics_json(document, topics),
+        "export_topics_jsonl": lambda: outputs.export_topics_jsonl(document, topics),
+        "export_topics_csv": lambda: outputs.export_topics_csv(topics),
+        "export_topics_markdown": lambda: outputs.export_topics_markdown(document, topics),
+        "export_anki_tsv": lambda: outputs.export_anki_tsv(topics),
+    }
+
+
+def time_stage(runner: Callable[[], object], repeat: int) -> float:
+    """Best-of-``repeat`` wall time in seconds, with garbage collection paused as in ``timeit``."""
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            runner()
+            best = min(best, time.perf_counter() - started)
+        finally:
+            gc.enable()
+    return best
+
+
+def run_suite(
+    scales: Sequence[int] = DEFAULT_SCALES,
+    stages: Sequence[str] = STAGES,
+    repeat: int = 5,
+    log: Callable[[str], None] = lambda message: None,
+) -> Dict[str, Dict[str, float]]:
+    # Warm imports and lazily built module state so the first timed stage is not penalized.
+    for runner in stage_runners(build_corpus(1)).values():
+        runner()
+    results: Dict[str, Dict[str, float]] = {}
+    for scale in scales:
+        corpus = build_corpus(scale)
+        runners = stage_runners(corpus)
+        results[str(scale)] = {}
+        for stage in stages:
+            seconds = time_stage(runners[stage], repeat)
+            results[str(scale)][stage] = seconds
+            log(f"{scale:>5}x  {stage:<24} {seconds * 1000:10.2f} ms")
+    return results
+
+
+def find_regressions(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> List[Tuple[str, str, float, float]]:
+    """Stages slower than ``baseline`` by more than ``threshold`` (and the noise floor)."""
+    regressions = []
+    for scale, stages in results.items():
+        for stage, seconds in stages.items():
+            reference = baseline.get(scale, {}).get(stage)
+            if reference is None:
+                continue
+            if seconds > reference * (1 + threshold) and seconds - reference > NOISE_FLOOR_SECONDS:
+                regressions.append((scale, stage, reference, seconds))
+    return regressions
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=list(DEFAULT_SCALES))
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed slowdown, 0.25 = 25%%")
+    parser.add_argument("--update-baseline", action="store_true", help="write these results as the new baseline")
+    parser.add_argument("--output", type=Path, help="also write these results to a JSON file")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.scales, args.stages, args.repeat, log=print)
+    payload = {
+        "meta": {"python": platform.python_version(), "machine": platform.machine(), "repeat": args.repeat},
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; rerun with --update-baseline to record one.")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["results"]
+    regressions = find_regressions(results, baseline, args.threshold)
+    for scale, stage, reference, seconds in regressions:
+        print(f"REGRESSION {scale}x {stage}: {reference * 1000:.2f} ms -> {seconds * 1000:.2f} ms")
+    print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%} of {args.baseline.name}")
+    return 1 if regressions else 0
+
+
+def _corpus_html(scale: int, paragraphs: Sequence[Tuple[str, str]]) -> str:
+    parts = [f"<html><head><title>Benchmark corpus {scale}x</title></head><body><h1>Benchmark corpus</h1>"]
+    current_heading = None
+    for heading, text in paragraphs:
+        if heading != current_heading:
+            parts.append(f"<h2>{heading}</h2>")
+            current_heading = heading
+        parts.append(f"<p>{text}</p>")
+    parts.append("</body></html>")
+    return "\n".join(parts)
+
+
+def _corpus_pdf(scale: int, paragraphs: Sequence[Tuple[str, str]]) -> bytes:
+    lines = [f"Benchmark Corpus {scale}x", ""]
+    current_heading = None
+    for heading, text in paragraphs:
+        if heading != current_heading:
+            lines.extend([heading.title(), ""])
+            current_heading = heading
+        lines.extend([*wrap_line(text), ""])
+    return build_text_pdf([lines[start : start + LINES_PER_PAGE] for start in range(0, len(lines), LINES_PER_PAGE)])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
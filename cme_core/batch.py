@@ -0,0 +1,328 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from contextlib import ExitStack
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Set, TextIO, Tuple, Union
+from urllib.parse import urlsplit
+
+from .chunking import extract_chunks
+from .dedup import dedupe_document
+from .ingest_pdf import ingest_pdf_path
+from .ingest_url import document_from_html, ingest_url
+from .models import AnalysisOptions, NormalizedDocument
+from .outputs import export_anki_tsv, export_topics_csv, export_topics_jsonl
+from .rank import rank_document
+
+INPUT_KINDS = {".pdf": "pdf", ".html": "html", ".htm": "html"}
+OUTPUT_FORMATS = ("jsonl", "csv", "anki")
+OUTPUT_SUFFIXES = {"csv": ".csv", "anki": ".anki.tsv"}
+JSONL_NAME = "topics.jsonl"
+
+
+@dataclass(frozen=True)
+class BatchInput:
+    """One document to analyze: a local PDF/HTML path or an http(s) URL."""
+
+    ref: str
+    kind: str
+
+    @property
+    def output_name(self) -> str:
+        path = urlsplit(self.ref).path if self.kind == "url" else self.ref
+        stem = re.sub(r"[^A-Za-z0-9._-]+", "-", Path(path).stem).strip("-.") or "document"
+        return f"{stem[:60]}-{hashlib.sha1(self.ref.encode('utf-8')).hexdigest()[:8]}"
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    item: BatchInput
+    outputs: Dict[str, str]
+    page_count: int = 0
+    topic_count: int = 0
+    duplicates_removed: int = 0
+    error: Optional[str] = None
+
+
+@dataclass
+class BatchReport:
+    processed: int = 0
+    skipped: int = 0
+    pages: int = 0
+    duplicates_removed: int = 0
+    elapsed: float = 0.0
+    failures: List[Tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def documents_per_second(self) -> float:
+        return self.processed / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"Processed {self.processed} documents ({self.pages} pages) in {self.elapsed:.2f}s: "
+            f"{self.documents_per_second:.2f} docs/s, {self.pages_per_second:.2f} pages/s; "
+            f"{self.skipped} skipped, {len(self.failures)} failed"
+            + (f"; {self.duplicates_removed} duplicate paragraphs removed." if self.duplicates_removed else ".")
+        )
+
+
+def collect_inputs(source: Union[str, Path]) -> List[BatchInput]:
+    """Inputs from a directory (searched recursively) or a manifest with one path or URL per line."""
+    source = Path(source)
+    if source.is_dir():
+        paths = sorted(path for path in source.rglob("*") if path.suffix.lower() in INPUT_KINDS and path.is_file())
+        return [BatchInput(str(path), INPUT_KINDS[path.suffix.lower()]) for path in paths]
+    inputs = []
+    for line in source.read_text(encoding="utf-8").splitlines():
+        entry = line.strip()
+        if not entry or entry.startswith("#"):
+            continue
+        if urlsplit(entry).scheme in ("http", "https"):
+            inputs.append(BatchInput(entry, "url"))
+            continue
+        path = Path(entry) if Path(entry).is_absolute() else source.parent / entry
+        kind = INPUT_KINDS.get(path.suffix.lower())
+        if kind is None:
+            raise ValueError(f"Unsupported manifest entry: {entry}")
+        inputs.append(BatchInput(str(path), kind))
+    return inputs
+
+
+def analyze_input(
+    item: BatchInput,
+    options: AnalysisOptions,
+    formats: Sequence[str],
+    include_paragraphs: bool = True,
+    dedupe: bool = False,
+) -> BatchResult:
+    """Ingest, chunk and rank one input, rendering each requested export format.
+
+    With ``dedupe`` repeated paragraphs are dropped before chunking and the
+    removal counts are kept in the document's ``metadata["dedup"]``.
+    """
+    duplicates_removed = 0
+    try:
+        document = _ingest(item)
+        if dedupe:
+            document, stats = dedupe_document(document)
+            duplicates_removed = stats.removed
+        topics = rank_document(document, extract_chunks(document), options=options)
+    except Exception as exc:
+        return BatchResult(item, {}, error=f"{type(exc).__name__}: {exc}")
+    outputs = {}
+    if "jsonl" in formats:
+        outputs["jsonl"] = export_topics_jsonl(
+            document, topics, extra={"input": item.ref}, include_paragraphs=include_paragraphs
+        )
+    if "csv" in formats:
+        outputs["csv"] = export_topics_csv(topics)
+    if "anki" in formats:
+        outputs["anki"] = export_anki_tsv(topics)
+    page_count = int(document.metadata.get("page_count", 1))
+    return BatchResult(
+        item, outputs, page_count=page_count, topic_count=len(topics), duplicates_removed=duplicates_removed
+    )
+
+
+def run_batch(
+    inputs: Sequence[BatchInput],
+    output_dir: Union[str, Path],
+    formats: Sequence[str] = ("jsonl",),
+    options: Optional[AnalysisOptions] = None,
+    workers: int = 1,
+    resume: bool = True,
+    progress: Optional[Callable[[BatchResult], None]] = None,
+    include_paragraphs: bool = True,
+    dedupe: bool = False,
+) -> BatchReport:
+    """Analyze ``inputs`` into ``output_dir``, skipping inputs whose outputs already exist when resuming.
+
+    CSV and Anki exports are written per document; JSON lines are appended to
+    ``topics.jsonl`` last, so a line there marks its input as complete. Pass
+    ``include_paragraphs=False`` to leave the paragraph payload out of those lines,
+    and ``dedupe=True`` to drop repeated headers, footers and banners first.
+    """
+    unknown = set(formats) - set(OUTPUT_FORMATS)
+    if unknown or not formats:
+        raise ValueError(f"formats must be drawn from {OUTPUT_FORMATS}")
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    options = options or AnalysisOptions()
+    jsonl_path = output_dir / JSONL_NAME
+    done_refs = _completed_jsonl_inputs(jsonl_path) if resume and "jsonl" in formats else set()
+    if not resume and jsonl_path.exists() and "jsonl" in formats:
+        jsonl_path.unlink()
+
+    report = BatchReport()
+    pending = []
+    for item in inputs:
+        if resume and _is_complete(item, output_dir, formats, done_refs):
+            report.skipped += 1
+        else:
+            pending.append(item)
+
+    started = time.perf_counter()
+    with ExitStack() as stack:
+        jsonl_file = stack.enter_context(open(jsonl_path, "a", encoding="utf-8")) if "jsonl" in formats else None
+        for result in _analyze_all(pending, options, tuple(formats), workers, include_paragraphs, dedupe):
+            if result.error is None:
+                _write_result(result, output_dir, jsonl_file)
+                report.processed += 1
+                report.pages += result.page_count
+                report.duplicates_removed += result.duplicates_removed
+            else:
+                report.failures.append((result.item.ref, result.error))
+            if progress is not None:
+                progress(result)
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="neurocme-batch",
+        description="Rank high-yield topics for every PDF/HTML file in a directory or manifest.",
+    )
+    parser.add_argument("source", help="directory of .pdf/.html files, or a manifest with one path or URL per line")
+    parser.add_argument("-o", "--output", required=True, help="directory for results")
+    parser.add_argument("-f", "--format", nargs="+", choices=OUTPUT_FORMATS, default=["jsonl"], dest="formats")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--no-resume", action="store_true", help="reprocess inputs that already have outputs")
+    parser.add_argument("--specialty", default="Neuro ICU", choices=["Neuro ICU", "General ICU", "ECMO"])
+    parser.add_argument("--depth", default="boards", choices=["boards", "fellowship", "attending"])
+    parser.add_argument("--max-topics", type=int, default=12)
+    parser.add_argument("--no-paragraphs", action="store_true", help="omit document paragraphs from JSON lines")
+    parser.add_argument("--dedupe", action="store_true", help="drop repeated headers, footers and banners first")
+    args = parser.parse_args(argv)
+
+    try:
+        inputs = collect_inputs(args.source)
+    except (OSError, ValueError) as exc:
+        parser.error(str(exc))
+    options = AnalysisOptions(specialty_focus=args.specialty, desired_depth=args.depth, max_topics=args.max_topics)
+    total = len(inputs)
+    counter = iter(range(1, total + 1))
+
+    def progress(result: BatchResult) -> None:
+        status = f"{result.topic_count} topics" if result.error is None else f"FAILED {result.error}"
+        print(f"[{next(counter)}/{total}] {result.item.ref}: {status}", file=sys.stderr)
+
+    report = run_batch(
+        inputs,
+        args.output,
+        formats=args.formats,
+        options=options,
+        workers=args.workers,
+        resume=not args.no_resume,
+        progress=progress,
+        include_paragraphs=not args.no_paragraphs,
+        dedupe=args.dedupe,
+    )
+    print(report.summary())
+    return 1 if report.failures else 0
+
+
+def _ingest(item: BatchInput) -> NormalizedDocument:
+    if item.kind == "pdf":
+        return ingest_pdf_path(item.ref)
+    if item.kind == "html":
+        path = Path(item.ref)
+        return document_from_html(path.read_text(encoding="utf-8", errors="replace"), url=path.resolve().as_uri())
+    return ingest_url(item.ref)
+
+
+def _analyze_all(
+    items: Sequence[BatchInput],
+    options: AnalysisOptions,
+    formats: Tuple[str, ...],
+    workers: int,
+    include_paragraphs: bool,
+    dedupe: bool,
+) -> Iterator[BatchResult]:
+    if workers == 1 or len(items) < 2:
+        for item in items:
+            yield analyze_input(item, options, formats, include_paragraphs, dedupe)
+        return
+    remaining = iter(items)
+    in_flight: Set[Future] = set()
+    with ProcessPoolExecutor(max_workers=min(workers, len(items))) as executor:
+        for item in remaining:
+            in_flight.add(executor.submit(analyze_input, item, options, formats, include_paragraphs, dedupe))
+            if len(in_flight) >= workers * 2:
+                break
+        while in_flight:
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                next_item = next(remaining, None)
+                if next_item is not None:
+                    in_flight.add(
+                        executor.submit(analyze_input, next_item, options, formats, include_paragraphs, dedupe)
+                    )
+                yield future.result()
+
+
+def _write_result(result: BatchResult, output_dir: Path, jsonl_file: Optional[TextIO]) -> None:
+    for output_format, suffix in OUTPUT_SUFFIXES.items():
+        if output_format in result.outputs:
+            _write_atomic(output_dir / f"{result.item.output_name}{suffix}", result.outputs[output_format])
+    if jsonl_file is not None and "jsonl" in result.outputs:
+        jsonl_file.write(result.outputs["jsonl"])
+        jsonl_file.flush()
+
+
+def _is_complete(item: BatchInput, output_dir: Path, formats: Sequence[str], done_refs: Set[str]) -> bool:
+    if "jsonl" in formats and item.ref not in done_refs:
+        return False
+    return all(
+        (output_dir / f"{item.output_name}{OUTPUT_SUFFIXES[output_format]}").exists()
+        for output_format in formats
+        if output_format in OUTPUT_SUFFIXES
+    )
+
+
+def _completed_jsonl_inputs(path: Path) -> Set[str]:
+    """Inputs recorded in ``path``, after trimming a partial last line left by a crash."""
+    if not path.exists():
+        return set()
+    data = path.read_bytes()
+    complete = data[: data.rfind(b"\n") + 1]
+    if len(complete) != len(data):
+        with open(path, "r+b") as handle:
+            handle.truncate(len(complete))
+    refs = set()
+    for line in complete.splitlines():
+        try:
+            refs.add(json.loads(line)["input"])
+        except (ValueError, KeyError, TypeError):
+            continue
+    return refs
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    handle, temp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(handle, "w", encoding="utf-8", newline="") as temp_file:
+            temp_file.write(text)
+        os.replace(temp_name, path)
+    except OSError:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
+
+
+if __name__ == "__main__":
+    sys.exit(main())
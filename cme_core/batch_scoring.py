@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .models import AnalysisOptions, Chunk, Priority, ScoreBreakdown
+from .scoring import (
+    SCORING_TERMS,
+    SIGNAL_TERMS,
+    SPECIALTY_TERMS,
+    ScoringConfig,
+    count_terms,
+    load_scoring_config,
+    priority_from_score,
+)
+
+try:  # NumPy is optional; the array-module path keeps the core dependency-free.
+    import numpy
+except ImportError:  # pragma: no cover - exercised only without numpy installed
+    numpy = None
+
+SIGNAL_NAMES: Tuple[str, ...] = tuple(SIGNAL_TERMS)
+EVIDENCE_ORDER: Tuple[str, ...] = tuple(dict.fromkeys(term for terms in SIGNAL_TERMS.values() for term in terms))
+_TERM_INDEX: Dict[str, int] = {term: index for index, term in enumerate(SCORING_TERMS)}
+
+
+class TermCountMatrix:
+    """Documents-by-terms count matrix over ``SCORING_TERMS``.
+
+    Rows are built once from term counts; every later re-weighting only needs the
+    family projection (one matrix multiply) plus elementwise vector operations.
+    Uses NumPy when available and falls back to ``array`` rows otherwise.
+    """
+
+    def __init__(self, rows: Sequence[Mapping[str, int]], use_numpy: Optional[bool] = None) -> None:
+        self.use_numpy = numpy is not None if use_numpy is None else use_numpy
+        if self.use_numpy and numpy is None:
+            raise RuntimeError("numpy is not installed")
+        self.row_count = len(rows)
+        self._evidence: Optional[List[List[str]]] = None
+        if self.use_numpy:
+            values = numpy.zeros((self.row_count, len(SCORING_TERMS)), dtype=numpy.int64)
+            for row_index, counts in enumerate(rows):
+                for term, hits in counts.items():
+                    if hits and term in _TERM_INDEX:
+                        values[row_index, _TERM_INDEX[term]] = hits
+            self.values: Any = values
+        else:
+            self.values = [array("q", (counts.get(term, 0) for term in SCORING_TERMS)) for counts in rows]
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: Sequence[str],
+        word_boundary: bool = False,
+        use_numpy: Optional[bool] = None,
+    ) -> "TermCountMatrix":
+        return cls([count_terms(text, word_boundary=word_boundary) for text in texts], use_numpy=use_numpy)
+
+    def family_hits(self, families: Mapping[str, Sequence[str]]) -> Any:
+        """Return a rows-by-families matrix of summed term hits."""
+        names = list(families)
+        if self.use_numpy:
+            projection = numpy.zeros((len(SCORING_TERMS), len(names)), dtype=numpy.int64)
+            for column, name in enumerate(names):
+                for term in families[name]:
+                    projection[_TERM_INDEX[term], column] += 1
+            return self.values @ projection
+        indexes = [[_TERM_INDEX[term] for term in families[name]] for name in names]
+        return [[sum(row[index] for index in columns) for columns in indexes] for row in self.values]
+
+    def evidence_terms(self) -> List[List[str]]:
+        """Signal terms present in each row, in scoring order; independent of weights."""
+        if self._evidence is None:
+            columns = [(_TERM_INDEX[term], term) for term in EVIDENCE_ORDER]
+            rows = self.values.tolist() if self.use_numpy else self.values
+            self._evidence = [[term for index, term in columns if row[index]][:12] for row in rows]
+        return self._evidence
+
+
+@dataclass(frozen=True)
+class BatchScores:
+    signal_scores: Any
+    specialty_bonus: Any
+    totals: Any
+    priorities: List[Priority]
+    evidence_terms: List[List[str]]
+
+    def breakdowns(self) -> List[ScoreBreakdown]:
+        signal_rows = _as_rows(self.signal_scores)
+        bonuses = _as_list(self.specialty_bonus)
+        totals = _as_list(self.totals)
+        return [
+            ScoreBreakdown(
+                **dict(zip(SIGNAL_NAMES, signal_row)),
+                specialty_bonus=bonus,
+                total=total,
+                evidence_terms=list(evidence),
+            )
+            for signal_row, bonus, total, evidence in zip(signal_rows, bonuses, totals, self.evidence_terms)
+        ]
+
+
+def score_matrix(
+    matrix: TermCountMatrix,
+    options: AnalysisOptions,
+    scoring_config: Optional[ScoringConfig] = None,
+) -> BatchScores:
+    config = scoring_config or load_scoring_config()
+    signal_hits = matrix.family_hits(SIGNAL_TERMS)
+    specialty_terms = {"specialty": SPECIALTY_TERMS.get(options.specialty_focus, ())}
+    specialty_hits = matrix.family_hits(specialty_terms)
+    normalizers = [config.normalizers.get(name, 3.0) for name in SIGNAL_NAMES]
+    weights = [config.weights[name] for name in SIGNAL_NAMES]
+    evidence = matrix.evidence_terms()
+
+    if matrix.use_numpy:
+        signal_scores = numpy.minimum(1.0, signal_hits / numpy.array(normalizers, dtype=numpy.float64))
+        specialty_bonus = numpy.minimum(0.12, specialty_hits[:, 0] * 0.03)
+        # Accumulate column by column so totals match scalar score_counts bit for bit.
+        totals = numpy.zeros(matrix.row_count, dtype=numpy.float64)
+        for column, weight in enumerate(weights):
+            totals = totals + signal_scores[:, column] * weight
+        totals = numpy.minimum(1.0, totals + specialty_bonus)
+        priorities = numpy.where(totals >= 0.63, "HIGH", numpy.where(totals >= 0.34, "MEDIUM", "LOW")).tolist()
+        return BatchScores(signal_scores, specialty_bonus, totals, priorities, evidence)
+
+    signal_scores = [
+        [min(1.0, hits / normalizer) for hits, normalizer in zip(row, normalizers)] for row in signal_hits
+    ]
+    specialty_bonus = [min(0.12, row[0] * 0.03) for row in specialty_hits]
+    totals = []
+    for row, bonus in zip(signal_scores, specialty_bonus):
+        total = 0.0
+        for score, weight in zip(row, weights):
+            total = total + score * weight
+        totals.append(min(1.0, total + bonus))
+    priorities = [priority_from_score(total) for total in totals]
+    return BatchScores(signal_scores, specialty_bonus, totals, priorities, evidence)
+
+
+def score_texts(
+    texts: Sequence[str],
+    options: AnalysisOptions,
+    scoring_config: Optional[ScoringConfig] = None,
+    word_boundary: bool = False,
+) -> List[ScoreBreakdown]:
+    matrix = TermCountMatrix.from_texts(texts, word_boundary=word_boundary)
+    return score_matrix(matrix, options, scoring_config=scoring_config).breakdowns()
+
+
+def score_chunks(
+    chunks: Sequence[Chunk],
+    options: AnalysisOptions,
+    scoring_config: Optional[ScoringConfig] = None,
+    word_boundary: bool = False,
+) -> List[ScoreBreakdown]:
+    return score_texts(
+        [chunk.text for chunk in chunks],
+        options,
+        scoring_config=scoring_config,
+        word_boundary=word_boundary,
+    )
+
+
+def _as_rows(values: Any) -> List[List[float]]:
+    return values.tolist() if hasattr(values, "tolist") else [list(row) for row in values]
+
+
+def _as_list(values: Any) -> List[float]:
+    return values.tolist() if hasattr(values, "tolist") else list(values)
@@ -0,0 +1,399 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from .models import (
+    AnalysisOptions,
+    Flashcard,
+    NormalizedDocument,
+    Paragraph,
+    ScoreBreakdown,
+    SourceAnchor,
+    Topic,
+)
+
+LOGGER = logging.getLogger("neurocme.cache")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+CACHE_DIR_ENV = "NEUROCME_CACHE_DIR"
+DOCUMENT_FORMAT_VERSION = 1
+HTTP_FORMAT_VERSION = 1
+DEFAULT_HTTP_MAX_AGE = 3600.0
+# Bump whenever chunking, seeding, scoring or output building changes results.
+PIPELINE_VERSION = 3
+_KEY_RE = re.compile(r"^[A-Za-z0-9._-]{1,200}$")
+
+
+class DiskCache:
+    """Size-capped on-disk blob store with least-recently-used eviction.
+
+    Entries are single files named after their key. Reads refresh the file's
+    mtime, and writes evict the stalest entries until the store fits in
+    ``max_bytes``.
+    """
+
+    def __init__(self, directory: Union[str, Path], max_bytes: int = DEFAULT_MAX_BYTES, suffix: str = ".bin") -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            payload = path.read_bytes()
+        except OSError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return payload
+
+    def put(self, key: str, payload: bytes) -> None:
+        path = self._path(key)
+        if len(payload) > self.max_bytes:
+            return
+        handle, temp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as temp_file:
+                temp_file.write(payload)
+            os.replace(temp_name, path)
+        except OSError:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+        self._evict(keep=path)
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        for path in self._entries():
+            path.unlink(missing_ok=True)
+
+    def size_bytes(self) -> int:
+        return sum(_file_size(path) for path in self._entries())
+
+    def keys(self) -> List[str]:
+        return [path.name[: -len(self.suffix)] for path in self._entries()]
+
+    def _path(self, key: str) -> Path:
+        if not _KEY_RE.match(key):
+            raise ValueError(f"Invalid cache key: {key!r}")
+        return self.directory / f"{key}{self.suffix}"
+
+    def _entries(self) -> List[Path]:
+        return [path for path in self.directory.glob(f"*{self.suffix}") if path.is_file()]
+
+    def _evict(self, keep: Path) -> None:
+        entries = []
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+class DocumentCache:
+    """Content-addressed cache of ingested documents in a compact compressed form."""
+
+    def __init__(self, directory: Union[str, Path], max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.store = DiskCache(directory, max_bytes=max_bytes, suffix=".doc.z")
+
+    def get(self, key: str) -> Optional[NormalizedDocument]:
+        payload = self.store.get(key)
+        if payload is None:
+            return None
+        try:
+            return deserialize_document(payload)
+        except (ValueError, KeyError, TypeError, zlib.error):
+            self.store.delete(key)
+            return None
+
+    def put(self, key: str, document: NormalizedDocument) -> None:
+        self.store.put(key, serialize_document(document))
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    url: str
+    text: str
+    content_type: str = ""
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: float = 0.0
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers that let the server answer 304 Not Modified."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """On-disk cache of fetched pages keyed by URL.
+
+    Entries younger than ``max_age`` seconds are served without contacting the
+    server; older ones are revalidated with their ETag/Last-Modified validators.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        max_age: float = DEFAULT_HTTP_MAX_AGE,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.max_age = max_age
+        self.store = DiskCache(directory, max_bytes=max_bytes, suffix=".http.z")
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        key = http_cache_key(url)
+        payload = self.store.get(key)
+        if payload is None:
+            return None
+        try:
+            data = json.loads(zlib.decompress(payload).decode("utf-8"))
+            if data.pop("format") != HTTP_FORMAT_VERSION:
+                raise ValueError("Unsupported cached response format")
+            entry = CachedResponse(**data)
+        except (ValueError, KeyError, TypeError, zlib.error):
+            self.store.delete(key)
+            return None
+        return entry if entry.url == url else None
+
+    def put(self, entry: CachedResponse) -> None:
+        """Best-effort write; a failing cache directory is logged and the fetched page is still used."""
+        payload = {"format": HTTP_FORMAT_VERSION, **asdict(entry)}
+        try:
+            self.store.put(http_cache_key(entry.url), zlib.compress(json.dumps(payload).encode("utf-8"), 6))
+        except OSError as exc:
+            LOGGER.warning("Could not cache response for %s: %s", entry.url, exc)
+
+    def is_fresh(self, entry: CachedResponse, now: Optional[float] = None) -> bool:
+        return (time.time() if now is None else now) - entry.fetched_at < self.max_age
+
+    def refresh(self, entry: CachedResponse, etag: Optional[str] = None, last_modified: Optional[str] = None) -> CachedResponse:
+        """Record a 304 revalidation, keeping the body and restarting the freshness window."""
+        refreshed = replace(
+            entry,
+            etag=etag or entry.etag,
+            last_modified=last_modified or entry.last_modified,
+            fetched_at=time.time(),
+        )
+        self.put(refreshed)
+        return refreshed
+
+
+class ResultCache:
+    """Two-tier memo of ranked topics per document, options and scoring config.
+
+    Keys combine the document content hash, ``AnalysisOptions``, the scoring
+    config hash and ``PIPELINE_VERSION``. The in-memory tier is an LRU bounded by
+    ``max_entries``; the optional on-disk tier is a size-capped ``DiskCache``.
+    Results assume chunks were built with the default ``extract_chunks`` settings.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Union[str, Path]] = None,
+        max_entries: int = 64,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.max_entries = max_entries
+        self.store = DiskCache(directory, max_bytes=max_bytes, suffix=".topics.z") if directory is not None else None
+        self._memory: "OrderedDict[str, Tuple[Topic, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, document: NormalizedDocument, options: AnalysisOptions, config_hash: str) -> str:
+        variant = json.dumps([options.to_dict(), config_hash, PIPELINE_VERSION], sort_keys=True)
+        variant_hash = hashlib.sha1(variant.encode("utf-8")).hexdigest()[:24]
+        return f"{document_content_hash(document)[:16]}-{variant_hash}"
+
+    def get(self, key: str) -> Optional[List[Topic]]:
+        with self._lock:
+            topics = self._memory.get(key)
+            if topics is not None:
+                self._memory.move_to_end(key)
+                return list(topics)
+        if self.store is None:
+            return None
+        payload = self.store.get(key)
+        if payload is None:
+            return None
+        try:
+            loaded = deserialize_topics(payload)
+        except (ValueError, KeyError, TypeError, zlib.error):
+            self.store.delete(key)
+            return None
+        self._remember(key, loaded)
+        return loaded
+
+    def put(self, key: str, topics: Sequence[Topic]) -> None:
+        """Best-effort write; a failing cache directory is logged and the result stays in memory."""
+        self._remember(key, topics)
+        if self.store is not None:
+            try:
+                self.store.put(key, serialize_topics(topics))
+            except OSError as exc:
+                LOGGER.warning("Could not cache ranked topics %s: %s", key, exc)
+
+    def invalidate(self, document: Optional[NormalizedDocument] = None) -> None:
+        """Drop every cached result, or only the results for ``document``."""
+        prefix = f"{document_content_hash(document)[:16]}-" if document is not None else ""
+        with self._lock:
+            for key in [key for key in self._memory if key.startswith(prefix)]:
+                del self._memory[key]
+        if self.store is not None:
+            for key in self.store.keys():
+                if key.startswith(prefix):
+                    self.store.delete(key)
+
+    def _remember(self, key: str, topics: Sequence[Topic]) -> None:
+        with self._lock:
+            self._memory[key] = tuple(topics)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+
+def document_content_hash(document: NormalizedDocument) -> str:
+    """Hash of everything ranking reads from a document: its id and paragraph contents.
+
+    Documents are immutable, so the hash is stored on the document the first time
+    it is computed; cache hits on large documents then skip re-hashing every paragraph.
+    """
+    if document._content_hash is not None:
+        return document._content_hash
+    digest = hashlib.sha1(document.document_id.encode("utf-8"))
+    for paragraph in document.paragraphs:
+        anchor = paragraph.anchor
+        fields = (paragraph.text, paragraph.section_heading, anchor.page, anchor.paragraph, anchor.section, anchor.snippet)
+        digest.update(("\x1e" + "\x1f".join(str(value) for value in fields)).encode("utf-8"))
+    content_hash = digest.hexdigest()
+    object.__setattr__(document, "_content_hash", content_hash)
+    return content_hash
+
+
+def http_cache_key(url: str) -> str:
+    return f"http-{hashlib.sha1(url.encode('utf-8')).hexdigest()[:24]}"
+
+
+def serialize_topics(topics: Sequence[Topic]) -> bytes:
+    payload = {"format": PIPELINE_VERSION, "topics": [asdict(topic) for topic in topics]}
+    return zlib.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"), 6)
+
+
+def deserialize_topics(payload: bytes) -> List[Topic]:
+    data = json.loads(zlib.decompress(payload).decode("utf-8"))
+    if data.get("format") != PIPELINE_VERSION:
+        raise ValueError("Unsupported cached topic format")
+    topics = []
+    for item in data["topics"]:
+        topics.append(
+            Topic(
+                **{
+                    **item,
+                    "anchors": [SourceAnchor(**anchor) for anchor in item["anchors"]],
+                    "breakdown": ScoreBreakdown(**item["breakdown"]),
+                    "flashcards": [Flashcard(**card) for card in item["flashcards"]],
+                }
+            )
+        )
+    return topics
+
+
+def default_document_cache() -> Optional[DocumentCache]:
+    """Return the cache configured through ``NEUROCME_CACHE_DIR``, if any."""
+    directory = os.environ.get(CACHE_DIR_ENV)
+    if not directory:
+        return None
+    return DocumentCache(Path(directory) / "documents")
+
+
+def default_http_cache() -> Optional[HttpCache]:
+    """Return the page cache configured through ``NEUROCME_CACHE_DIR``, if any."""
+    directory = os.environ.get(CACHE_DIR_ENV)
+    if not directory:
+        return None
+    return HttpCache(Path(directory) / "http")
+
+
+def serialize_document(document: NormalizedDocument) -> bytes:
+    sections: Dict[Optional[str], int] = {}
+    rows = []
+    for paragraph in document.paragraphs:
+        anchor = paragraph.anchor
+        rows.append(
+            [
+                paragraph.text,
+                anchor.page,
+                anchor.paragraph,
+                sections.setdefault(anchor.section, len(sections)),
+                sections.setdefault(paragraph.section_heading, len(sections)),
+                anchor.snippet,
+            ]
+        )
+    payload = {
+        "format": DOCUMENT_FORMAT_VERSION,
+        "document_id": document.document_id,
+        "title": document.title,
+        "source_type": document.source_type,
+        "source_ref": document.source_ref,
+        "metadata": document.metadata,
+        "sections": list(sections),
+        "paragraphs": rows,
+    }
+    return zlib.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"), 6)
+
+
+def deserialize_document(payload: bytes) -> NormalizedDocument:
+    data: Dict[str, Any] = json.loads(zlib.decompress(payload).decode("utf-8"))
+    if data.get("format") != DOCUMENT_FORMAT_VERSION:
+        raise ValueError("Unsupported cached document format")
+    sections = data["sections"]
+    paragraphs = [
+        Paragraph(
+            text=text,
+            anchor=SourceAnchor(page=page, paragraph=number, section=sections[section], snippet=snippet),
+            section_heading=sections[heading],
+        )
+        for text, page, number, section, heading, snippet in data["paragraphs"]
+    ]
+    return NormalizedDocument(
+        document_id=data["document_id"],
+        title=data["title"],
+        source_type=data["source_type"],
+        source_ref=data["source_ref"],
+        paragraphs=paragraphs,
+        metadata=data["metadata"],
+    )
+
+
+def _file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
@@ -0,0 +1,365 @@
+from __future__ import annotations
+
+import heapq
+import json
+import math
+import mmap
+import os
+import sys
+import tempfile
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .chunking import extract_chunks
+from .models import Chunk, NormalizedDocument, SourceAnchor
+from .scoring import SIGNAL_TERMS, chunk_term_counts
+from .topics import TOPIC_LEXICON, derive_topic_label, lexicon_alias_counts, normalize_label
+
+INDEX_FORMAT_VERSION = 1
+MANIFEST_NAME = "index.json"
+INDEX_TERMS: Tuple[str, ...] = tuple(
+    dict.fromkeys(
+        [
+            *(term for terms in SIGNAL_TERMS.values() for term in terms),
+            *(alias for aliases in TOPIC_LEXICON.values() for alias in aliases),
+        ]
+    )
+)
+KEY_KINDS = ("term", "topic", "label")
+QUERY_MODES = ("all", "any")
+# Postings are (chunk ordinal, hits) pairs of little-endian uint32.
+_POSTING_WIDTH = 2
+
+
+@dataclass(frozen=True)
+class IndexHit:
+    chunk_id: str
+    document_id: str
+    heading: str
+    score: float
+    anchors: List[SourceAnchor]
+    hits: Dict[str, int]
+
+
+class ChunkIndex:
+    """Persistent inverted index of chunks across documents.
+
+    Postings exist for every ``INDEX_TERMS`` term (``term:<term>``), each
+    ``TOPIC_LEXICON`` canonical (``topic:<canonical>``) and each chunk's derived
+    topic label (``label:<normalized label>``). Every ``add_documents`` call
+    writes an immutable segment: a JSON key table, a memory-mapped uint32
+    postings file, and a chunk table holding chunk ids and anchors, so queries
+    never need the source documents. ``compact`` merges segments into one.
+    """
+
+    def __init__(self, directory: Union[str, Path]) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        manifest_path = self.directory / MANIFEST_NAME
+        if manifest_path.exists():
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+            if manifest.get("format") != INDEX_FORMAT_VERSION:
+                raise ValueError(f"Unsupported chunk index format in {self.directory}")
+        else:
+            manifest = {"format": INDEX_FORMAT_VERSION, "next_segment": 1, "segments": [], "documents": {}}
+        self.documents: Dict[str, Dict[str, Any]] = manifest["documents"]
+        self._next_segment: int = manifest["next_segment"]
+        self._segments = [_Segment(self.directory, name) for name in manifest["segments"]]
+
+    def __enter__(self) -> "ChunkIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __contains__(self, document_id: object) -> bool:
+        return document_id in self.documents
+
+    def __len__(self) -> int:
+        return sum(segment.chunk_count for segment in self._segments)
+
+    def close(self) -> None:
+        for segment in self._segments:
+            segment.close()
+
+    def add_document(self, document: NormalizedDocument, chunks: Optional[Sequence[Chunk]] = None) -> bool:
+        return self.add_documents([(document, chunks if chunks is not None else extract_chunks(document))]) == 1
+
+    def add_documents(
+        self,
+        documents: Iterable[Union[NormalizedDocument, Tuple[NormalizedDocument, Sequence[Chunk]]]],
+    ) -> int:
+        """Index documents not already present in one new segment; returns how many were added."""
+        rows: List[_ChunkRow] = []
+        added: Dict[str, Dict[str, Any]] = {}
+        for item in documents:
+            document, chunks = item if isinstance(item, tuple) else (item, None)
+            if document.document_id in self.documents or document.document_id in added:
+                continue
+            chunks = extract_chunks(document) if chunks is None else chunks
+            rows.extend(_chunk_row(chunk) for chunk in chunks)
+            added[document.document_id] = {
+                "title": document.title,
+                "source_type": document.source_type,
+                "source_ref": document.source_ref,
+                "chunks": len(chunks),
+            }
+        if not added:
+            return 0
+        name = self._write_segment(rows)
+        self._commit([*(segment.name for segment in self._segments), name], {**self.documents, **added})
+        self._segments.append(_Segment(self.directory, name))
+        return len(added)
+
+    def compact(self) -> None:
+        """Merge all segments into one, keeping chunk order."""
+        if len(self._segments) < 2:
+            return
+        rows = [row for segment in self._segments for row in segment.rows()]
+        name = self._write_segment(rows)
+        stale = self._segments
+        self._commit([name], self.documents)
+        self._segments = [_Segment(self.directory, name)]
+        for segment in stale:
+            segment.close()
+            segment.delete()
+
+    def resolve(self, term: str) -> str:
+        """Map a query term to an index key.
+
+        Explicit ``term:``/``topic:``/``label:`` keys pass through; otherwise a
+        lexicon canonical, then a known term, then a topic label is assumed. Some
+        canonicals are also one of their own aliases ("Status Epilepticus"), so they
+        resolve to the topic, which aggregates every alias; use ``term:`` for the
+        phrase alone.
+        """
+        kind, _, value = term.partition(":")
+        if value and kind in KEY_KINDS:
+            return term
+        lowered = term.strip().lower()
+        for canonical in TOPIC_LEXICON:
+            if canonical.lower() == lowered:
+                return f"topic:{canonical}"
+        if lowered in INDEX_TERMS:
+            return f"term:{lowered}"
+        return f"label:{normalize_label(term)}"
+
+    def search(self, query: Sequence[str], mode: str = "all", limit: Optional[int] = 20) -> List[IndexHit]:
+        """Chunks matching all (or any) query terms, densest first.
+
+        Score is the idf-weighted number of hits per 1,000 characters of chunk text.
+        """
+        if mode not in QUERY_MODES:
+            raise ValueError(f"mode must be one of {QUERY_MODES}")
+        keys = list(dict.fromkeys(self.resolve(term) for term in query))
+        if not keys:
+            return []
+        total = max(len(self), 1)
+        idf = {
+            key: math.log(1 + total / (1 + sum(segment.document_frequency(key) for segment in self._segments)))
+            for key in keys
+        }
+        candidates: List[Tuple[float, int, int, Dict[str, int]]] = []
+        for segment_number, segment in enumerate(self._segments):
+            for ordinal, hits in segment.match(keys, mode).items():
+                weighted = sum(count * idf[key] for key, count in hits.items())
+                score = 1000.0 * weighted / max(segment.chunk_length(ordinal), 1)
+                candidates.append((score, -segment_number, -ordinal, hits))
+        if limit is not None:
+            candidates = heapq.nlargest(limit, candidates, key=lambda candidate: candidate[:3])
+        else:
+            candidates.sort(key=lambda candidate: candidate[:3], reverse=True)
+        results = []
+        for score, segment_number, ordinal, hits in candidates:
+            record = self._segments[-segment_number].record(-ordinal)
+            results.append(
+                IndexHit(
+                    chunk_id=record["chunk_id"],
+                    document_id=record["document_id"],
+                    heading=record["heading"],
+                    score=round(score, 4),
+                    anchors=[SourceAnchor(*anchor) for anchor in record["anchors"]],
+                    hits=hits,
+                )
+            )
+        return results
+
+    def _write_segment(self, rows: Sequence["_ChunkRow"]) -> str:
+        name = f"seg-{self._next_segment:06d}"
+        self._next_segment += 1
+        postings: Dict[str, List[int]] = {}
+        table = array("Q", [0])
+        lengths = array("I")
+        with open(self.directory / f"{name}.chunks", "wb") as handle:
+            for ordinal, (record, length, hits) in enumerate(rows):
+                table.append(table[-1] + handle.write(record))
+                lengths.append(length)
+                for key, count in hits.items():
+                    postings.setdefault(key, []).extend((ordinal, count))
+        keys: Dict[str, List[int]] = {}
+        flat = array("I")
+        for key in sorted(postings):
+            keys[key] = [len(flat) // _POSTING_WIDTH, len(postings[key]) // _POSTING_WIDTH]
+            flat.extend(postings[key])
+        _write_array(self.directory / f"{name}.postings", flat)
+        _write_array(self.directory / f"{name}.offsets", table)
+        _write_array(self.directory / f"{name}.lengths", lengths)
+        _write_json(self.directory / f"{name}.json", {"chunks": len(rows), "keys": keys})
+        return name
+
+    def _commit(self, segments: List[str], documents: Dict[str, Dict[str, Any]]) -> None:
+        # The manifest is replaced last, so an interrupted write leaves only unused segment files.
+        _write_json(
+            self.directory / MANIFEST_NAME,
+            {
+                "format": INDEX_FORMAT_VERSION,
+                "next_segment": self._next_segment,
+                "segments": segments,
+                "documents": documents,
+            },
+        )
+        self.documents = documents
+
+
+_ChunkRow = Tuple[bytes, int, Dict[str, int]]
+
+
+def index_keys(chunk: Chunk) -> Dict[str, int]:
+    """Index keys and hit counts for one chunk."""
+    aliases = lexicon_alias_counts(chunk.text.lower())
+    counts = {**chunk_term_counts(chunk), **aliases}
+    keys = {f"term:{term}": counts[term] for term in INDEX_TERMS if counts.get(term)}
+    for canonical, canonical_aliases in TOPIC_LEXICON.items():
+        hits = sum(aliases.get(alias, 0) for alias in canonical_aliases)
+        if hits:
+            keys[f"topic:{canonical}"] = hits
+    keys[f"label:{normalize_label(derive_topic_label(chunk))}"] = 1
+    return keys
+
+
+def _chunk_row(chunk: Chunk) -> _ChunkRow:
+    record = {
+        "chunk_id": chunk.chunk_id,
+        "document_id": chunk.document_id,
+        "heading": chunk.heading,
+        "anchors": [[anchor.page, anchor.paragraph, anchor.section, anchor.snippet] for anchor in chunk.anchors],
+    }
+    return json.dumps(record, separators=(",", ":")).encode("utf-8"), len(chunk.text), index_keys(chunk)
+
+
+class _Segment:
+    def __init__(self, directory: Path, name: str) -> None:
+        self.directory = directory
+        self.name = name
+        meta = json.loads((directory / f"{name}.json").read_text(encoding="utf-8"))
+        self.chunk_count: int = meta["chunks"]
+        self.keys: Dict[str, List[int]] = meta["keys"]
+        self._maps: List[mmap.mmap] = []
+        self._postings = self._load("postings", "I")
+        self._offsets = self._load("offsets", "Q")
+        self._lengths = self._load("lengths", "I")
+        self._chunks = self._map(directory / f"{name}.chunks")
+
+    def close(self) -> None:
+        # Views into the maps must be released before the maps can close.
+        for attribute in ("_postings", "_offsets", "_lengths"):
+            view = getattr(self, attribute)
+            if isinstance(view, memoryview):
+                view.release()
+        for mapped in self._maps:
+            mapped.close()
+        self._maps = []
+
+    def delete(self) -> None:
+        for suffix in ("json", "postings", "offsets", "lengths", "chunks"):
+            (self.directory / f"{self.name}.{suffix}").unlink(missing_ok=True)
+
+    def document_frequency(self, key: str) -> int:
+        entry = self.keys.get(key)
+        return entry[1] if entry else 0
+
+    def chunk_length(self, ordinal: int) -> int:
+        return self._lengths[ordinal]
+
+    def postings(self, key: str) -> Iterable[Tuple[int, int]]:
+        entry = self.keys.get(key)
+        if not entry:
+            return ()
+        start = entry[0] * _POSTING_WIDTH
+        stop = start + entry[1] * _POSTING_WIDTH
+        values = self._postings[start:stop]
+        return zip(values[::_POSTING_WIDTH], values[1::_POSTING_WIDTH])
+
+    def match(self, keys: Sequence[str], mode: str) -> Dict[int, Dict[str, int]]:
+        if mode == "all":
+            if any(key not in self.keys for key in keys):
+                return {}
+            # Start from the rarest key so later keys only probe a small candidate set.
+            ordered = sorted(keys, key=self.document_frequency)
+            matches = {ordinal: {ordered[0]: hits} for ordinal, hits in self.postings(ordered[0])}
+            for key in ordered[1:]:
+                narrowed = {}
+                for ordinal, hits in self.postings(key):
+                    if ordinal in matches:
+                        matches[ordinal][key] = hits
+                        narrowed[ordinal] = matches[ordinal]
+                matches = narrowed
+                if not matches:
+                    break
+            return {ordinal: {key: found[key] for key in keys} for ordinal, found in matches.items()}
+        matches: Dict[int, Dict[str, int]] = {}
+        for key in keys:
+            for ordinal, hits in self.postings(key):
+                matches.setdefault(ordinal, {})[key] = hits
+        return matches
+
+    def record(self, ordinal: int) -> Dict[str, Any]:
+        return json.loads(self._record_bytes(ordinal))
+
+    def rows(self) -> List[_ChunkRow]:
+        hits: List[Dict[str, int]] = [{} for _ in range(self.chunk_count)]
+        for key in self.keys:
+            for ordinal, count in self.postings(key):
+                hits[ordinal][key] = count
+        return [(self._record_bytes(ordinal), self._lengths[ordinal], hits[ordinal]) for ordinal in range(self.chunk_count)]
+
+    def _record_bytes(self, ordinal: int) -> bytes:
+        return bytes(self._chunks[self._offsets[ordinal] : self._offsets[ordinal + 1]])
+
+    def _map(self, path: Path) -> Union[mmap.mmap, bytes]:
+        with open(path, "rb") as handle:
+            if os.fstat(handle.fileno()).st_size == 0:
+                return b""
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mapped)
+        return mapped
+
+    def _load(self, suffix: str, typecode: str) -> Union[memoryview, array]:
+        mapped = self._map(self.directory / f"{self.name}.{suffix}")
+        if sys.byteorder == "little" and isinstance(mapped, mmap.mmap):
+            return memoryview(mapped).cast(typecode)
+        values = array(typecode, bytes(mapped))
+        if sys.byteorder != "little":
+            values.byteswap()
+        return values
+
+
+def _write_array(path: Path, values: array) -> None:
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    with open(path, "wb") as handle:
+        values.tofile(handle)
+
+
+def _write_json(path: Path, payload: Dict[str, Any]) -> None:
+    handle, temp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(handle, "w", encoding="utf-8") as temp_file:
+            json.dump(payload, temp_file, separators=(",", ":"))
+        os.replace(temp_name, path)
+    except OSError:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
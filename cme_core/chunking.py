@@ -1,52 +1,93 @@
 from __future__ import annotations
 
 import hashlib
-from typing import List
+from typing import Iterable, Iterator, List, Optional
 
-from .models import Chunk, NormalizedDocument, Paragraph
+from .dedup import ParagraphDeduplicator
+from .models import Chunk, NormalizedDocument, Paragraph, SourceType
+from .scoring import sparse_term_counts
+from .tracing import NULL_TRACER, PipelineTracer
+
+PARAGRAPH_SEPARATOR = "\n\n"
 
 
 def extract_chunks(
     document: NormalizedDocument,
     max_chars: int = 1100,
     min_chars: int = 280,
+    tracer: Optional[PipelineTracer] = None,
+    dedupe: bool = False,
 ) -> List[Chunk]:
-    chunks: List[Chunk] = []
+    """Chunk ``document``; with ``dedupe`` repeated paragraphs (running headers, banners) are dropped first."""
+    deduplicator = ParagraphDeduplicator() if dedupe else None
+    with (tracer or NULL_TRACER).stage("extract_chunks") as stage:
+        chunks = list(
+            iter_chunks(
+                document.paragraphs if deduplicator is None else deduplicator.filter(document.paragraphs),
+                document_id=document.document_id,
+                source_type=document.source_type,
+                max_chars=max_chars,
+                min_chars=min_chars,
+            )
+        )
+        stage.add("paragraphs", len(document.paragraphs))
+        stage.add("chunks", len(chunks))
+        if deduplicator is not None:
+            stage.add("exact_duplicates", deduplicator.stats.exact_duplicates)
+            stage.add("near_duplicates", deduplicator.stats.near_duplicates)
+    return chunks
+
+
+def iter_chunks(
+    paragraphs: Iterable[Paragraph],
+    document_id: str = "",
+    source_type: SourceType = "text",
+    max_chars: int = 1100,
+    min_chars: int = 280,
+) -> Iterator[Chunk]:
+    """Yield chunks as soon as they close, tracking the joined buffer length incrementally."""
+    separator_size = len(PARAGRAPH_SEPARATOR)
     buffer: List[Paragraph] = []
-    current_heading = document.paragraphs[0].section_heading or "Overview"
+    buffer_size = 0
+    chunk_count = 0
+    current_heading = "Overview"
 
-    def flush_buffer() -> None:
-        if not buffer:
-            return
-        text = "\n\n".join(paragraph.text for paragraph in buffer).strip()
-        chunk_index = len(chunks) + 1
+    def build_chunk() -> Chunk:
+        text = PARAGRAPH_SEPARATOR.join(paragraph.text for paragraph in buffer).strip()
         chunk_id = hashlib.sha1(
-            f"{document.document_id}:{chunk_index}:{current_heading}:{text[:120]}".encode("utf-8")
+            f"{document_id}:{chunk_count}:{current_heading}:{text[:120]}".encode("utf-8")
         ).hexdigest()[:12]
-        chunks.append(
-            Chunk(
-                chunk_id=chunk_id,
-                document_id=document.document_id,
-                heading=current_heading or "Overview",
-                text=text,
-                anchors=[paragraph.anchor for paragraph in buffer],
-                paragraph_count=len(buffer),
-                metadata={"source_type": document.source_type},
-            )
+        return Chunk(
+            chunk_id=chunk_id,
+            document_id=document_id,
+            heading=current_heading or "Overview",
+            text=text,
+            anchors=[paragraph.anchor for paragraph in buffer],
+            paragraph_count=len(buffer),
+            metadata={"source_type": source_type},
+            term_counts=sparse_term_counts(text),
         )
-        buffer.clear()
 
-    for paragraph in document.paragraphs:
+    for paragraph in paragraphs:
         heading = paragraph.section_heading or current_heading or "Overview"
-        proposed_size = len("\n\n".join(item.text for item in buffer + [paragraph]))
+        text_size = len(paragraph.text)
+        proposed_size = buffer_size + (separator_size if buffer else 0) + text_size
         heading_changed = buffer and heading != current_heading
         too_large = proposed_size > max_chars
-        if buffer and (heading_changed or too_large) and len("\n\n".join(item.text for item in buffer)) >= min_chars:
-            flush_buffer()
+        if buffer and (heading_changed or too_large) and buffer_size >= min_chars:
+            chunk_count += 1
+            yield build_chunk()
+            buffer.clear()
+            buffer_size = 0
         if not buffer:
             current_heading = heading
+        buffer_size += (separator_size if buffer else 0) + text_size
         buffer.append(paragraph)
-        if len("\n\n".join(item.text for item in buffer)) >= max_chars:
-            flush_buffer()
-    flush_buffer()
-    return chunks
+        if buffer_size >= max_chars:
+            chunk_count += 1
+            yield build_chunk()
+            buffer.clear()
+            buffer_size = 0
+    if buffer:
+        chunk_count += 1
+        yield build_chunk()
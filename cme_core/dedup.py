@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import hashlib
+import operator
+import re
+import struct
+from array import array
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .models import NormalizedDocument, Paragraph, anchor_snippet
+from .tracing import NULL_TRACER, PipelineTracer
+
+DEFAULT_SIMILARITY = 0.8
+# Only paragraphs this short can be boilerplate; longer ones are only dropped when repeated verbatim.
+BOILERPLATE_MAX_TOKENS = 40
+# A short paragraph away from the page edge becomes a candidate once its boilerplate form is on this many pages.
+MIN_REPEAT_PAGES = 3
+# Shorter candidates only match through their boilerplate form: a few tokens give no useful Jaccard estimate.
+MIN_MINHASH_TOKENS = 6
+REPEATED_EXAMPLES = 10
+# Numbers (kept whole, "0.1" and "4.5"), comparison and unit symbols, and words with their "n't".
+_TOKEN = re.compile(r"\d+(?:[.,]\d+)*|[<>≤≥=≠±%]|[^\W\d_]+(?:'t)?")
+_NUMBER = re.compile(r"\d")
+_PAGE_WORDS = {"page", "p", "pg", "pp"}
+_NEGATIONS = {"no", "not", "never", "none", "nor", "neither", "without", "cannot"}
+_PAGE_NUMBER = "#"
+
+# MinHash signatures of 24 16-bit values, indexed as 6 bands of 4 rows: pairs at
+# Jaccard 0.8 share a band about 96% of the time, pairs at 0.5 about 32%.
+_NUM_HASHES = 24
+_BAND_ROWS = 4
+_TOKEN_HASH = struct.Struct(f"<{_NUM_HASHES}H")
+_TOKEN_CACHE_SIZE = 1 << 15
+
+
+@dataclass
+class DedupStats:
+    paragraphs: int = 0
+    kept: int = 0
+    exact_duplicates: int = 0
+    near_duplicates: int = 0
+    removed_chars: int = 0
+    repeated: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def removed(self) -> int:
+        return self.exact_duplicates + self.near_duplicates
+
+    def to_dict(self) -> Dict[str, Any]:
+        top = sorted(self.repeated.items(), key=lambda item: -item[1])[:REPEATED_EXAMPLES]
+        return {
+            "paragraphs": self.paragraphs,
+            "kept": self.kept,
+            "exact_duplicates": self.exact_duplicates,
+            "near_duplicates": self.near_duplicates,
+            "removed_chars": self.removed_chars,
+            "most_repeated": [{"snippet": snippet, "removed": count} for snippet, count in top],
+        }
+
+
+@dataclass(frozen=True)
+class _Boilerplate:
+    """Comparable form of a short paragraph: page-counter numbers folded out, everything else kept."""
+
+    key: bytes
+    tokens: Tuple[str, ...]
+    # Page counter value minus the paragraph's page, per folded number; equal offsets mean a running counter.
+    page_offsets: Tuple[int, ...]
+    numbers: Tuple[str, ...]
+    negations: Tuple[str, ...]
+
+    def matches(self, other: "_Boilerplate") -> bool:
+        return (self.page_offsets, self.numbers, self.negations) == (other.page_offsets, other.numbers, other.negations)
+
+
+class ParagraphDeduplicator:
+    """Single-pass filter that keeps the first of each repeated paragraph.
+
+    Any paragraph is dropped when its text repeats an earlier one verbatim, up
+    to case and whitespace. Looser matching is reserved for boilerplate
+    candidates: paragraphs of at most ``BOILERPLATE_MAX_TOKENS`` tokens with a
+    page number that sit first or last on their page, or whose boilerplate form
+    already appeared on ``MIN_REPEAT_PAGES - 1`` other pages. For those, a number
+    that reads like a page counter ("Page 12", "12 of 300") may differ when it
+    moves in step with the page, and with ``near_duplicates`` a MinHash
+    signature of the token set catches reworded copies at Jaccard ``similarity``.
+    Neither kind of match is made when any other number, comparison symbol or
+    negation differs, so "ICP below 20" never replaces "ICP below 22" and
+    "should not" never replaces "should".
+    """
+
+    def __init__(
+        self,
+        similarity: float = DEFAULT_SIMILARITY,
+        near_duplicates: bool = True,
+        stats: Optional[DedupStats] = None,
+    ) -> None:
+        if not 0.0 < similarity <= 1.0:
+            raise ValueError("similarity must be in (0, 1]")
+        self.similarity = similarity
+        self.near_duplicates = near_duplicates
+        self.stats = stats if stats is not None else DedupStats()
+        self._exact: Dict[bytes, int] = {}
+        self._boilerplate: Dict[bytes, List[Tuple[int, _Boilerplate]]] = {}
+        self._boilerplate_pages: Dict[bytes, Tuple[int, int]] = {}
+        self._candidates: Dict[int, _Boilerplate] = {}
+        self._signatures: Dict[int, array] = {}
+        self._bands: List[Dict[int, List[int]]] = [{} for _ in range(_NUM_HASHES // _BAND_ROWS)]
+        self._repeat_labels: Dict[int, str] = {}
+        self._token_hashes: Dict[str, Tuple[int, ...]] = {}
+        self._last_page: Optional[int] = None
+
+    def filter(self, paragraphs: Iterable[Paragraph]) -> Iterator[Paragraph]:
+        # One paragraph of lookahead tells whether each paragraph is the last on its page.
+        previous: Optional[Paragraph] = None
+        previous_first = False
+        for paragraph in paragraphs:
+            if previous is not None:
+                last_on_page = paragraph.anchor.page != previous.anchor.page
+                if self.admit(previous, page_edge=previous_first or last_on_page):
+                    yield previous
+                previous_first = last_on_page
+            else:
+                previous_first = True
+            previous = paragraph
+        if previous is not None and self.admit(previous, page_edge=True):
+            yield previous
+
+    def admit(self, paragraph: Paragraph, page_edge: Optional[bool] = None) -> bool:
+        """Record ``paragraph`` and return whether it should be kept.
+
+        ``page_edge`` says whether the paragraph is first or last on its page;
+        when omitted only "first on its page" can be detected.
+        """
+        text = paragraph.text
+        page = paragraph.anchor.page
+        if page_edge is None:
+            page_edge = page is not None and page != self._last_page
+        self._last_page = page
+        self.stats.paragraphs += 1
+        exact_key = hashlib.blake2b(" ".join(text.lower().split()).encode("utf-8"), digest_size=16).digest()
+        original = self._exact.get(exact_key)
+        if original is not None:
+            self.stats.exact_duplicates += 1
+            self._record_removal(original, text)
+            return False
+
+        boilerplate = _boilerplate_form(text, page) if page is not None else None
+        candidate = boilerplate is not None and (page_edge or self._seen_on_pages(boilerplate.key, page))
+        signature = None
+        if candidate:
+            original = self._boilerplate_match(boilerplate)
+            if original is None and self.near_duplicates and len(boilerplate.tokens) >= MIN_MINHASH_TOKENS:
+                signature = self._minhash(set(boilerplate.tokens))
+                original = self._nearest(signature, boilerplate)
+            if original is not None:
+                self.stats.near_duplicates += 1
+                self._record_removal(original, text)
+                return False
+
+        kept_id = self.stats.kept
+        self.stats.kept += 1
+        self._exact[exact_key] = kept_id
+        if candidate:
+            self._candidates[kept_id] = boilerplate
+            self._boilerplate.setdefault(boilerplate.key, []).append((kept_id, boilerplate))
+            if signature is not None:
+                self._signatures[kept_id] = signature
+                for band, bucket in zip(_bands(signature), self._bands):
+                    bucket.setdefault(band, []).append(kept_id)
+        return True
+
+    def _seen_on_pages(self, key: bytes, page: int) -> bool:
+        pages, last_page = self._boilerplate_pages.get(key, (0, None))
+        if page != last_page:
+            pages += 1
+            self._boilerplate_pages[key] = (pages, page)
+        return pages >= MIN_REPEAT_PAGES
+
+    def _boilerplate_match(self, boilerplate: _Boilerplate) -> Optional[int]:
+        for kept_id, kept in self._boilerplate.get(boilerplate.key, ()):
+            if kept.matches(boilerplate):
+                return kept_id
+        return None
+
+    def _record_removal(self, original: int, text: str) -> None:
+        self.stats.removed_chars += len(text)
+        label = self._repeat_labels.setdefault(original, anchor_snippet(text, limit=80))
+        self.stats.repeated[label] = self.stats.repeated.get(label, 0) + 1
+
+    def _nearest(self, signature: array, boilerplate: _Boilerplate) -> Optional[int]:
+        needed = self.similarity * _NUM_HASHES
+        checked = set()
+        for band, bucket in zip(_bands(signature), self._bands):
+            for kept_id in bucket.get(band, ()):
+                if kept_id in checked:
+                    continue
+                checked.add(kept_id)
+                if not self._candidates[kept_id].matches(boilerplate):
+                    continue
+                if sum(map(operator.eq, signature, self._signatures[kept_id])) >= needed:
+                    return kept_id
+        return None
+
+    def _minhash(self, tokens: Iterable[str]) -> array:
+        cache = self._token_hashes
+        hashes = []
+        for token in tokens:
+            values = cache.get(token)
+            if values is None:
+                if len(cache) >= _TOKEN_CACHE_SIZE:
+                    cache.clear()
+                digest = hashlib.blake2b(token.encode("utf-8"), digest_size=_TOKEN_HASH.size).digest()
+                values = cache[token] = _TOKEN_HASH.unpack(digest)
+            hashes.append(values)
+        return array("H", map(min, zip(*hashes)))
+
+
+def dedupe_paragraphs(
+    paragraphs: Iterable[Paragraph],
+    similarity: float = DEFAULT_SIMILARITY,
+    stats: Optional[DedupStats] = None,
+) -> Iterator[Paragraph]:
+    return ParagraphDeduplicator(similarity=similarity, stats=stats).filter(paragraphs)
+
+
+def dedupe_document(
+    document: NormalizedDocument,
+    similarity: float = DEFAULT_SIMILARITY,
+    tracer: Optional[PipelineTracer] = None,
+) -> Tuple[NormalizedDocument, DedupStats]:
+    """Copy of ``document`` without repeated paragraphs; anchors keep their original numbering."""
+    stats = DedupStats()
+    with (tracer or NULL_TRACER).stage("dedupe") as stage:
+        paragraphs = list(dedupe_paragraphs(document.paragraphs, similarity=similarity, stats=stats))
+        stage.add("paragraphs", stats.paragraphs)
+        stage.add("exact_duplicates", stats.exact_duplicates)
+        stage.add("near_duplicates", stats.near_duplicates)
+    deduped = replace(document, paragraphs=paragraphs, metadata={**document.metadata, "dedup": stats.to_dict()})
+    return deduped, stats
+
+
+def _boilerplate_form(text: str, page: int) -> Optional[_Boilerplate]:
+    tokens = _TOKEN.findall(text.lower())
+    if not tokens or len(tokens) > BOILERPLATE_MAX_TOKENS:
+        return None
+    folded: List[str] = []
+    page_offsets: List[int] = []
+    numbers: List[str] = []
+    for position, token in enumerate(tokens):
+        if _NUMBER.match(token):
+            if token.isdigit() and _is_page_counter(tokens, position):
+                folded.append(_PAGE_NUMBER)
+                page_offsets.append(int(token) - page)
+                continue
+            numbers.append(token)
+        folded.append(token)
+    negations = sorted(token for token in tokens if token in _NEGATIONS or token.endswith("n't"))
+    key = hashlib.blake2b(" ".join(folded).encode("utf-8"), digest_size=16).digest()
+    return _Boilerplate(key, tuple(folded), tuple(page_offsets), tuple(numbers), tuple(negations))
+
+
+def _is_page_counter(tokens: List[str], position: int) -> bool:
+    """"Page 12", "p 12", "12 of 300", or a paragraph that is just the number."""
+    if len(tokens) == 1:
+        return True
+    if position > 0 and tokens[position - 1] in _PAGE_WORDS:
+        return True
+    return position + 2 < len(tokens) and tokens[position + 1] == "of" and tokens[position + 2].isdigit()
+
+
+def _bands(signature: array) -> Iterator[int]:
+    for start in range(0, _NUM_HASHES, _BAND_ROWS):
+        yield hash(tuple(signature[start : start + _BAND_ROWS]))
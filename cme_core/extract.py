@@ -1,5 +1,5 @@
 from __future__ import annotations
 
-from .chunking import extract_chunks
+from .chunking import extract_chunks, iter_chunks
 
-__all__ = ["extract_chunks"]
+__all__ = ["extract_chunks", "iter_chunks"]
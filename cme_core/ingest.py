@@ -1,12 +1,29 @@
 from __future__ import annotations
 
-from .ingest_pdf import ingest_pdf_bytes, ingest_pdf_path
-from .ingest_url import document_from_html, fetch_html, ingest_url
+from .ingest_pdf import PdfParagraphStream, ingest_pdf_bytes, ingest_pdf_path, stream_pdf_bytes, stream_pdf_path
+from .ingest_url import (
+    HtmlParagraphStream,
+    UrlIngestResult,
+    create_session,
+    document_from_html,
+    fetch_html,
+    ingest_url,
+    ingest_urls,
+    stream_url,
+)
 
 __all__ = [
+    "HtmlParagraphStream",
+    "PdfParagraphStream",
+    "UrlIngestResult",
+    "create_session",
     "document_from_html",
     "fetch_html",
     "ingest_pdf_bytes",
     "ingest_pdf_path",
     "ingest_url",
+    "ingest_urls",
+    "stream_pdf_bytes",
+    "stream_pdf_path",
+    "stream_url",
 ]
@@ -2,74 +2,321 @@ from __future__ import annotations
 
 import hashlib
 import io
+import logging
+import multiprocessing.util
 import re
+import weakref
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, BinaryIO, Deque, Dict, Iterator, List, Optional, Sequence, Tuple, Union
 
-from .models import NormalizedDocument, Paragraph, SourceAnchor
+from .cache import DocumentCache
+from .models import NormalizedDocument, Paragraph, ParagraphStore, SourceAnchor, anchor_snippet
+from .tracing import NULL_TRACER, PipelineTracer
 
 
 class PdfIngestError(RuntimeError):
     """Raised when PDF ingestion fails cleanly."""
 
 
-def ingest_pdf_path(path: str | Path) -> NormalizedDocument:
+LOGGER = logging.getLogger("neurocme.ingest")
+DEFAULT_PAGE_WINDOW = 8
+# Bump when extraction output changes so cached documents are not reused.
+PDF_INGEST_VERSION = 1
+
+
+class PdfParagraphStream:
+    """Page-by-page paragraph stream over a PDF.
+
+    Iterating yields ``Paragraph`` objects with global paragraph numbering while
+    holding at most ``page_window`` pages of extracted text at a time. The title
+    and paragraph count are final once the stream is exhausted.
+
+    With ``workers > 1`` page windows are extracted in a process pool; each worker
+    opens its own ``PdfReader`` on the same bytes or path, and results are merged
+    back in page order so numbering and anchors match the serial path.
+    """
+
+    def __init__(
+        self,
+        source: Union[bytes, str, Path],
+        source_name: Optional[str] = None,
+        page_window: int = DEFAULT_PAGE_WINDOW,
+        workers: int = 1,
+        content_hash: Optional[str] = None,
+    ) -> None:
+        if page_window < 1:
+            raise ValueError("page_window must be at least 1")
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if isinstance(source, bytes):
+            self.source_name = source_name or "uploaded.pdf"
+        else:
+            source = Path(source)
+            self.source_name = source_name or source.name
+        self.page_window = page_window
+        self.workers = workers
+        self._source: Union[bytes, Path] = source
+        # Keep a file handle open for paths so pypdf reads pages lazily instead of
+        # slurping the whole file into memory.
+        self._handle: Optional[BinaryIO] = None if isinstance(source, bytes) else open(source, "rb")
+        # Closes the handle even when a consumer abandons the stream without exhausting or closing it.
+        self._finalizer = weakref.finalize(self, self._handle.close) if self._handle is not None else None
+        try:
+            self.reader = _open_reader(io.BytesIO(source) if isinstance(source, bytes) else self._handle)
+            self.page_count = len(self.reader.pages)
+        except Exception:
+            self.close()
+            raise
+        self.content_hash = content_hash or pdf_content_hash(source)
+        self.document_id = self.content_hash[:12]
+        self.title: Optional[str] = None
+        self.paragraph_count = 0
+        self.exhausted = False
+
+    def __iter__(self) -> Iterator[Paragraph]:
+        if self.exhausted or self.paragraph_count:
+            raise PdfIngestError("PDF paragraph stream can only be consumed once")
+        try:
+            for page_number, page_text in self._page_texts():
+                yield from self._page_paragraphs(page_text, page_number)
+        finally:
+            self.close()
+        self.exhausted = True
+        if not self.paragraph_count:
+            raise PdfIngestError("No readable text extracted from PDF")
+
+    def __enter__(self) -> "PdfParagraphStream":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._finalizer is not None:
+            self._finalizer()
+        self._handle = None
+
+    @property
+    def metadata(self) -> Dict[str, int]:
+        return {"page_count": self.page_count, "paragraph_count": self.paragraph_count}
+
+    def to_document(self, paragraphs: Sequence[Paragraph]) -> NormalizedDocument:
+        return NormalizedDocument(
+            document_id=self.document_id,
+            title=self.title or self.source_name,
+            source_type="pdf",
+            source_ref=self.source_name,
+            paragraphs=paragraphs,
+            metadata=self.metadata,
+        )
+
+    def _page_texts(self) -> Iterator[Tuple[int, str]]:
+        windows = [
+            (window_start + 1, min(window_start + self.page_window, self.page_count))
+            for window_start in range(0, self.page_count, self.page_window)
+        ]
+        if self.workers > 1 and len(windows) > 1:
+            yield from self._parallel_page_texts(windows)
+            return
+        for first_page, last_page in windows:
+            page_texts = _extract_page_window(self.reader, first_page, last_page)
+            yield from enumerate(page_texts, start=first_page)
+
+    def _parallel_page_texts(self, windows: List[Tuple[int, int]]) -> Iterator[Tuple[int, str]]:
+        source = self._source if isinstance(self._source, bytes) else str(self._source)
+        max_in_flight = self.workers * 2
+        executor = ProcessPoolExecutor(
+            max_workers=min(self.workers, len(windows)),
+            initializer=_init_extraction_worker,
+            initargs=(source,),
+        )
+        pending: Deque[Tuple[int, Any]] = deque()
+        remaining = iter(windows)
+        try:
+            for first_page, last_page in remaining:
+                pending.append((first_page, executor.submit(_extract_worker_window, first_page, last_page)))
+                if len(pending) >= max_in_flight:
+                    break
+            while pending:
+                first_page, future = pending.popleft()
+                next_window = next(remaining, None)
+                if next_window is not None:
+                    pending.append((next_window[0], executor.submit(_extract_worker_window, *next_window)))
+                yield from enumerate(future.result(), start=first_page)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _page_paragraphs(self, page_text: str, page_number: int) -> Iterator[Paragraph]:
+        if not page_text:
+            return
+        if self.title is None:
+            first_line = next((line.strip() for line in page_text.splitlines() if line.strip()), None)
+            self.title = first_line or self.source_name
+        for paragraph in _extract_page_paragraphs(page_text, page_number):
+            self.paragraph_count += 1
+            anchor = SourceAnchor(
+                page=page_number,
+                paragraph=self.paragraph_count,
+                section=paragraph.section_heading,
+                snippet=paragraph.anchor.snippet,
+            )
+            yield Paragraph(text=paragraph.text, anchor=anchor, section_heading=paragraph.section_heading)
+
+
+def stream_pdf_bytes(
+    pdf_bytes: bytes,
+    source_name: str = "uploaded.pdf",
+    page_window: int = DEFAULT_PAGE_WINDOW,
+    workers: int = 1,
+) -> PdfParagraphStream:
+    return PdfParagraphStream(pdf_bytes, source_name=source_name, page_window=page_window, workers=workers)
+
+
+def stream_pdf_path(
+    path: str | Path,
+    page_window: int = DEFAULT_PAGE_WINDOW,
+    workers: int = 1,
+) -> PdfParagraphStream:
+    return PdfParagraphStream(Path(path), page_window=page_window, workers=workers)
+
+
+def ingest_pdf_path(
+    path: str | Path,
+    workers: int = 1,
+    cache: Optional[DocumentCache] = None,
+    tracer: Optional[PipelineTracer] = None,
+) -> NormalizedDocument:
     pdf_path = Path(path)
-    return ingest_pdf_bytes(pdf_path.read_bytes(), source_name=pdf_path.name)
+    return _ingest_cached(pdf_path, pdf_path.name, workers, cache, tracer or NULL_TRACER)
+
+
+def ingest_pdf_bytes(
+    pdf_bytes: bytes,
+    source_name: str = "uploaded.pdf",
+    workers: int = 1,
+    cache: Optional[DocumentCache] = None,
+    tracer: Optional[PipelineTracer] = None,
+) -> NormalizedDocument:
+    return _ingest_cached(pdf_bytes, source_name, workers, cache, tracer or NULL_TRACER)
 
 
-def ingest_pdf_bytes(pdf_bytes: bytes, source_name: str = "uploaded.pdf") -> NormalizedDocument:
+def pdf_content_hash(source: Union[bytes, str, Path]) -> str:
+    digest = hashlib.sha1()
+    if isinstance(source, bytes):
+        digest.update(source)
+    else:
+        with open(source, "rb") as handle:
+            for block in iter(lambda: handle.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def pdf_cache_key(content_hash: str) -> str:
+    return f"pdf-{content_hash}-v{PDF_INGEST_VERSION}"
+
+
+def _ingest_cached(
+    source: Union[bytes, Path],
+    source_name: str,
+    workers: int,
+    cache: Optional[DocumentCache],
+    tracer: PipelineTracer,
+) -> NormalizedDocument:
+    with tracer.stage("ingest_pdf") as stage:
+        content_hash = pdf_content_hash(source)
+        if cache is not None:
+            cached = cache.get(pdf_cache_key(content_hash))
+            if cached is not None:
+                stage.add("cache_hits")
+                stage.add("paragraphs", len(cached.paragraphs))
+                return replace(cached, source_ref=source_name)
+        with PdfParagraphStream(source, source_name=source_name, workers=workers, content_hash=content_hash) as stream:
+            document = stream.to_document(ParagraphStore(stream))
+        stage.add("pages", stream.page_count)
+        stage.add("paragraphs", stream.paragraph_count)
+        if cache is not None:
+            try:
+                cache.put(pdf_cache_key(content_hash), document)
+            except OSError as exc:
+                # The cache is an optimization; a full or read-only cache dir must not fail the ingest.
+                LOGGER.warning("Could not cache PDF document %s: %s", document.document_id, exc)
+                stage.add("cache_write_errors")
+        return document
+
+
+def _open_reader(stream: BinaryIO):
     try:
         from pypdf import PdfReader
     except ImportError as exc:  # pragma: no cover - guarded by install docs
         raise PdfIngestError("pypdf is required for PDF ingestion") from exc
 
     try:
-        reader = PdfReader(io.BytesIO(pdf_bytes))
+        return PdfReader(stream)
     except Exception as exc:
         raise PdfIngestError(f"Could not read PDF: {exc}") from exc
 
-    paragraphs: List[Paragraph] = []
-    global_paragraph_index = 0
-    extracted_title: Optional[str] = None
 
-    for page_number, page in enumerate(reader.pages, start=1):
-        page_text = page.extract_text() or ""
-        page_text = page_text.replace("\x00", " ").strip()
-        if not page_text:
-            continue
-        if extracted_title is None:
-            first_line = next((line.strip() for line in page_text.splitlines() if line.strip()), None)
-            extracted_title = first_line or source_name
-        page_paragraphs = _extract_page_paragraphs(page_text, page_number)
-        for paragraph in page_paragraphs:
-            global_paragraph_index += 1
-            anchor = SourceAnchor(
-                page=page_number,
-                paragraph=global_paragraph_index,
-                section=paragraph.section_heading,
-                snippet=paragraph.anchor.snippet,
-            )
-            paragraphs.append(
-                Paragraph(
-                    text=paragraph.text,
-                    anchor=anchor,
-                    section_heading=paragraph.section_heading,
-                )
-            )
+def _release_object_cache(reader) -> None:
+    # Parsed content streams accumulate in pypdf's object cache; dropping it after
+    # each window bounds memory by the window instead of the whole book. The cache
+    # is private, so only touch it on pypdf releases where it is known to be a
+    # plain re-resolvable dict.
+    if not _pypdf_cache_release_supported():
+        return
+    cache = getattr(reader, "resolved_objects", None)
+    if isinstance(cache, dict):
+        cache.clear()
 
-    if not paragraphs:
-        raise PdfIngestError("No readable text extracted from PDF")
 
-    document_id = hashlib.sha1(f"pdf::{source_name}::{len(pdf_bytes)}".encode("utf-8")).hexdigest()[:12]
-    return NormalizedDocument(
-        document_id=document_id,
-        title=extracted_title or source_name,
-        source_type="pdf",
-        source_ref=source_name,
-        paragraphs=paragraphs,
-        metadata={"page_count": len(reader.pages), "paragraph_count": len(paragraphs)},
-    )
+# pypdf major versions whose ``PdfReader.resolved_objects`` is safe to clear.
+_CACHE_RELEASE_PYPDF_MAJORS = range(3, 7)
+_CACHE_RELEASE_SUPPORTED: Optional[bool] = None
+
+
+def _pypdf_cache_release_supported() -> bool:
+    global _CACHE_RELEASE_SUPPORTED
+    if _CACHE_RELEASE_SUPPORTED is None:
+        try:
+            import pypdf
+
+            major = int(pypdf.__version__.split(".", 1)[0])
+        except (ImportError, AttributeError, ValueError):
+            major = -1
+        _CACHE_RELEASE_SUPPORTED = major in _CACHE_RELEASE_PYPDF_MAJORS
+    return _CACHE_RELEASE_SUPPORTED
+
+
+def _extract_page_window(reader, first_page: int, last_page: int) -> List[str]:
+    page_texts = [_page_text(reader.pages[page_number - 1]) for page_number in range(first_page, last_page + 1)]
+    _release_object_cache(reader)
+    return page_texts
+
+
+_WORKER_READER = None
+
+
+def _init_extraction_worker(source: Union[bytes, str]) -> None:
+    global _WORKER_READER
+    stream = io.BytesIO(source) if isinstance(source, bytes) else open(source, "rb")
+    # Pool workers leave through multiprocessing's exit hooks, not atexit, so register the close there.
+    multiprocessing.util.Finalize(None, stream.close, exitpriority=10)
+    try:
+        _WORKER_READER = _open_reader(stream)
+    except Exception:
+        stream.close()
+        raise
+
+
+def _extract_worker_window(first_page: int, last_page: int) -> List[str]:
+    return _extract_page_window(_WORKER_READER, first_page, last_page)
+
+
+def _page_text(page) -> str:
+    page_text = page.extract_text() or ""
+    return page_text.replace("\x00", " ").strip()
 
 
 def _extract_page_paragraphs(page_text: str, page_number: int) -> List[Paragraph]:
@@ -88,7 +335,7 @@ def _extract_page_paragraphs(page_text: str, page_number: int) -> List[Paragraph
         paragraphs.append(
             Paragraph(
                 text=text,
-                anchor=SourceAnchor(page=page_number, section=current_heading, snippet=_snippet(text)),
+                anchor=SourceAnchor(page=page_number, section=current_heading, snippet=anchor_snippet(text)),
                 section_heading=current_heading,
             )
         )
@@ -121,10 +368,3 @@ def _is_heading(line: str) -> bool:
     if len(words) <= 8 and sum(word[:1].isupper() for word in words) >= max(1, len(words) - 1):
         return True
     return False
-
-
-def _snippet(text: str, limit: int = 180) -> str:
-    compact = re.sub(r"\s+", " ", text).strip()
-    if len(compact) <= limit:
-        return compact
-    return compact[: limit - 3].rstrip() + "..."
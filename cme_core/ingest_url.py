@@ -1,30 +1,90 @@
 from __future__ import annotations
 
+import codecs
 import hashlib
+import importlib.util
 import re
-from typing import List, Optional
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
 
-from .models import NormalizedDocument, Paragraph, SourceAnchor
+from .cache import CachedResponse, HttpCache
+from .models import NormalizedDocument, Paragraph, SourceAnchor, anchor_snippet
+from .tracing import NULL_TRACER, PipelineTracer
 
 USER_AGENT = "NeuroCME-HighYieldCoach/0.1 (+educational-use)"
+REQUEST_HEADERS = {"User-Agent": USER_AGENT, "Accept": "text/html,application/xhtml+xml"}
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_PER_HOST_LIMIT = 4
+# Fastest first; "html.parser" is the stdlib parser and the default, the others are opt-in.
+HTML_BACKENDS = ("lxml", "selectolax", "html.parser")
+DEFAULT_HTML_BACKEND = "html.parser"
+BLOCK_TAGS = ["h1", "h2", "h3", "h4", "h5", "h6", "p", "li"]
+_AVAILABLE_HTML_BACKENDS: Optional[List[str]] = None
+DEFAULT_MAX_HTML_BYTES = 16 * 1024 * 1024
+DEFAULT_HTML_CHUNK_SIZE = 64 * 1024
+_TEXTLESS_TAGS = {"script", "style", "template"}
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+# Start tags that implicitly close an open <p>, and the elements that bound that search (HTML5 rules).
+_P_CLOSING_TAGS = set(
+    "address article aside blockquote dd details div dl dt fieldset figcaption figure footer form h1 h2 h3 h4 h5 h6 "
+    "header hr li main menu nav ol p pre section summary table ul".split()
+)
+_P_SCOPE_TAGS = {"button", "caption", "html", "marquee", "object", "table", "td", "template", "th"}
+_LIST_TAGS = {"menu", "ol", "table", "td", "template", "th", "ul"}
 
 
 class UrlIngestError(RuntimeError):
     """Raised when URL ingestion fails cleanly."""
 
 
-def fetch_html(url: str, timeout: int = 15) -> str:
-    try:
-        import requests
-    except ImportError as exc:  # pragma: no cover - guarded by install docs
-        raise UrlIngestError("requests is required for URL ingestion") from exc
+@dataclass(frozen=True)
+class UrlIngestResult:
+    """Outcome of one URL in a batch: a document, or the error that stopped it."""
+
+    url: str
+    document: Optional[NormalizedDocument] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.document is not None
+
+
+def create_session(pool_size: int = DEFAULT_MAX_CONCURRENCY):
+    """Return a keep-alive ``requests.Session`` whose pool holds ``pool_size`` connections per host."""
+    requests = _require_requests()
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    session.headers.update(REQUEST_HEADERS)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def fetch_html(url: str, timeout: int = 15, session=None, cache: Optional[HttpCache] = None) -> str:
+    """Fetch a page's HTML, serving and revalidating it through ``cache`` when given."""
+    requests = _require_requests()
+    cached = cache.get(url) if cache is not None else None
+    if cached is not None and cache.is_fresh(cached):
+        return cached.text
+    headers = {**REQUEST_HEADERS, **cached.validators()} if cached is not None else REQUEST_HEADERS
 
     try:
-        response = requests.get(
-            url,
-            timeout=timeout,
-            headers={"User-Agent": USER_AGENT, "Accept": "text/html,application/xhtml+xml"},
-        )
+        get = session.get if session is not None else requests.get
+        response = get(url, timeout=timeout, headers=headers)
+        if cached is not None and response.status_code == 304:
+            return cache.refresh(
+                cached,
+                etag=response.headers.get("etag"),
+                last_modified=response.headers.get("last-modified"),
+            ).text
         response.raise_for_status()
     except requests.RequestException as exc:
         raise UrlIngestError(f"Could not fetch URL: {exc}") from exc
@@ -32,20 +92,128 @@ def fetch_html(url: str, timeout: int = 15) -> str:
     content_type = response.headers.get("content-type", "")
     if "html" not in content_type and not response.text.lstrip().startswith("<"):
         raise UrlIngestError("URL did not return HTML content")
+    if cache is not None and "no-store" not in response.headers.get("cache-control", "").lower():
+        cache.put(
+            CachedResponse(
+                url=url,
+                text=response.text,
+                content_type=content_type,
+                etag=response.headers.get("etag"),
+                last_modified=response.headers.get("last-modified"),
+                fetched_at=time.time(),
+            )
+        )
     return response.text
 
 
-def ingest_url(url: str, timeout: int = 15) -> NormalizedDocument:
-    html = fetch_html(url, timeout=timeout)
-    return document_from_html(html=html, url=url)
+def ingest_url(
+    url: str,
+    timeout: int = 15,
+    cache: Optional[HttpCache] = None,
+    tracer: Optional[PipelineTracer] = None,
+) -> NormalizedDocument:
+    tracer = tracer or NULL_TRACER
+    with tracer.stage("fetch_html") as stage:
+        html = fetch_html(url, timeout=timeout, cache=cache)
+        stage.add("characters", len(html))
+    with tracer.stage("parse_html") as stage:
+        document = document_from_html(html=html, url=url)
+        stage.add("paragraphs", len(document.paragraphs))
+    return document
 
 
-def document_from_html(html: str, url: str, title: Optional[str] = None) -> NormalizedDocument:
+def ingest_urls(
+    urls: Iterable[str],
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+    timeout: int = 15,
+    parse_workers: int = 1,
+    session=None,
+    cache: Optional[HttpCache] = None,
+) -> List[UrlIngestResult]:
+    """Fetch and parse many URLs concurrently, returning one result per URL in input order.
+
+    Fetches share one pooled keep-alive session across ``max_concurrency`` threads,
+    with at most ``per_host_limit`` requests in flight per host; URLs whose host is
+    at its limit wait in a per-host queue instead of occupying a pool thread.
+    Parsing runs in the calling thread as pages arrive, or in a process pool when
+    ``parse_workers > 1``. Any failure, including unexpected parser or worker
+    errors, is reported on the matching ``UrlIngestResult`` instead of raised.
+    """
+    if max_concurrency < 1 or per_host_limit < 1 or parse_workers < 1:
+        raise ValueError("max_concurrency, per_host_limit and parse_workers must be at least 1")
+    urls = list(urls)
+    results: List[Optional[UrlIngestResult]] = [None] * len(urls)
+    if not urls:
+        return []
+    owned_session = session is None
+    session = session or create_session(max_concurrency)
+    queued: Dict[str, Deque[int]] = {}
+    for index, url in enumerate(urls):
+        queued.setdefault(urlsplit(url).netloc.lower(), deque()).append(index)
+    host_in_flight = dict.fromkeys(queued, 0)
+    max_in_flight = min(max_concurrency, len(urls))
+
+    parser = ProcessPoolExecutor(max_workers=parse_workers) if parse_workers > 1 else None
+    parses: Dict[int, Future] = {}
     try:
-        from bs4 import BeautifulSoup
-    except ImportError as exc:  # pragma: no cover - guarded by install docs
-        raise UrlIngestError("beautifulsoup4 is required for URL ingestion") from exc
+        with ThreadPoolExecutor(max_workers=max_in_flight) as fetchers:
+            fetches: Dict[Future, Tuple[int, str]] = {}
+
+            def submit_ready() -> None:
+                for host in list(queued):
+                    waiting = queued[host]
+                    while waiting and host_in_flight[host] < per_host_limit and len(fetches) < max_in_flight:
+                        index = waiting.popleft()
+                        future = fetchers.submit(fetch_html, urls[index], timeout=timeout, session=session, cache=cache)
+                        fetches[future] = (index, host)
+                        host_in_flight[host] += 1
+                    if not waiting:
+                        del queued[host]
+
+            submit_ready()
+            while fetches:
+                done, _ = wait(fetches, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, host = fetches.pop(future)
+                    host_in_flight[host] -= 1
+                    url = urls[index]
+                    try:
+                        html = future.result()
+                        if parser is not None:
+                            parses[index] = parser.submit(document_from_html, html, url)
+                        else:
+                            results[index] = UrlIngestResult(url, document=document_from_html(html=html, url=url))
+                    except Exception as exc:
+                        results[index] = UrlIngestResult(url, error=_error_message(exc))
+                submit_ready()
+        for index, future in parses.items():
+            try:
+                results[index] = UrlIngestResult(urls[index], document=future.result())
+            except Exception as exc:
+                results[index] = UrlIngestResult(urls[index], error=_error_message(exc))
+    finally:
+        if parser is not None:
+            parser.shutdown(wait=True, cancel_futures=True)
+        if owned_session:
+            session.close()
+    return [result for result in results if result is not None]
+
 
+def document_from_html(
+    html: str,
+    url: str,
+    title: Optional[str] = None,
+    backend: Optional[str] = None,
+) -> NormalizedDocument:
+    """Normalize an HTML page, parsing each distinct input at most once.
+
+    ``backend`` picks the HTML parser from ``HTML_BACKENDS``. The default,
+    ``html.parser``, gives the same paragraphs whichever optional packages are
+    installed; ``lxml`` and ``selectolax`` are faster but opt-in, since their
+    recovery from malformed markup can differ in rare cases.
+    """
+    backend = select_html_backend(backend)
     readable_html = html
     readable_title = title
     try:
@@ -57,22 +225,23 @@ def document_from_html(html: str, url: str, title: Optional[str] = None) -> Norm
     except Exception:
         readable_html = html
 
-    soup = BeautifulSoup(readable_html, "html.parser")
+    tree = parse_html(readable_html, backend)
+    page = tree if readable_html is html else None
     if readable_title is None:
-        title_tag = soup.find("title")
-        readable_title = title_tag.get_text(" ", strip=True) if title_tag else "Untitled URL Document"
+        readable_title = tree.title() or "Untitled URL Document"
 
-    paragraphs = _extract_paragraphs_from_soup(soup)
-    if not paragraphs:
-        full_soup = BeautifulSoup(html, "html.parser")
-        paragraphs = _extract_paragraphs_from_soup(full_soup)
+    paragraphs = _extract_paragraphs(tree)
+    if not paragraphs and page is not tree:
+        page = parse_html(html, backend)
+        paragraphs = _extract_paragraphs(page)
     if not paragraphs:
-        text = BeautifulSoup(html, "html.parser").get_text("\n", strip=True)
+        page = page or parse_html(html, backend)
+        text = page.text("\n")
         raw_parts = [part.strip() for part in re.split(r"\n{2,}", text) if part.strip()]
         paragraphs = [
             Paragraph(
                 text=part,
-                anchor=SourceAnchor(paragraph=index + 1, section="Body", snippet=_snippet(part)),
+                anchor=SourceAnchor(paragraph=index + 1, section="Body", snippet=anchor_snippet(part)),
                 section_heading="Body",
             )
             for index, part in enumerate(raw_parts)
@@ -80,9 +249,8 @@ def document_from_html(html: str, url: str, title: Optional[str] = None) -> Norm
     if not paragraphs:
         raise UrlIngestError("No readable article content found in URL")
 
-    document_id = hashlib.sha1(f"url::{url}".encode("utf-8")).hexdigest()[:12]
     return NormalizedDocument(
-        document_id=document_id,
+        document_id=_url_document_id(url),
         title=readable_title or "Untitled URL Document",
         source_type="url",
         source_ref=url,
@@ -91,16 +259,449 @@ def document_from_html(html: str, url: str, title: Optional[str] = None) -> Norm
     )
 
 
-def _extract_paragraphs_from_soup(soup) -> List[Paragraph]:
+class StreamingHtmlExtractor:
+    """Incremental paragraph extractor for HTML that arrives in chunks.
+
+    ``feed`` returns the paragraphs completed by each chunk, using the same
+    heading and paragraph rules as ``document_from_html``. Open ``<p>`` and
+    ``<li>`` elements are closed implicitly the way HTML5 parsers do, so a page
+    that never closes its paragraphs still streams one paragraph at a time. Once
+    ``max_paragraphs`` have been emitted the extractor is ``done`` and ignores
+    further input.
+    """
+
+    def __init__(self, max_paragraphs: Optional[int] = None) -> None:
+        if max_paragraphs is not None and max_paragraphs < 1:
+            raise ValueError("max_paragraphs must be at least 1")
+        self.max_paragraphs = max_paragraphs
+        self.paragraph_count = 0
+        self.done = False
+        self._current_heading = "Overview"
+        self._ready: List[Paragraph] = []
+        self._tokenizer = _BlockTokenizer(self._block_completed)
+
+    @property
+    def title(self) -> Optional[str]:
+        return self._tokenizer.title
+
+    def feed(self, chunk: str) -> List[Paragraph]:
+        if not self.done:
+            self._tokenizer.feed(chunk)
+        return self._take_ready()
+
+    def close(self) -> List[Paragraph]:
+        if not self.done:
+            self._tokenizer.close()
+        return self._take_ready()
+
+    def truncate(self) -> List[Paragraph]:
+        """Emit the elements still open, ignoring any markup cut off before it was parsed."""
+        if not self.done:
+            self._tokenizer.close_open_elements()
+        return self._take_ready()
+
+    def _take_ready(self) -> List[Paragraph]:
+        ready, self._ready = self._ready, []
+        return ready
+
+    def _block_completed(self, tag: str, parts: List[str]) -> None:
+        if self.done:
+            return
+        text = re.sub(r"\s+", " ", _joined_text(parts, " ")).strip()
+        if not text:
+            return
+        if tag.startswith("h"):
+            self._current_heading = text
+            return
+        if len(text) < 35:
+            return
+        self.paragraph_count += 1
+        self._ready.append(
+            Paragraph(
+                text=text,
+                anchor=SourceAnchor(
+                    paragraph=self.paragraph_count,
+                    section=self._current_heading,
+                    snippet=anchor_snippet(text),
+                ),
+                section_heading=self._current_heading,
+            )
+        )
+        if self.max_paragraphs is not None and self.paragraph_count >= self.max_paragraphs:
+            self.done = True
+
+
+class HtmlParagraphStream:
+    """Paragraph stream over an HTML page read from the network in chunks.
+
+    Iterating streams the response body through ``StreamingHtmlExtractor`` and
+    yields paragraphs as soon as they close, so no full copy of the body is
+    kept. Reading stops after ``max_bytes`` of body (``truncated`` is then set,
+    and the text read so far of any still open element is yielded) or once
+    ``max_paragraphs`` paragraphs were yielded. The page is not passed through
+    readability.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        timeout: int = 15,
+        session=None,
+        max_bytes: int = DEFAULT_MAX_HTML_BYTES,
+        max_paragraphs: Optional[int] = None,
+        chunk_size: int = DEFAULT_HTML_CHUNK_SIZE,
+    ) -> None:
+        if max_bytes < 1 or chunk_size < 1:
+            raise ValueError("max_bytes and chunk_size must be at least 1")
+        self.url = url
+        self.timeout = timeout
+        self.session = session
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.extractor = StreamingHtmlExtractor(max_paragraphs=max_paragraphs)
+        self.bytes_read = 0
+        self.truncated = False
+        self.exhausted = False
+
+    @property
+    def title(self) -> Optional[str]:
+        return self.extractor.title
+
+    @property
+    def paragraph_count(self) -> int:
+        return self.extractor.paragraph_count
+
+    @property
+    def metadata(self) -> Dict[str, object]:
+        return {"paragraph_count": self.paragraph_count, "bytes_read": self.bytes_read, "truncated": self.truncated}
+
+    def __iter__(self) -> Iterator[Paragraph]:
+        if self.exhausted or self.bytes_read:
+            raise UrlIngestError("HTML paragraph stream can only be consumed once")
+        requests = _require_requests()
+        try:
+            get = self.session.get if self.session is not None else requests.get
+            response = get(self.url, timeout=self.timeout, headers=REQUEST_HEADERS, stream=True)
+            response.raise_for_status()
+        except requests.RequestException as exc:
+            raise UrlIngestError(f"Could not fetch URL: {exc}") from exc
+        try:
+            yield from self._paragraphs(response)
+        except requests.RequestException as exc:
+            raise UrlIngestError(f"Could not read URL: {exc}") from exc
+        finally:
+            response.close()
+        self.exhausted = True
+        if not self.paragraph_count:
+            raise UrlIngestError("No readable article content found in URL")
+
+    def to_document(self, paragraphs: List[Paragraph]) -> NormalizedDocument:
+        return NormalizedDocument(
+            document_id=_url_document_id(self.url),
+            title=self.title or "Untitled URL Document",
+            source_type="url",
+            source_ref=self.url,
+            paragraphs=paragraphs,
+            metadata=self.metadata,
+        )
+
+    def _paragraphs(self, response) -> Iterator[Paragraph]:
+        content_type = response.headers.get("content-type", "")
+        decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+        checked = "html" in content_type
+        for chunk in response.iter_content(chunk_size=self.chunk_size):
+            remaining = self.max_bytes - self.bytes_read
+            if len(chunk) > remaining:
+                chunk = chunk[:remaining]
+                self.truncated = True
+            self.bytes_read += len(chunk)
+            text = decoder.decode(chunk)
+            if not checked and text.strip():
+                if not text.lstrip().startswith("<"):
+                    raise UrlIngestError("URL did not return HTML content")
+                checked = True
+            yield from self.extractor.feed(text)
+            if self.truncated or self.extractor.done:
+                break
+        if self.truncated:
+            yield from self.extractor.truncate()
+        else:
+            self.extractor.feed(decoder.decode(b"", final=True))
+            yield from self.extractor.close()
+
+
+def stream_url(
+    url: str,
+    timeout: int = 15,
+    session=None,
+    max_bytes: int = DEFAULT_MAX_HTML_BYTES,
+    max_paragraphs: Optional[int] = None,
+) -> HtmlParagraphStream:
+    return HtmlParagraphStream(url, timeout=timeout, session=session, max_bytes=max_bytes, max_paragraphs=max_paragraphs)
+
+
+def _require_requests():
+    try:
+        import requests
+    except ImportError as exc:  # pragma: no cover - guarded by install docs
+        raise UrlIngestError("requests is required for URL ingestion") from exc
+    return requests
+
+
+def select_html_backend(preferred: Optional[str] = None) -> str:
+    """Return ``preferred`` (``DEFAULT_HTML_BACKEND`` when omitted) if it is installed."""
+    if preferred is not None and preferred not in HTML_BACKENDS:
+        raise ValueError(f"Unknown HTML backend: {preferred!r}")
+    available = available_html_backends()
+    if DEFAULT_HTML_BACKEND not in available:
+        raise UrlIngestError("beautifulsoup4 is required for URL ingestion")
+    if preferred is None:
+        return DEFAULT_HTML_BACKEND
+    if preferred not in available:
+        raise UrlIngestError(f"HTML backend {preferred!r} is not installed")
+    return preferred
+
+
+def parse_html(html: str, backend: Optional[str] = None):
+    """Parse ``html`` into a tree exposing ``title()``, ``blocks()`` and ``text()``."""
+    backend = select_html_backend(backend)
+    if backend == "lxml":
+        return _LxmlTree(html)
+    if backend == "selectolax":
+        return _SelectolaxTree(html)
+    return _SoupTree(html)
+
+
+class _SoupTree:
+    """Blocks and title from the same tokenizer as the streaming extractor; BeautifulSoup only for plain text."""
+
+    def __init__(self, html: str) -> None:
+        self.html = html
+        self._blocks: List[Tuple[str, str]] = []
+        tokenizer = _BlockTokenizer(lambda tag, parts: self._blocks.append((tag, _joined_text(parts, " "))))
+        tokenizer.feed(html)
+        tokenizer.close()
+        self._title = tokenizer.title
+
+    def title(self) -> Optional[str]:
+        return self._title
+
+    def blocks(self) -> Iterator[Tuple[str, str]]:
+        return iter(self._blocks)
+
+    def text(self, separator: str) -> str:
+        from bs4 import BeautifulSoup
+
+        return BeautifulSoup(self.html, "html.parser").get_text(separator, strip=True)
+
+
+class _LxmlTree:
+    def __init__(self, html: str) -> None:
+        import lxml.html
+        from lxml import etree
+
+        try:
+            self.root = lxml.html.document_fromstring(html)
+        except ValueError:
+            # lxml refuses str input that carries an XML encoding declaration.
+            parser = lxml.html.HTMLParser(encoding="utf-8")
+            self.root = lxml.html.document_fromstring(html.encode("utf-8"), parser=parser)
+        except etree.ParserError:
+            self.root = None
+        if self.root is not None:
+            # Match BeautifulSoup, whose get_text skips script/style contents, comments and
+            # processing instructions; the tails that follow them are real text and stay.
+            etree.strip_elements(
+                self.root, *_TEXTLESS_TAGS, etree.Comment, etree.ProcessingInstruction, with_tail=False
+            )
+
+    def title(self) -> Optional[str]:
+        title_tag = self.root.find(".//title") if self.root is not None else None
+        return _joined_text(title_tag.itertext(), " ") if title_tag is not None else None
+
+    def blocks(self) -> Iterator[Tuple[str, str]]:
+        if self.root is None:
+            return
+        for node in self.root.iter(*BLOCK_TAGS):
+            yield node.tag, _joined_text(node.itertext(), " ")
+
+    def text(self, separator: str) -> str:
+        if self.root is None:
+            return ""
+        return _joined_text(self.root.itertext(), separator)
+
+
+class _SelectolaxTree:
+    def __init__(self, html: str) -> None:
+        from selectolax.lexbor import LexborHTMLParser
+
+        self.tree = LexborHTMLParser(html)
+        # Match BeautifulSoup, whose get_text skips script and style contents.
+        self.tree.strip_tags(sorted(_TEXTLESS_TAGS))
+
+    def title(self) -> Optional[str]:
+        title_tag = self.tree.css_first("title")
+        return title_tag.text(separator=" ", strip=True) if title_tag is not None else None
+
+    def blocks(self) -> Iterator[Tuple[str, str]]:
+        for node in self.tree.css(",".join(BLOCK_TAGS)):
+            yield node.tag, node.text(separator=" ", strip=True)
+
+    def text(self, separator: str) -> str:
+        root = self.tree.root
+        return root.text(separator=separator, strip=True) if root is not None else ""
+
+
+def available_html_backends() -> List[str]:
+    """Installed HTML backends, fastest first."""
+    global _AVAILABLE_HTML_BACKENDS
+    if _AVAILABLE_HTML_BACKENDS is None:
+        installed = {
+            "selectolax": importlib.util.find_spec("selectolax") is not None
+            and importlib.util.find_spec("selectolax.lexbor") is not None,
+            "lxml": importlib.util.find_spec("lxml") is not None,
+            "html.parser": importlib.util.find_spec("bs4") is not None,
+        }
+        _AVAILABLE_HTML_BACKENDS = [backend for backend in HTML_BACKENDS if installed[backend]]
+    return _AVAILABLE_HTML_BACKENDS
+
+
+class _OpenElement:
+    __slots__ = ("tag", "start", "end")
+
+    def __init__(self, tag: str, start: Optional[int]) -> None:
+        self.tag = tag
+        # Block elements cover text pieces [start, end) of the tokenizer; end is set on close.
+        self.start = start
+        self.end: Optional[int] = None
+
+
+class _BlockTokenizer(HTMLParser):
+    """Tracks open elements and hands finished block elements back in start-tag order.
+
+    Text pieces are stored once and each block records the range it covers, so
+    nested or unclosed blocks do not copy text into every enclosing element.
+    """
+
+    def __init__(self, on_block) -> None:
+        super().__init__(convert_charrefs=True)
+        self.on_block = on_block
+        self.title: Optional[str] = None
+        self._title_parts: Optional[List[str]] = None
+        self._stack: List[_OpenElement] = []
+        self._pending_blocks: Deque[_OpenElement] = deque()
+        self._open_blocks = 0
+        self._pieces: List[str] = []
+        self._pieces_offset = 0
+        self._text: List[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        self._flush_text()
+        if tag in _TEXTLESS_TAGS:
+            self._skip_depth += 1
+        if tag == "title" and self._title_parts is None:
+            self._title_parts = []
+        if tag in _P_CLOSING_TAGS:
+            self._close_implied("p", _P_SCOPE_TAGS)
+        if tag == "li":
+            self._close_implied("li", _LIST_TAGS)
+        if tag in _VOID_TAGS:
+            return
+        is_block = tag in BLOCK_TAGS
+        element = _OpenElement(tag, self._pieces_offset + len(self._pieces) if is_block else None)
+        self._stack.append(element)
+        if is_block:
+            self._open_blocks += 1
+            self._pending_blocks.append(element)
+
+    def handle_endtag(self, tag: str) -> None:
+        self._flush_text()
+        for depth in range(len(self._stack) - 1, -1, -1):
+            if self._stack[depth].tag == tag:
+                self._pop_to(depth)
+                break
+
+    def handle_data(self, data: str) -> None:
+        # Text nodes can arrive in several calls across chunk boundaries; join them first.
+        self._text.append(data)
+
+    def handle_comment(self, data: str) -> None:
+        self._flush_text()
+
+    def close(self) -> None:
+        super().close()
+        self.close_open_elements()
+
+    def close_open_elements(self) -> None:
+        """Close everything still open, without parsing markup left in the buffer."""
+        self._flush_text()
+        self._pop_to(0)
+
+    def _flush_text(self) -> None:
+        if not self._text:
+            return
+        text = "".join(self._text)
+        self._text.clear()
+        if self.title is None and self._title_parts is not None and self._stack and self._stack[-1].tag == "title":
+            self._title_parts.append(text)
+        if self._open_blocks and not self._skip_depth:
+            self._pieces.append(text)
+
+    def _close_implied(self, tag: str, scope: Set[str]) -> None:
+        for depth in range(len(self._stack) - 1, -1, -1):
+            open_tag = self._stack[depth].tag
+            if open_tag == tag:
+                self._pop_to(depth)
+                return
+            if open_tag in scope:
+                return
+
+    def _pop_to(self, depth: int) -> None:
+        while len(self._stack) > depth:
+            element = self._stack.pop()
+            if element.start is not None:
+                element.end = self._pieces_offset + len(self._pieces)
+                self._open_blocks -= 1
+            if element.tag in _TEXTLESS_TAGS:
+                self._skip_depth -= 1
+            if element.tag == "title" and self.title is None and self._title_parts is not None:
+                self.title = _joined_text(self._title_parts, " ")
+        if not self._pending_blocks or self._pending_blocks[0].end is None:
+            return
+        offset = self._pieces_offset
+        while self._pending_blocks and self._pending_blocks[0].end is not None:
+            element = self._pending_blocks.popleft()
+            self.on_block(element.tag, self._pieces[element.start - offset : element.end - offset])
+        # Pieces before the earliest pending block can no longer be part of any block.
+        keep_from = self._pending_blocks[0].start if self._pending_blocks else offset + len(self._pieces)
+        del self._pieces[: keep_from - offset]
+        self._pieces_offset = keep_from
+
+
+def _error_message(exc: BaseException) -> str:
+    # Expected failures already read well; name the type of anything unexpected.
+    return str(exc) if isinstance(exc, UrlIngestError) else f"{type(exc).__name__}: {exc}"
+
+
+def _url_document_id(url: str) -> str:
+    return hashlib.sha1(f"url::{url}".encode("utf-8")).hexdigest()[:12]
+
+
+def _joined_text(parts: Iterable[str], separator: str) -> str:
+    # Same result as BeautifulSoup's get_text(separator, strip=True).
+    return separator.join(stripped for stripped in (part.strip() for part in parts) if stripped)
+
+
+def _extract_paragraphs(tree) -> List[Paragraph]:
     current_heading = "Overview"
     paragraphs: List[Paragraph] = []
     paragraph_index = 0
-    for node in soup.find_all(["h1", "h2", "h3", "h4", "h5", "h6", "p", "li"]):
-        text = node.get_text(" ", strip=True)
+    for tag, text in tree.blocks():
         text = re.sub(r"\s+", " ", text).strip()
         if not text:
             continue
-        if node.name.startswith("h"):
+        if tag.startswith("h"):
             current_heading = text
             continue
         if len(text) < 35:
@@ -112,16 +713,9 @@ def _extract_paragraphs_from_soup(soup) -> List[Paragraph]:
                 anchor=SourceAnchor(
                     paragraph=paragraph_index,
                     section=current_heading,
-                    snippet=_snippet(text),
+                    snippet=anchor_snippet(text),
                 ),
                 section_heading=current_heading,
             )
         )
     return paragraphs
-
-
-def _snippet(text: str, limit: int = 180) -> str:
-    compact = re.sub(r"\s+", " ", text).strip()
-    if len(compact) <= limit:
-        return compact
-    return compact[: limit - 3].rstrip() + "..."
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import hashlib
+import heapq
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .batch_scoring import TermCountMatrix
+from .chunking import extract_chunks
+from .models import AnalysisOptions, Chunk, NormalizedDocument, SourceAnchor, Topic
+from .outputs import SUMMARY_SENTENCE_LIMIT, SentenceIndex, build_key_decision_points, build_pitfalls
+from .rank import PreparedRanking, PreparedSeed, rerank
+from .scoring import ScoringConfig, chunk_term_counts, level_from_counts, load_scoring_config
+from .topics import derive_topic_label, lexicon_canonical, normalize_label
+from .tracing import NULL_TRACER, PipelineTracer
+
+DEFAULT_ANCHORS_PER_SOURCE = 3
+FLAGGED_SENTENCE_LIMIT = 3
+
+
+@dataclass
+class _TopicAccumulator:
+    """Running features of one merged topic; its size does not grow with source text."""
+
+    label: str
+    term_counts: Dict[str, int] = field(default_factory=dict)
+    anchors: List[SourceAnchor] = field(default_factory=list)
+    citations: List[str] = field(default_factory=list)
+    chunk_ids: List[str] = field(default_factory=list)
+    anchors_by_source: Dict[str, int] = field(default_factory=dict)
+    # Min-heap of (rank key, -arrival, sentence) holding the best SUMMARY_SENTENCE_LIMIT sentences.
+    ranked: List[Tuple[Tuple[int, int], int, str]] = field(default_factory=list)
+    pitfalls: List[str] = field(default_factory=list)
+    decision_points: List[str] = field(default_factory=list)
+    sentence_count: int = 0
+
+
+class LibraryRanker:
+    """Streaming ranker that merges topics across many documents.
+
+    Chunks are grouped by normalized topic label, with labels that mention a
+    ``TOPIC_LEXICON`` canonical folded into that canonical, so "Status Epilepticus"
+    from dozens of sources becomes one topic. Each group keeps summed term counts,
+    a bounded pool of best-ranked and flagged sentences, and at most
+    ``anchors_per_source`` anchors per document, so memory follows the number of
+    distinct topics and sources rather than the corpus text. Citations read
+    ``"<document title> | <anchor label>"``.
+    """
+
+    def __init__(
+        self,
+        scoring_config: Optional[ScoringConfig] = None,
+        anchors_per_source: int = DEFAULT_ANCHORS_PER_SOURCE,
+    ) -> None:
+        if anchors_per_source < 1:
+            raise ValueError("anchors_per_source must be at least 1")
+        self.scoring_config = scoring_config or load_scoring_config()
+        self.anchors_per_source = anchors_per_source
+        self.document_count = 0
+        self.chunk_count = 0
+        self._topics: Dict[str, _TopicAccumulator] = {}
+
+    @property
+    def topic_count(self) -> int:
+        return len(self._topics)
+
+    def add_document(self, document: NormalizedDocument, chunks: Optional[Sequence[Chunk]] = None) -> None:
+        source = document.title or document.source_ref
+        for chunk in extract_chunks(document) if chunks is None else chunks:
+            self._add_chunk(chunk, source)
+        self.document_count += 1
+
+    def prepare(self) -> PreparedRanking:
+        seeds = [self._prepared_seed(key, topic) for key, topic in self._topics.items()]
+        return PreparedRanking(
+            seeds=seeds,
+            matrix=TermCountMatrix([seed.term_counts for seed in seeds]),
+            scoring_config=self.scoring_config,
+        )
+
+    def rank(self, options: Optional[AnalysisOptions] = None, tracer: Optional[PipelineTracer] = None) -> List[Topic]:
+        return rerank(self.prepare(), options or AnalysisOptions(), tracer=tracer)
+
+    def _add_chunk(self, chunk: Chunk, source: str) -> None:
+        key, label = library_topic_key(derive_topic_label(chunk))
+        topic = self._topics.get(key)
+        if topic is None:
+            topic = self._topics[key] = _TopicAccumulator(label=label)
+        self.chunk_count += 1
+        for term, hits in chunk_term_counts(chunk).items():
+            topic.term_counts[term] = topic.term_counts.get(term, 0) + hits
+        source_key = f"{chunk.document_id}\x1f{source}"
+        for anchor in chunk.anchors:
+            if topic.anchors_by_source.get(source_key, 0) >= self.anchors_per_source:
+                break
+            topic.anchors_by_source[source_key] = topic.anchors_by_source.get(source_key, 0) + 1
+            topic.anchors.append(anchor)
+            topic.citations.append(f"{source} | {anchor.label}")
+            if not topic.chunk_ids or topic.chunk_ids[-1] != chunk.chunk_id:
+                topic.chunk_ids.append(chunk.chunk_id)
+        _pool_sentences(topic, SentenceIndex.from_text(chunk.text))
+
+    def _prepared_seed(self, key: str, topic: _TopicAccumulator) -> PreparedSeed:
+        ranked = [sentence for _, _, sentence in sorted(topic.ranked, reverse=True)]
+        pitfalls = topic.pitfalls or build_pitfalls("", topic.anchors)
+        decision_points = topic.decision_points or build_key_decision_points("", topic.anchors)
+        return PreparedSeed(
+            topic_id=hashlib.sha1(f"library:{key}".encode("utf-8")).hexdigest()[:12],
+            label=topic.label,
+            level=level_from_counts(topic.term_counts),
+            anchors=list(topic.anchors),
+            supporting_chunk_ids=list(topic.chunk_ids),
+            term_counts=dict(topic.term_counts),
+            ranked_sentences=ranked,
+            pitfalls=list(pitfalls),
+            key_decision_points=list(decision_points),
+            citations=list(topic.citations),
+        )
+
+
+def rank_library(
+    documents: Iterable[NormalizedDocument],
+    options: Optional[AnalysisOptions] = None,
+    scoring_config: Optional[ScoringConfig] = None,
+    anchors_per_source: int = DEFAULT_ANCHORS_PER_SOURCE,
+    tracer: Optional[PipelineTracer] = None,
+) -> List[Topic]:
+    """Rank merged topics over ``documents``, consuming them one at a time."""
+    tracer = tracer or NULL_TRACER
+    ranker = LibraryRanker(scoring_config=scoring_config, anchors_per_source=anchors_per_source)
+    with tracer.stage("accumulate_library") as stage:
+        for document in documents:
+            ranker.add_document(document)
+        stage.add("documents", ranker.document_count)
+        stage.add("chunks", ranker.chunk_count)
+        stage.add("topics", ranker.topic_count)
+    return ranker.rank(options, tracer=tracer)
+
+
+def library_topic_key(label: str) -> Tuple[str, str]:
+    """Merge key and display label; labels naming a lexicon topic fold into its canonical."""
+    canonical = lexicon_canonical(label.lower())
+    display = canonical or label
+    return normalize_label(display), display
+
+
+def _pool_sentences(topic: _TopicAccumulator, sentences: SentenceIndex) -> None:
+    for position, sentence in enumerate(sentences.sentences):
+        topic.sentence_count += 1
+        entry = (sentences.rank_keys[position], -topic.sentence_count, sentence)
+        if any(sentence == pooled for _, _, pooled in topic.ranked):
+            pass
+        elif len(topic.ranked) < SUMMARY_SENTENCE_LIMIT:
+            heapq.heappush(topic.ranked, entry)
+        elif entry > topic.ranked[0]:
+            heapq.heapreplace(topic.ranked, entry)
+        if sentences.pitfall_flags[position]:
+            _append_distinct(topic.pitfalls, sentence)
+        if sentences.decision_flags[position]:
+            _append_distinct(topic.decision_points, sentence)
+
+
+def _append_distinct(pool: List[str], sentence: str) -> None:
+    if len(pool) < FLAGGED_SENTENCE_LIMIT and sentence not in pool:
+        pool.append(sentence)
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+class TermMatcher:
+    """Single-pass matcher that counts every vocabulary term in one scan.
+
+    The vocabulary is compiled into a trie-shaped regular expression wrapped in a
+    lookahead, so the regex engine visits each text position once and reports the
+    longest term starting there. Every shorter term matching at that position is a
+    prefix of the longest hit, so the full Aho-Corasick style occurrence set is
+    recovered from a static prefix table without a per-character Python loop.
+
+    Counts follow ``len(re.findall(re.escape(term), text))`` per term, i.e.
+    non-overlapping substring occurrences. Terms that could overlap themselves
+    (``"target"`` inside ``"targetarget"``) carry internal witness strings; only
+    when a witness is seen is that single term recounted exactly. With
+    ``word_boundary=True`` a hit must not be embedded inside a larger word, so
+    ``"if"`` no longer matches inside ``"significant"``.
+    """
+
+    def __init__(self, terms: Iterable[str], word_boundary: bool = False) -> None:
+        self.terms: Tuple[str, ...] = tuple(dict.fromkeys(term for term in terms if term))
+        self.word_boundary = word_boundary
+        witnesses: Dict[str, List[str]] = {}
+        for term in self.terms:
+            for period in _periods(term):
+                witnesses.setdefault(term[:period] + term, []).append(term)
+        vocabulary = list(dict.fromkeys([*self.terms, *witnesses]))
+        real_terms = set(self.terms)
+
+        self._pattern: Optional[re.Pattern[str]] = None
+        if vocabulary:
+            self._pattern = re.compile(f"(?=({_trie_pattern(vocabulary, real_terms, word_boundary)}))")
+        self._expansions: Dict[str, Tuple[str, ...]] = {}
+        self._overlap_guards: Dict[str, Tuple[str, ...]] = {}
+        for longest in vocabulary:
+            prefixes = [other for other in vocabulary if longest.startswith(other)]
+            self._expansions[longest] = tuple(
+                other
+                for other in prefixes
+                if other in real_terms and (not word_boundary or _ends_cleanly(other, longest))
+            )
+            self._overlap_guards[longest] = tuple(
+                dict.fromkeys(term for other in prefixes for term in witnesses.get(other, ()))
+            )
+        self._exact_patterns: Dict[str, re.Pattern[str]] = {}
+
+    def count(self, text: str) -> Dict[str, int]:
+        counts = dict.fromkeys(self.terms, 0)
+        if self._pattern is None:
+            return counts
+        recount: Set[str] = set()
+        for longest, hits in Counter(self._pattern.findall(text)).items():
+            for term in self._expansions[longest]:
+                counts[term] += hits
+            recount.update(self._overlap_guards[longest])
+        for term in recount:
+            counts[term] = len(self._exact_pattern(term).findall(text))
+        return counts
+
+    def present(self, text: str) -> Set[str]:
+        """Terms occurring at least once, from a single scan without counting."""
+        found: Set[str] = set()
+        if self._pattern is None:
+            return found
+        for longest in set(self._pattern.findall(text)):
+            found.update(self._expansions[longest])
+        return found
+
+    def is_additive_across(self, separator: str) -> bool:
+        """Whether counts over ``separator.join(parts)`` equal the sum of per-part counts.
+
+        Any hit that touches a join shares characters with the separator: it lies
+        inside it, contains it, or starts or ends with a piece of it. In
+        word-boundary mode a word-character separator would also change edge checks.
+        """
+        if separator and any(_overlaps(term, separator) for term in self.terms):
+            return False
+        return not (self.word_boundary and any(_is_word_char(char) for char in separator))
+
+    def _exact_pattern(self, term: str) -> re.Pattern[str]:
+        pattern = self._exact_patterns.get(term)
+        if pattern is None:
+            source = re.escape(term)
+            if self.word_boundary:
+                source = _start_guard(term) + source + _end_guard(term)
+            pattern = self._exact_patterns[term] = re.compile(source)
+        return pattern
+
+
+def _overlaps(term: str, separator: str) -> bool:
+    if term in separator or separator in term:
+        return True
+    return any(
+        term.endswith(separator[:size]) or term.startswith(separator[-size:]) for size in range(1, len(separator))
+    )
+
+
+def _periods(term: str) -> List[int]:
+    return [period for period in range(1, len(term)) if term[period:] == term[: len(term) - period]]
+
+
+def _trie_pattern(vocabulary: Iterable[str], real_terms: Set[str], word_boundary: bool) -> str:
+    root: Dict[str, dict] = {}
+    for term in vocabulary:
+        node = root
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = term
+    word_branches: List[str] = []
+    other_branches: List[str] = []
+    for char, child in sorted(root.items()):
+        branch = re.escape(char) + _node_pattern(child, real_terms, word_boundary)
+        (word_branches if word_boundary and _is_word_char(char) else other_branches).append(branch)
+    if word_branches:
+        # A word-initial term is bounded on the left exactly when ``\b`` holds before it.
+        other_branches.insert(0, rf"\b(?:{'|'.join(word_branches)})")
+    return "|".join(other_branches)
+
+
+def _node_pattern(node: Dict[str, dict], real_terms: Set[str], word_boundary: bool) -> str:
+    branches = [
+        re.escape(char) + _node_pattern(child, real_terms, word_boundary)
+        for char, child in sorted(node.items())
+        if char
+    ]
+    terminal = node.get("")
+    end_guard = _end_guard(terminal) if word_boundary and terminal in real_terms else ""
+    if not branches:
+        return end_guard
+    pattern = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+    if terminal is None:
+        return pattern
+    return f"(?:{pattern}|{end_guard})" if end_guard else f"(?:{pattern})?"
+
+
+def _start_guard(term: str) -> str:
+    return r"(?<!\w)" if _is_word_char(term[0]) else ""
+
+
+def _end_guard(term: str) -> str:
+    return r"(?!\w)" if _is_word_char(term[-1]) else ""
+
+
+def _ends_cleanly(term: str, longest: str) -> bool:
+    if len(term) == len(longest) or not _is_word_char(term[-1]):
+        return True
+    return not _is_word_char(longest[len(term)])
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
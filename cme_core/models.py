@@ -1,13 +1,20 @@
 from __future__ import annotations
 
+from array import array
+from collections.abc import Sequence as SequenceABC
 from dataclasses import asdict, dataclass, field
-from typing import Any, Dict, List, Literal, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Literal, Optional, Sequence, Tuple
 
 
 Priority = Literal["LOW", "MEDIUM", "HIGH"]
 Level = Literal["BASIC", "INTERMEDIATE", "ADVANCED", "EXPERT"]
 SourceType = Literal["pdf", "url", "text"]
 
+PARAGRAPH_SEPARATOR = "\n\n"
+SNIPPET_LIMIT = 180
+# Stands in for a missing page or paragraph number in the int columns.
+_NO_NUMBER = -(2**31)
+
 
 @dataclass(frozen=True)
 class SourceAnchor:
@@ -28,9 +35,13 @@ class SourceAnchor:
         return " | ".join(parts) if parts else "Source anchor"
 
     def to_dict(self) -> Dict[str, Any]:
-        payload = asdict(self)
-        payload["label"] = self.label
-        return payload
+        return {
+            "page": self.page,
+            "paragraph": self.paragraph,
+            "section": self.section,
+            "snippet": self.snippet,
+            "label": self.label,
+        }
 
 
 @dataclass(frozen=True)
@@ -40,23 +51,153 @@ class Paragraph:
     section_heading: Optional[str] = None
 
     def to_dict(self) -> Dict[str, Any]:
-        payload = asdict(self)
-        payload["anchor"] = self.anchor.to_dict()
-        return payload
+        return {"text": self.text, "anchor": self.anchor.to_dict(), "section_heading": self.section_heading}
+
+
+def anchor_snippet(text: str, limit: int = SNIPPET_LIMIT) -> str:
+    """Whitespace-compacted preview of ``text``, truncated with an ellipsis past ``limit``."""
+    # Snippets are derived on access, so avoid compacting all of a long paragraph.
+    compact = " ".join(text[: limit * 2].split())
+    if len(compact) <= limit + 1:
+        compact = " ".join(text.split())
+    if len(compact) <= limit:
+        return compact
+    return compact[: limit - 3].rstrip() + "..."
+
+
+class ParagraphStore(SequenceABC):
+    """Columnar, read-only storage behind ``NormalizedDocument.paragraphs``.
+
+    Paragraph texts share one UTF-8 buffer addressed by an offset array, section
+    headings are interned in a single table, and page/paragraph numbers live in
+    int arrays. Indexing builds plain ``Paragraph`` and ``SourceAnchor`` objects
+    that hold no reference back to the store, so chunks and topics never keep a
+    document's text alive. Snippets are only stored when they differ from
+    ``anchor_snippet(text)`` and are otherwise derived on access.
+
+    Texts are decoded from the buffer on access rather than kept as ``str``
+    objects, which is what keeps the store compact. The last decoded paragraph
+    is cached, so reading one paragraph's fields repeatedly decodes it once;
+    ``text`` decodes the whole buffer on every call and is not cached, so use
+    ``text_range`` when only some paragraphs are needed.
+
+    Unlike the plain list it replaces, the store is immutable: build a new
+    document (for example with ``dataclasses.replace``) to change paragraphs.
+    """
+
+    __slots__ = ("_buffer", "_offsets", "_pages", "_numbers", "_sections", "_headings", "_heading_table", "_snippets", "_last_text")
+
+    def __init__(self, paragraphs: Iterable[Paragraph] = ()) -> None:
+        separator = PARAGRAPH_SEPARATOR.encode("utf-8")
+        parts: List[bytes] = []
+        offsets = array("q", [0])
+        pages = array("i")
+        numbers = array("i")
+        sections = array("I")
+        headings = array("I")
+        heading_ids: Dict[Optional[str], int] = {}
+        snippets: Dict[int, str] = {}
+        for index, paragraph in enumerate(paragraphs):
+            anchor = paragraph.anchor
+            encoded = paragraph.text.encode("utf-8")
+            parts.append(encoded)
+            offsets.append(offsets[-1] + len(encoded) + len(separator))
+            pages.append(_NO_NUMBER if anchor.page is None else anchor.page)
+            numbers.append(_NO_NUMBER if anchor.paragraph is None else anchor.paragraph)
+            sections.append(heading_ids.setdefault(anchor.section, len(heading_ids)))
+            headings.append(heading_ids.setdefault(paragraph.section_heading, len(heading_ids)))
+            if anchor.snippet != anchor_snippet(paragraph.text):
+                snippets[index] = anchor.snippet
+        self._buffer = separator.join(parts)
+        self._offsets = offsets
+        self._pages = pages
+        self._numbers = numbers
+        self._sections = sections
+        self._headings = headings
+        self._heading_table: Tuple[Optional[str], ...] = tuple(heading_ids)
+        self._snippets = snippets
+        self._last_text: Tuple[int, str] = (-1, "")
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._paragraph(position) for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("paragraph index out of range")
+        return self._paragraph(index)
+
+    def __iter__(self) -> Iterator[Paragraph]:
+        for index in range(len(self)):
+            yield self._paragraph(index)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, SequenceABC) or isinstance(other, (str, bytes)):
+            return NotImplemented
+        return len(self) == len(other) and all(left == right for left, right in zip(self, other))
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"ParagraphStore({len(self)} paragraphs)"
+
+    @property
+    def text(self) -> str:
+        """All paragraph texts joined by ``PARAGRAPH_SEPARATOR``."""
+        return self._buffer.decode("utf-8")
+
+    def text_range(self, start: int, stop: int) -> str:
+        """Texts of paragraphs ``start`` to ``stop - 1`` joined by ``PARAGRAPH_SEPARATOR``, decoded in one slice."""
+        start, stop, _ = slice(start, stop).indices(len(self))
+        if start >= stop:
+            return ""
+        end = self._offsets[stop] - len(PARAGRAPH_SEPARATOR.encode("utf-8"))
+        return self._buffer[self._offsets[start] : end].decode("utf-8")
+
+    def _text(self, index: int) -> str:
+        cached_index, text = self._last_text
+        if cached_index != index:
+            text = self.text_range(index, index + 1)
+            self._last_text = (index, text)
+        return text
+
+    def _paragraph(self, index: int) -> Paragraph:
+        text = self._text(index)
+        page = self._pages[index]
+        number = self._numbers[index]
+        snippet = self._snippets.get(index)
+        anchor = SourceAnchor(
+            page=None if page == _NO_NUMBER else page,
+            paragraph=None if number == _NO_NUMBER else number,
+            section=self._heading_table[self._sections[index]],
+            snippet=anchor_snippet(text) if snippet is None else snippet,
+        )
+        return Paragraph(text=text, anchor=anchor, section_heading=self._heading_table[self._headings[index]])
 
 
 @dataclass(frozen=True)
 class NormalizedDocument:
+    """A source document; ``paragraphs`` is always stored as a ``ParagraphStore``."""
+
     document_id: str
     title: str
     source_type: SourceType
     source_ref: str
-    paragraphs: List[Paragraph]
+    paragraphs: Sequence[Paragraph]
     metadata: Dict[str, Any] = field(default_factory=dict)
+    # Filled in by ``cache.document_content_hash``; ``dataclasses.replace`` copies start without it.
+    _content_hash: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if not isinstance(self.paragraphs, ParagraphStore):
+            object.__setattr__(self, "paragraphs", ParagraphStore(self.paragraphs))
 
     @property
     def text(self) -> str:
-        return "\n\n".join(paragraph.text for paragraph in self.paragraphs)
+        return self.paragraphs.text
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -78,6 +219,7 @@ class Chunk:
     anchors: List[SourceAnchor]
     paragraph_count: int
     metadata: Dict[str, Any] = field(default_factory=dict)
+    term_counts: Optional[Dict[str, int]] = field(default=None, compare=False, repr=False)
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -115,7 +257,7 @@ class Flashcard:
     card_type: Literal["qa", "cloze"] = "qa"
 
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        return {"front": self.front, "back": self.back, "anchor_label": self.anchor_label, "card_type": self.card_type}
 
 
 @dataclass(frozen=True)
@@ -1,69 +1,321 @@
 from __future__ import annotations
 
 import csv
+import heapq
 import io
 import json
 import re
-from typing import List, Sequence
+from dataclasses import dataclass, replace
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple, Union
 
 from .models import NormalizedDocument, Topic
 
 SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+SUMMARY_SENTENCE_LIMIT = 4
+RANK_TERMS = ("should", "target", "avoid", "urgent", "refractory", "contraindication", "escalate")
+PITFALL_TERMS = ("avoid", "pitfall", "warning", "contraindication", "delay")
+DECISION_TERMS = ("should", "if", "when", "escalate", "target", "consider")
+EXPORT_FORMATS = ("json", "ndjson", "csv", "markdown", "anki")
+DEFAULT_EXPORT_CHUNK_SIZE = 64 * 1024
 
 
-def build_summary_bullets(label: str, text: str, desired_depth: str = "boards") -> List[str]:
-    limit = 3 if desired_depth == "boards" else 4
-    sentences = _clean_sentences(text)
-    ranked = _rank_sentences(sentences)
+@dataclass(frozen=True)
+class SentenceIndex:
+    """Sentences of one topic with the flags every output builder needs, computed once."""
+
+    sentences: List[str]
+    rank_keys: List[Tuple[int, int]]
+    pitfall_flags: List[bool]
+    decision_flags: List[bool]
+
+    @classmethod
+    def from_text(cls, text: str) -> "SentenceIndex":
+        sentences = _clean_sentences(text)
+        rank_keys: List[Tuple[int, int]] = []
+        pitfall_flags: List[bool] = []
+        decision_flags: List[bool] = []
+        for sentence in sentences:
+            lower = sentence.lower()
+            rank_keys.append((sum(term in lower for term in RANK_TERMS), len(sentence)))
+            pitfall_flags.append(any(term in lower for term in PITFALL_TERMS))
+            decision_flags.append(any(term in lower for term in DECISION_TERMS))
+        return cls(sentences, rank_keys, pitfall_flags, decision_flags)
+
+    def top_ranked(self, limit: int) -> List[str]:
+        # nlargest is stable like sorted(..., reverse=True), so ties keep text order.
+        best = heapq.nlargest(limit, range(len(self.sentences)), key=self.rank_keys.__getitem__)
+        return [self.sentences[index] for index in best]
+
+    def pitfalls(self, limit: int = 3) -> List[str]:
+        return _first_flagged(self.sentences, self.pitfall_flags, limit)
+
+    def decision_points(self, limit: int = 3) -> List[str]:
+        return _first_flagged(self.sentences, self.decision_flags, limit)
+
+
+TextOrIndex = Union[str, SentenceIndex]
+
+
+def build_summary_bullets(label: str, text: TextOrIndex, desired_depth: str = "boards") -> List[str]:
+    ranked = _sentence_index(text).top_ranked(SUMMARY_SENTENCE_LIMIT)
+    return summary_bullets_from_sentences(label, ranked, desired_depth)
+
+
+def summary_bullets_from_sentences(label: str, ranked: Sequence[str], desired_depth: str = "boards") -> List[str]:
+    limit = 3 if desired_depth == "boards" else SUMMARY_SENTENCE_LIMIT
     bullets = [sentence for sentence in ranked[:limit]]
     if not bullets:
         bullets = [f"{label} is a practical ICU topic with source-supported decision points."]
     return bullets
 
 
-def build_what_you_should_know(label: str, text: str, priority: str, level: str) -> List[str]:
-    sentences = _rank_sentences(_clean_sentences(text))
+def build_what_you_should_know(label: str, text: TextOrIndex, priority: str, level: str) -> List[str]:
+    return what_you_should_know_from_sentences(label, _sentence_index(text).top_ranked(3), priority, level)
+
+
+def what_you_should_know_from_sentences(label: str, ranked: Sequence[str], priority: str, level: str) -> List[str]:
     bullets = []
-    for sentence in sentences[:3]:
+    for sentence in ranked[:3]:
         bullets.append(f"{label}: {sentence}")
     if not bullets:
         bullets.append(f"{label}: {priority} priority, {level.lower()} level topic.")
     return bullets
 
 
-def build_pitfalls(text: str, anchors) -> List[str]:
-    candidates = [
-        sentence
-        for sentence in _clean_sentences(text)
-        if any(term in sentence.lower() for term in ("avoid", "pitfall", "warning", "contraindication", "delay"))
-    ]
+def build_pitfalls(text: TextOrIndex, anchors) -> List[str]:
+    candidates = _sentence_index(text).pitfalls()
     if candidates:
-        return candidates[:3]
+        return candidates
     anchor = anchors[0].label if anchors else "source text"
     return [f"Watch for delayed escalation or missed contraindications flagged near {anchor}."]
 
 
-def build_key_decision_points(text: str, anchors) -> List[str]:
-    candidates = [
-        sentence
-        for sentence in _clean_sentences(text)
-        if any(term in sentence.lower() for term in ("should", "if", "when", "escalate", "target", "consider"))
-    ]
+def build_key_decision_points(text: TextOrIndex, anchors) -> List[str]:
+    candidates = _sentence_index(text).decision_points()
     if candidates:
-        return candidates[:3]
+        return candidates
     anchor = anchors[0].label if anchors else "source text"
     return [f"Use the decision thresholds summarized around {anchor} to guide escalation."]
 
 
-def export_topics_json(document: NormalizedDocument, topics: Sequence[Topic]) -> str:
+def export_topics_json(document: NormalizedDocument, topics: Sequence[Topic], include_paragraphs: bool = True) -> str:
+    return "".join(_json_parts(document, topics, include_paragraphs))
+
+
+def export_topics_jsonl(
+    document: NormalizedDocument,
+    topics: Sequence[Topic],
+    extra: Optional[Dict[str, Any]] = None,
+    include_paragraphs: bool = True,
+) -> str:
+    """One newline-terminated JSON line with the same payload as ``export_topics_json``."""
+    return "".join(_jsonl_parts(document, topics, extra, include_paragraphs))
+
+
+def export_topics_csv(topics: Sequence[Topic]) -> str:
+    return "".join(_csv_parts(topics))
+
+
+def export_topics_markdown(document: NormalizedDocument, topics: Sequence[Topic]) -> str:
+    return "".join(_markdown_parts(document, topics))
+
+
+def export_anki_tsv(topics: Sequence[Topic]) -> str:
+    return "".join(_anki_parts(topics))
+
+
+def write_export(
+    handle: TextIO,
+    export_format: str,
+    document: NormalizedDocument,
+    topics: Sequence[Topic],
+    include_paragraphs: bool = True,
+) -> None:
+    """Write an export to a text file object piece by piece instead of building one string.
+
+    ``export_format`` is one of ``EXPORT_FORMATS``. ``"ndjson"`` writes one record
+    per line: the document header, each paragraph, then each topic.
+    """
+    for part in _export_parts(export_format, document, topics, include_paragraphs):
+        handle.write(part)
+
+
+def iter_export_bytes(
+    export_format: str,
+    document: NormalizedDocument,
+    topics: Sequence[Topic],
+    include_paragraphs: bool = True,
+    chunk_size: int = DEFAULT_EXPORT_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """Yield an export as UTF-8 byte chunks of roughly ``chunk_size`` bytes."""
+    pending: List[str] = []
+    pending_size = 0
+    for part in _export_parts(export_format, document, topics, include_paragraphs):
+        pending.append(part)
+        pending_size += len(part)
+        if pending_size >= chunk_size:
+            yield "".join(pending).encode("utf-8")
+            pending.clear()
+            pending_size = 0
+    if pending:
+        yield "".join(pending).encode("utf-8")
+
+
+def _export_parts(
+    export_format: str,
+    document: NormalizedDocument,
+    topics: Sequence[Topic],
+    include_paragraphs: bool,
+) -> Iterator[str]:
+    if export_format == "json":
+        return _json_parts(document, topics, include_paragraphs)
+    if export_format == "ndjson":
+        return _ndjson_parts(document, topics, include_paragraphs)
+    if export_format == "csv":
+        return _csv_parts(topics)
+    if export_format == "markdown":
+        return _markdown_parts(document, topics)
+    if export_format == "anki":
+        return _anki_parts(topics)
+    raise ValueError(f"Unknown export format: {export_format!r}")
+
+
+_COMPACT_ENCODER = json.JSONEncoder(separators=(",", ":"))
+_STREAM_BATCH_SIZE = 64
+_INDENTED_ENCODERS: Dict[int, json.JSONEncoder] = {}
+
+
+class _StreamedArray:
+    """A JSON array whose items are produced only while it is being written."""
+
+    def __init__(self, items: Iterable[Any]) -> None:
+        self.items = items
+
+
+def _document_fields(document: NormalizedDocument, include_paragraphs: bool) -> Dict[str, Any]:
+    # to_dict on a paragraph-free copy keeps the field order without materializing every paragraph.
+    fields = replace(document, paragraphs=[]).to_dict()
+    if include_paragraphs:
+        fields["paragraphs"] = _StreamedArray(paragraph.to_dict() for paragraph in document.paragraphs)
+    else:
+        del fields["paragraphs"]
+    return fields
+
+
+def _json_parts(document: NormalizedDocument, topics: Sequence[Topic], include_paragraphs: bool) -> Iterator[str]:
     payload = {
-        "document": document.to_dict(),
-        "topics": [topic.to_dict() for topic in topics],
+        "document": _document_fields(document, include_paragraphs),
+        "topics": _StreamedArray(topic.to_dict() for topic in topics),
     }
-    return json.dumps(payload, indent=2)
+    return _iter_json(payload, indent=2)
 
 
-def export_topics_csv(topics: Sequence[Topic]) -> str:
+def _jsonl_parts(
+    document: NormalizedDocument,
+    topics: Sequence[Topic],
+    extra: Optional[Dict[str, Any]],
+    include_paragraphs: bool,
+) -> Iterator[str]:
+    payload = {
+        **(extra or {}),
+        "document": _document_fields(document, include_paragraphs),
+        "topics": _StreamedArray(topic.to_dict() for topic in topics),
+    }
+    yield from _iter_json(payload, indent=None)
+    yield "\n"
+
+
+def _ndjson_parts(document: NormalizedDocument, topics: Sequence[Topic], include_paragraphs: bool) -> Iterator[str]:
+    header = _document_fields(document, include_paragraphs=False)
+    yield _compact_json({"record": "document", **header}) + "\n"
+    if include_paragraphs:
+        for paragraph in document.paragraphs:
+            yield _compact_json({"record": "paragraph", **paragraph.to_dict()}) + "\n"
+    for topic in topics:
+        yield _compact_json({"record": "topic", **topic.to_dict()}) + "\n"
+
+
+def _iter_json(value: Any, indent: Optional[int], level: int = 0) -> Iterator[str]:
+    """Encode like ``json.dumps(value, indent=indent)`` (compact when ``indent`` is None), streaming arrays."""
+    if isinstance(value, _StreamedArray):
+        yield from _iter_streamed_array(value.items, indent, level)
+    elif _holds_stream(value):
+        yield from _iter_json_container("{", "}", value.items(), indent, level)
+    else:
+        yield _encode(value, indent, level)
+
+
+def _iter_streamed_array(items: Iterable[Any], indent: Optional[int], level: int) -> Iterator[str]:
+    # Items are encoded a batch at a time, so the encoder's per-call setup is not paid for every item.
+    items = iter(items)
+    batch = list(islice(items, _STREAM_BATCH_SIZE))
+    if not batch:
+        yield "[]"
+        return
+    yield "["
+    separator = ""
+    while batch:
+        encoded = _encode(batch, indent, level)
+        # Drop the batch's own brackets, keeping the newline and margin before the first item.
+        yield separator + (encoded[1:-1] if indent is None else encoded[1 : encoded.rfind("\n")])
+        separator = ","
+        batch = list(islice(items, _STREAM_BATCH_SIZE))
+    yield "]" if indent is None else "\n" + " " * (indent * level) + "]"
+
+
+def _encode(value: Any, indent: Optional[int], level: int) -> str:
+    """``json.dumps(value, indent=indent)`` as it reads nested ``level`` containers deep."""
+    if indent is None:
+        return _COMPACT_ENCODER.encode(value)
+    encoded = _indented_encoder(indent).encode(value)
+    return encoded.replace("\n", "\n" + " " * (indent * level)) if level else encoded
+
+
+def _holds_stream(value: Any) -> bool:
+    # Only dicts on the path to a streamed array are encoded piecewise; everything else is encoded in one call.
+    if isinstance(value, _StreamedArray):
+        return True
+    return isinstance(value, dict) and any(
+        isinstance(item, (dict, _StreamedArray)) and _holds_stream(item) for item in value.values()
+    )
+
+
+def _iter_json_container(
+    opener: str,
+    closer: str,
+    entries: Iterable[Tuple[Optional[str], Any]],
+    indent: Optional[int],
+    level: int,
+) -> Iterator[str]:
+    inner = "" if indent is None else "\n" + " " * (indent * (level + 1))
+    key_separator = ":" if indent is None else ": "
+    empty = True
+    for key, item in entries:
+        yield (opener if empty else ",") + inner
+        if key is not None:
+            yield json.dumps(key) + key_separator
+        yield from _iter_json(item, indent, level + 1)
+        empty = False
+    if empty:
+        yield opener + closer
+    else:
+        yield ("" if indent is None else "\n" + " " * (indent * level)) + closer
+
+
+def _compact_json(value: Any) -> str:
+    return _COMPACT_ENCODER.encode(value)
+
+
+def _indented_encoder(indent: int) -> json.JSONEncoder:
+    # json.dumps builds a new encoder on every call with non-default options; reuse one per indent instead.
+    encoder = _INDENTED_ENCODERS.get(indent)
+    if encoder is None:
+        encoder = _INDENTED_ENCODERS[indent] = json.JSONEncoder(indent=indent)
+    return encoder
+
+
+def _csv_parts(topics: Sequence[Topic]) -> Iterator[str]:
     buffer = io.StringIO()
     writer = csv.DictWriter(
         buffer,
@@ -81,65 +333,80 @@ def export_topics_csv(topics: Sequence[Topic]) -> str:
                 "rationale": topic.rationale,
             }
         )
-    return buffer.getvalue()
+        yield _drain(buffer)
+    yield _drain(buffer)
 
 
-def export_topics_markdown(document: NormalizedDocument, topics: Sequence[Topic]) -> str:
+def _markdown_parts(document: NormalizedDocument, topics: Sequence[Topic]) -> Iterator[str]:
     lines = [
         f"# {document.title}",
         "",
         "> Educational use only. Not medical advice.",
         "",
     ]
+    yield "\n".join(lines)
     for topic in topics:
-        lines.extend(
-            [
-                f"## {topic.label}",
-                f"- Priority: {topic.priority}",
-                f"- Level: {topic.level}",
-                f"- Anchors: {', '.join(topic.citations)}",
-                f"- Rationale: {topic.rationale}",
-                "",
-                "### Summary",
-                *[f"- {item}" for item in topic.summary_bullets],
-                "",
-                "### What You Should Know",
-                *[f"- {item}" for item in topic.what_you_should_know],
-                "",
-                "### Pitfalls",
-                *[f"- {item}" for item in topic.pitfalls],
-                "",
-                "### Key Decision Points",
-                *[f"- {item}" for item in topic.key_decision_points],
-                "",
-            ]
-        )
-    return "\n".join(lines)
+        lines = [
+            f"## {topic.label}",
+            f"- Priority: {topic.priority}",
+            f"- Level: {topic.level}",
+            f"- Anchors: {', '.join(topic.citations)}",
+            f"- Rationale: {topic.rationale}",
+            "",
+            "### Summary",
+            *[f"- {item}" for item in topic.summary_bullets],
+            "",
+            "### What You Should Know",
+            *[f"- {item}" for item in topic.what_you_should_know],
+            "",
+            "### Pitfalls",
+            *[f"- {item}" for item in topic.pitfalls],
+            "",
+            "### Key Decision Points",
+            *[f"- {item}" for item in topic.key_decision_points],
+            "",
+        ]
+        yield "\n" + "\n".join(lines)
 
 
-def export_anki_tsv(topics: Sequence[Topic]) -> str:
+def _anki_parts(topics: Sequence[Topic]) -> Iterator[str]:
     buffer = io.StringIO()
     writer = csv.writer(buffer, delimiter="\t", lineterminator="\n")
     writer.writerow(["front", "back", "anchor", "card_type"])
     for topic in topics:
         for flashcard in topic.flashcards:
             writer.writerow([flashcard.front, flashcard.back, flashcard.anchor_label, flashcard.card_type])
-    return buffer.getvalue()
+        yield _drain(buffer)
+    yield _drain(buffer)
+
+
+def _drain(buffer: io.StringIO) -> str:
+    text = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return text
+
+
+def rank_sentences(text: TextOrIndex, limit: Optional[int] = None) -> List[str]:
+    index = _sentence_index(text)
+    return index.top_ranked(len(index.sentences) if limit is None else limit)
+
+
+def _sentence_index(text: TextOrIndex) -> SentenceIndex:
+    return text if isinstance(text, SentenceIndex) else SentenceIndex.from_text(text)
+
+
+def _first_flagged(sentences: Sequence[str], flags: Sequence[bool], limit: int) -> List[str]:
+    selected: List[str] = []
+    for sentence, flagged in zip(sentences, flags):
+        if flagged:
+            selected.append(sentence)
+            if len(selected) == limit:
+                break
+    return selected
 
 
 def _clean_sentences(text: str) -> List[str]:
     normalized = re.sub(r"\s+", " ", text).strip()
     sentences = [sentence.strip() for sentence in SENTENCE_SPLIT_RE.split(normalized) if len(sentence.strip()) > 35]
     return sentences
-
-
-def _rank_sentences(sentences: Sequence[str]) -> List[str]:
-    def score(sentence: str) -> tuple[int, int]:
-        lower = sentence.lower()
-        signal_score = sum(
-            term in lower
-            for term in ("should", "target", "avoid", "urgent", "refractory", "contraindication", "escalate")
-        )
-        return (signal_score, len(sentence))
-
-    return [sentence for sentence, _ in sorted(((sentence, score(sentence)) for sentence in sentences), key=lambda item: item[1], reverse=True)]
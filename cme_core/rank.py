@@ -2,18 +2,71 @@ from __future__ import annotations
 
 import hashlib
 import re
-from typing import List, Optional, Sequence
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
 
+from .batch_scoring import TermCountMatrix, score_matrix
+from .cache import ResultCache
 from .llm_provider import LLMProvider, NullLLMProvider
-from .models import AnalysisOptions, Chunk, Flashcard, NormalizedDocument, Topic
+from .models import (
+    AnalysisOptions,
+    Chunk,
+    Flashcard,
+    Level,
+    NormalizedDocument,
+    ScoreBreakdown,
+    SourceAnchor,
+    Topic,
+)
 from .outputs import (
+    SUMMARY_SENTENCE_LIMIT,
+    SentenceIndex,
     build_key_decision_points,
     build_pitfalls,
-    build_summary_bullets,
-    build_what_you_should_know,
+    summary_bullets_from_sentences,
+    what_you_should_know_from_sentences,
+)
+from .scoring import (
+    ScoringConfig,
+    chunk_term_counts,
+    count_terms,
+    counts_are_additive,
+    level_from_counts,
+    load_scoring_config,
+    priority_from_score,
+    score_explanation,
+    sum_term_counts,
 )
-from .scoring import classify_level, priority_from_score, score_explanation, score_text
 from .topics import TopicSeed, propose_topic_seeds
+from .tracing import NULL_TRACER, PipelineTracer
+
+CHUNK_SEPARATOR = "\n\n"
+
+
+@dataclass(frozen=True)
+class PreparedSeed:
+    """Everything about a topic seed that does not depend on AnalysisOptions."""
+
+    topic_id: str
+    label: str
+    level: Level
+    anchors: List[SourceAnchor]
+    supporting_chunk_ids: List[str]
+    term_counts: Dict[str, int]
+    ranked_sentences: List[str]
+    pitfalls: List[str]
+    key_decision_points: List[str]
+    # Defaults to the anchor labels; multi-document topics name the source as well.
+    citations: Optional[List[str]] = None
+
+
+@dataclass(frozen=True)
+class PreparedRanking:
+    """Option-independent intermediate; re-rank it for any options with ``rerank``."""
+
+    seeds: List[PreparedSeed]
+    matrix: TermCountMatrix
+    scoring_config: ScoringConfig
 
 
 def rank_document(
@@ -21,52 +74,135 @@ def rank_document(
     chunks: Sequence[Chunk],
     options: Optional[AnalysisOptions] = None,
     llm_provider: Optional[LLMProvider] = None,
+    scoring_config: Optional[ScoringConfig] = None,
+    prepared: Optional[PreparedRanking] = None,
+    result_cache: Optional[ResultCache] = None,
+    tracer: Optional[PipelineTracer] = None,
 ) -> List[Topic]:
     config = options or AnalysisOptions()
     provider = llm_provider or NullLLMProvider()
-    topics = rank_chunks(chunks=chunks, options=config)
+    tracer = tracer or NULL_TRACER
+    cache_key = None
+    if result_cache is not None:
+        effective_config = scoring_config or (prepared.scoring_config if prepared else load_scoring_config())
+        cache_key = result_cache.key(document, config, effective_config.content_hash)
+        with tracer.stage("result_cache") as stage:
+            cached = result_cache.get(cache_key)
+            stage.add("hits" if cached is not None else "misses")
+        if cached is not None:
+            return cached
+    prepared = prepared or prepare_ranking(chunks, scoring_config=scoring_config, tracer=tracer)
+    topics = rerank(prepared, config, scoring_config=scoring_config, tracer=tracer)
     if config.use_llm and provider.is_available():
-        topics = list(provider.enrich_topics(document=document, chunks=chunks, topics=topics, options=config))
+        with tracer.stage("llm_enrichment") as stage:
+            topics = list(provider.enrich_topics(document=document, chunks=chunks, topics=topics, options=config))
+            stage.add("topics", len(topics))
+    if cache_key is not None:
+        result_cache.put(cache_key, topics)
     return topics
 
 
-def rank_chunks(chunks: Sequence[Chunk], options: Optional[AnalysisOptions] = None) -> List[Topic]:
-    config = options or AnalysisOptions()
-    topic_seeds = propose_topic_seeds(list(chunks))
-    topics = [_topic_from_seed(seed, config) for seed in topic_seeds]
-    topics.sort(key=lambda topic: (-topic.score, topic.label))
-    return topics[: config.max_topics]
+def rank_chunks(
+    chunks: Sequence[Chunk],
+    options: Optional[AnalysisOptions] = None,
+    scoring_config: Optional[ScoringConfig] = None,
+    tracer: Optional[PipelineTracer] = None,
+) -> List[Topic]:
+    prepared = prepare_ranking(chunks, scoring_config=scoring_config, tracer=tracer)
+    return rerank(prepared, options or AnalysisOptions(), tracer=tracer)
+
+
+def prepare_ranking(
+    chunks: Sequence[Chunk],
+    scoring_config: Optional[ScoringConfig] = None,
+    tracer: Optional[PipelineTracer] = None,
+) -> PreparedRanking:
+    tracer = tracer or NULL_TRACER
+    with tracer.stage("propose_topic_seeds") as stage:
+        topic_seeds = propose_topic_seeds(list(chunks))
+        stage.add("chunks", len(chunks))
+        stage.add("seeds", len(topic_seeds))
+    with tracer.stage("prepare_seeds") as stage:
+        seeds = [_prepare_seed(seed) for seed in topic_seeds]
+        matrix = TermCountMatrix([seed.term_counts for seed in seeds])
+        stage.add("seeds", len(seeds))
+    return PreparedRanking(seeds=seeds, matrix=matrix, scoring_config=scoring_config or load_scoring_config())
+
+
+def rerank(
+    prepared: PreparedRanking,
+    options: AnalysisOptions,
+    scoring_config: Optional[ScoringConfig] = None,
+    tracer: Optional[PipelineTracer] = None,
+) -> List[Topic]:
+    tracer = tracer or NULL_TRACER
+    with tracer.stage("score_topics") as stage:
+        scores = score_matrix(prepared.matrix, options, scoring_config=scoring_config or prepared.scoring_config)
+        breakdowns = scores.breakdowns()
+        order = sorted(
+            range(len(prepared.seeds)),
+            key=lambda index: (-breakdowns[index].total, prepared.seeds[index].label),
+        )
+        stage.add("seeds", len(prepared.seeds))
+    with tracer.stage("build_topics") as stage:
+        topics = [
+            _topic_from_prepared(prepared.seeds[index], options, breakdowns[index])
+            for index in order[: options.max_topics]
+        ]
+        stage.add("topics", len(topics))
+    return topics
+
+
+def _seed_term_counts(seed: TopicSeed) -> Dict[str, int]:
+    # Topic text is the chunks joined by a blank line; per-chunk counts only sum to
+    # the merged counts when no term can match across that separator.
+    if not counts_are_additive(CHUNK_SEPARATOR):
+        return count_terms(CHUNK_SEPARATOR.join(chunk.text for chunk in seed.chunks))
+    return sum_term_counts(chunk_term_counts(chunk) for chunk in seed.chunks)
 
 
-def _topic_from_seed(seed: TopicSeed, options: AnalysisOptions) -> Topic:
-    merged_text = "\n\n".join(chunk.text for chunk in seed.chunks)
+def _prepare_seed(seed: TopicSeed) -> PreparedSeed:
+    merged_text = CHUNK_SEPARATOR.join(chunk.text for chunk in seed.chunks)
     anchors = _dedupe_anchors([anchor for chunk in seed.chunks for anchor in chunk.anchors])
-    breakdown = score_text(merged_text, options)
-    level = classify_level(merged_text)
+    term_counts = _seed_term_counts(seed)
+    sentences = SentenceIndex.from_text(merged_text)
+    return PreparedSeed(
+        topic_id=hashlib.sha1(f"{seed.label}:{merged_text[:120]}".encode("utf-8")).hexdigest()[:12],
+        label=seed.label,
+        level=level_from_counts(term_counts),
+        anchors=anchors,
+        supporting_chunk_ids=[chunk.chunk_id for chunk in seed.chunks],
+        term_counts=term_counts,
+        ranked_sentences=sentences.top_ranked(SUMMARY_SENTENCE_LIMIT),
+        pitfalls=build_pitfalls(sentences, anchors),
+        key_decision_points=build_key_decision_points(sentences, anchors),
+    )
+
+
+def _topic_from_prepared(seed: PreparedSeed, options: AnalysisOptions, breakdown: ScoreBreakdown) -> Topic:
+    anchors = list(seed.anchors)
+    citations = list(seed.citations) if seed.citations is not None else [anchor.label for anchor in anchors]
     priority = priority_from_score(breakdown.total)
-    rationale = f"{score_explanation(breakdown, level)} Anchors: {', '.join(anchor.label for anchor in anchors[:3])}."
-    summary_bullets = build_summary_bullets(seed.label, merged_text, options.desired_depth)
-    what_you_should_know = build_what_you_should_know(seed.label, merged_text, priority, level)
-    pitfalls = build_pitfalls(merged_text, anchors)
-    key_decision_points = build_key_decision_points(merged_text, anchors)
+    rationale = f"{score_explanation(breakdown, seed.level)} Anchors: {', '.join(citations[:3])}."
+    summary_bullets = summary_bullets_from_sentences(seed.label, seed.ranked_sentences, options.desired_depth)
+    what_you_should_know = what_you_should_know_from_sentences(seed.label, seed.ranked_sentences, priority, seed.level)
     flashcards = _build_flashcards(seed.label, what_you_should_know, anchors)
-    topic_id = hashlib.sha1(f"{seed.label}:{merged_text[:120]}".encode("utf-8")).hexdigest()[:12]
     return Topic(
-        topic_id=topic_id,
+        topic_id=seed.topic_id,
         label=seed.label,
         priority=priority,
-        level=level,
+        level=seed.level,
         score=breakdown.total,
         rationale=rationale,
         anchors=anchors,
-        citations=[anchor.label for anchor in anchors],
+        citations=citations,
         breakdown=breakdown,
         summary_bullets=summary_bullets,
         what_you_should_know=what_you_should_know,
-        pitfalls=pitfalls,
-        key_decision_points=key_decision_points,
+        pitfalls=list(seed.pitfalls),
+        key_decision_points=list(seed.key_decision_points),
         flashcards=flashcards,
-        supporting_chunk_ids=[chunk.chunk_id for chunk in seed.chunks],
+        supporting_chunk_ids=list(seed.supporting_chunk_ids),
     )
 
 
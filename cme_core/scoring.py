@@ -1,12 +1,16 @@
 from __future__ import annotations
 
+import hashlib
 import json
-import re
+import os
 from collections import Counter
+from dataclasses import dataclass
 from importlib import resources
-from typing import Dict, Iterable, List, Tuple
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Union
 
-from .models import AnalysisOptions, Level, Priority, ScoreBreakdown
+from .matching import TermMatcher
+from .models import AnalysisOptions, Chunk, Level, Priority, ScoreBreakdown
 
 SIGNAL_TERMS: Dict[str, Tuple[str, ...]] = {
     "clinical_frequency": (
@@ -92,33 +96,121 @@ SPECIALTY_TERMS = {
     "ECMO": ("ecmo", "extracorporeal", "cannula", "anticoagulation", "oxygenator"),
 }
 
+SCORING_TERMS: Tuple[str, ...] = tuple(
+    dict.fromkeys(
+        term
+        for family in (SIGNAL_TERMS, LEVEL_TERMS, SPECIALTY_TERMS)
+        for terms in family.values()
+        for term in terms
+    )
+)
+
+_MATCHERS = {
+    False: TermMatcher(SCORING_TERMS),
+    True: TermMatcher(SCORING_TERMS, word_boundary=True),
+}
+
+
+@dataclass(frozen=True)
+class ScoringConfig:
+    weights: Dict[str, float]
+    normalizers: Dict[str, float]
+    content_hash: str
+    source: str = ""
+
+    @classmethod
+    def from_dict(cls, payload: Mapping[str, Any], source: str = "") -> "ScoringConfig":
+        weights = {name: float(value) for name, value in payload["weights"].items()}
+        normalizers = {name: float(value) for name, value in payload["normalizers"].items()}
+        canonical = json.dumps({"weights": weights, "normalizers": normalizers}, sort_keys=True)
+        content_hash = hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:12]
+        return cls(weights=weights, normalizers=normalizers, content_hash=content_hash, source=source)
+
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        return {"weights": dict(self.weights), "normalizers": dict(self.normalizers)}
+
+
+_CONFIG_CACHE: Dict[str, Tuple[Optional[int], ScoringConfig]] = {}
+
+
+def load_scoring_config(path: Optional[Union[str, Path]] = None) -> ScoringConfig:
+    source = Path(path) if path is not None else resources.files("cme_core").joinpath("scoring_config.json")
+    key = str(source)
+    mtime = _mtime_ns(source)
+    cached = _CONFIG_CACHE.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with source.open("r", encoding="utf-8") as handle:
+        config = ScoringConfig.from_dict(json.load(handle), source=key)
+    _CONFIG_CACHE[key] = (mtime, config)
+    return config
+
+
+def load_scoring_weights() -> Dict[str, Dict[str, float]]:
+    return load_scoring_config().to_dict()
+
+
+def count_terms(text: str, word_boundary: bool = False) -> Dict[str, int]:
+    return _MATCHERS[word_boundary].count(text.lower())
 
-def load_scoring_weights() -> Dict[str, float]:
-    with resources.files("cme_core").joinpath("scoring_config.json").open("r", encoding="utf-8") as handle:
-        return json.load(handle)
 
+def sparse_term_counts(text: str, word_boundary: bool = False) -> Dict[str, int]:
+    return {term: hits for term, hits in count_terms(text, word_boundary=word_boundary).items() if hits}
 
-def score_text(text: str, options: AnalysisOptions) -> ScoreBreakdown:
-    lower = text.lower()
+
+def chunk_term_counts(chunk: Chunk) -> Dict[str, int]:
+    if chunk.term_counts is not None:
+        return chunk.term_counts
+    return sparse_term_counts(chunk.text)
+
+
+def counts_are_additive(separator: str, word_boundary: bool = False) -> bool:
+    return _MATCHERS[word_boundary].is_additive_across(separator)
+
+
+def sum_term_counts(parts: Iterable[Mapping[str, int]]) -> Dict[str, int]:
+    total: Dict[str, int] = {}
+    for counts in parts:
+        for term, hits in counts.items():
+            if hits:
+                total[term] = total.get(term, 0) + hits
+    return total
+
+
+def score_text(
+    text: str,
+    options: AnalysisOptions,
+    word_boundary: bool = False,
+    scoring_config: Optional[ScoringConfig] = None,
+) -> ScoreBreakdown:
+    return score_counts(count_terms(text, word_boundary=word_boundary), options, scoring_config=scoring_config)
+
+
+def score_counts(
+    counts: Mapping[str, int],
+    options: AnalysisOptions,
+    scoring_config: Optional[ScoringConfig] = None,
+) -> ScoreBreakdown:
     evidence_terms: List[str] = []
-    weights = load_scoring_weights()
+    config = scoring_config or load_scoring_config()
+    weights = config.weights
     signal_scores: Dict[str, float] = {}
 
     for signal_name, terms in SIGNAL_TERMS.items():
-        hits = _count_term_hits(lower, terms)
+        hits = _count_term_hits(counts, terms)
         if hits:
-            evidence_terms.extend(hit for hit in terms if hit in lower)
-        signal_scores[signal_name] = min(1.0, hits / weights["normalizers"].get(signal_name, 3.0))
+            evidence_terms.extend(hit for hit in terms if counts.get(hit, 0))
+        signal_scores[signal_name] = min(1.0, hits / config.normalizers.get(signal_name, 3.0))
 
-    specialty_hits = _count_term_hits(lower, SPECIALTY_TERMS.get(options.specialty_focus, ()))
+    specialty_hits = _count_term_hits(counts, SPECIALTY_TERMS.get(options.specialty_focus, ()))
     specialty_bonus = min(0.12, specialty_hits * 0.03)
     total = (
-        signal_scores["clinical_frequency"] * weights["weights"]["clinical_frequency"]
-        + signal_scores["high_stakes"] * weights["weights"]["high_stakes"]
-        + signal_scores["decision_density"] * weights["weights"]["decision_density"]
-        + signal_scores["guideline_density"] * weights["weights"]["guideline_density"]
-        + signal_scores["pitfall_density"] * weights["weights"]["pitfall_density"]
-        + signal_scores["rare_critical"] * weights["weights"]["rare_critical"]
+        signal_scores["clinical_frequency"] * weights["clinical_frequency"]
+        + signal_scores["high_stakes"] * weights["high_stakes"]
+        + signal_scores["decision_density"] * weights["decision_density"]
+        + signal_scores["guideline_density"] * weights["guideline_density"]
+        + signal_scores["pitfall_density"] * weights["pitfall_density"]
+        + signal_scores["rare_critical"] * weights["rare_critical"]
         + specialty_bonus
     )
     total = min(1.0, total)
@@ -144,16 +236,19 @@ def priority_from_score(score: float) -> Priority:
     return "LOW"
 
 
-def classify_level(text: str) -> Level:
-    lower = text.lower()
-    counts = Counter()
+def classify_level(text: str, word_boundary: bool = False) -> Level:
+    return level_from_counts(count_terms(text, word_boundary=word_boundary))
+
+
+def level_from_counts(counts: Mapping[str, int]) -> Level:
+    level_hits = Counter()
     for level, terms in LEVEL_TERMS.items():
-        counts[level] = _count_term_hits(lower, terms)
-    if counts["EXPERT"] >= 1 and counts["ADVANCED"] + counts["EXPERT"] >= 2:
+        level_hits[level] = _count_term_hits(counts, terms)
+    if level_hits["EXPERT"] >= 1 and level_hits["ADVANCED"] + level_hits["EXPERT"] >= 2:
         return "EXPERT"
-    if counts["ADVANCED"] >= 1:
+    if level_hits["ADVANCED"] >= 1:
         return "ADVANCED"
-    if counts["INTERMEDIATE"] >= 1:
+    if level_hits["INTERMEDIATE"] >= 1:
         return "INTERMEDIATE"
     return "BASIC"
 
@@ -176,9 +271,12 @@ def score_explanation(breakdown: ScoreBreakdown, level: Level) -> str:
     return f"Level {level}. Priority driven by {', '.join(drivers)}; evidence terms: {evidence}."
 
 
-def _count_term_hits(text: str, terms: Iterable[str]) -> int:
-    total = 0
-    for term in terms:
-        pattern = re.escape(term)
-        total += len(re.findall(pattern, text))
-    return total
+def _mtime_ns(source: Any) -> Optional[int]:
+    try:
+        return os.stat(source).st_mtime_ns
+    except (OSError, TypeError):
+        return None
+
+
+def _count_term_hits(counts: Mapping[str, int], terms: Iterable[str]) -> int:
+    return sum(counts.get(term, 0) for term in terms)
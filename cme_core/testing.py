@@ -0,0 +1,58 @@
+"""Synthetic input builders shared by the test suite and the benchmarks."""
+
+from __future__ import annotations
+
+from typing import List, Sequence
+
+
+def build_text_pdf(pages: Sequence[Sequence[str]]) -> bytes:
+    """Build a minimal multi-page PDF with one Helvetica text line per entry."""
+    objects: List[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for lines in pages:
+        commands = ["BT", "/F1 10 Tf", "14 TL", "50 780 Td"]
+        for line in lines:
+            escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            commands.append(f"({escaped}) Tj T*")
+        commands.append("ET")
+        stream = "\n".join(commands).encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode("latin-1")
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref_offset = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        output += b"%010d 00000 n \n" % offset
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    return bytes(output)
+
+
+def wrap_line(line: str, width: int = 95) -> List[str]:
+    """Greedy word wrap of ``line`` to ``width`` characters, as text lines inside a PDF page."""
+    wrapped: List[str] = []
+    current = ""
+    for word in line.split():
+        if current and len(current) + len(word) + 1 > width:
+            wrapped.append(current)
+            current = word
+        else:
+            current = f"{current} {word}".strip()
+    if current:
+        wrapped.append(current)
+    return wrapped
@@ -1,10 +1,10 @@
 from __future__ import annotations
 
 import re
-from collections import Counter
 from dataclasses import dataclass
-from typing import Dict, List
+from typing import Dict, List, Optional
 
+from .matching import TermMatcher
 from .models import Chunk
 
 GENERIC_HEADINGS = {
@@ -51,6 +51,21 @@ TOPIC_LEXICON = {
 }
 
 
+# Aliases map to the position of the first canonical that lists them, so a single
+# scan can return the same canonical as checking TOPIC_LEXICON in order.
+_LEXICON_CANONICALS = list(TOPIC_LEXICON)
+_ALIAS_RANKS: Dict[str, int] = {}
+for _rank, _aliases in enumerate(TOPIC_LEXICON.values()):
+    for _alias in _aliases:
+        _ALIAS_RANKS.setdefault(_alias, _rank)
+_LEXICON_MATCHER = TermMatcher(_ALIAS_RANKS)
+
+TOKEN_RE = re.compile(r"[A-Za-z][A-Za-z0-9\-]+")
+# Distinct n-grams tracked by the label fallback; beyond this the counter turns
+# into a Misra-Gries heavy-hitter sketch so memory stays bounded.
+NGRAM_CAPACITY = 4096
+
+
 @dataclass(frozen=True)
 class TopicSeed:
     label: str
@@ -62,7 +77,7 @@ def propose_topic_seeds(chunks: List[Chunk]) -> List[TopicSeed]:
     labels: Dict[str, str] = {}
     for chunk in chunks:
         label = derive_topic_label(chunk)
-        normalized = _normalize_label(label)
+        normalized = normalize_label(label)
         grouped.setdefault(normalized, []).append(chunk)
         labels[normalized] = label
     return [TopicSeed(label=labels[key], chunks=value) for key, value in grouped.items()]
@@ -74,34 +89,85 @@ def derive_topic_label(chunk: Chunk) -> str:
         return heading
 
     text_lower = chunk.text.lower()
-    for canonical, aliases in TOPIC_LEXICON.items():
-        if any(alias in text_lower for alias in aliases):
-            return canonical
+    canonical = lexicon_canonical(text_lower)
+    if canonical:
+        return canonical
 
     sentence = _first_sentence(chunk.text)
     nounish = re.match(r"([A-Z][A-Za-z0-9/\- ]{3,70}?)(?: is| are| remains| requires| should| can| may)", sentence)
     if nounish:
         return nounish.group(1).strip()
 
-    tokens = re.findall(r"[A-Za-z][A-Za-z0-9\-]+", text_lower)
-    candidates = Counter()
-    for size in (2, 3):
-        for index in range(len(tokens) - size + 1):
-            ngram = tokens[index : index + size]
-            if ngram[0] in STOPWORDS or ngram[-1] in STOPWORDS:
-                continue
-            phrase = " ".join(ngram)
-            candidates[phrase] += 1
-    if candidates:
-        best, _ = max(candidates.items(), key=lambda item: (item[1], len(item[0])))
+    best = _most_common_phrase(TOKEN_RE.finditer(text_lower))
+    if best:
         return best.title()
     return "Key Topic"
 
 
+def lexicon_canonical(text_lower: str) -> Optional[str]:
+    ranks = [_ALIAS_RANKS[alias] for alias in _LEXICON_MATCHER.present(text_lower)]
+    return _LEXICON_CANONICALS[min(ranks)] if ranks else None
+
+
+def lexicon_alias_counts(text_lower: str) -> Dict[str, int]:
+    """Hits for each ``TOPIC_LEXICON`` alias present in ``text_lower``."""
+    return {alias: hits for alias, hits in _LEXICON_MATCHER.count(text_lower).items() if hits}
+
+
+def _most_common_phrase(token_matches) -> Optional[str]:
+    """Most frequent 2/3-gram without stopword edges, ties broken by length then first seen.
+
+    N-grams are counted under integer keys built from interned token ids, so no
+    phrase string is built until the winner is known.
+    """
+    vocabulary: Dict[str, int] = {}
+    token_ids = [vocabulary.setdefault(match.group(0), len(vocabulary)) for match in token_matches]
+    words = list(vocabulary)
+    stop_ids = {vocabulary[word] for word in STOPWORDS if word in vocabulary}
+    width = len(words) + 1
+    counts: Dict[int, int] = {}
+    for size in (2, 3):
+        offset = 0 if size == 2 else width * width
+        for index in range(len(token_ids) - size + 1):
+            first, last = token_ids[index], token_ids[index + size - 1]
+            if first in stop_ids or last in stop_ids:
+                continue
+            key = first * width + token_ids[index + 1]
+            if size == 3:
+                key = key * width + last
+            key += offset
+            if key in counts:
+                counts[key] += 1
+            elif len(counts) < NGRAM_CAPACITY:
+                counts[key] = 1
+            else:
+                for other in list(counts):
+                    counts[other] -= 1
+                    if not counts[other]:
+                        del counts[other]
+    if not counts:
+        return None
+
+    lengths = [len(word) for word in words]
+
+    def decode(key: int) -> List[int]:
+        if key >= width * width:
+            key -= width * width
+            return [key // (width * width), key // width % width, key % width]
+        return [key // width, key % width]
+
+    def phrase_length(key: int) -> int:
+        ids = decode(key)
+        return sum(lengths[token_id] for token_id in ids) + len(ids) - 1
+
+    best_key = max(counts, key=lambda key: (counts[key], phrase_length(key)))
+    return " ".join(words[token_id] for token_id in decode(best_key))
+
+
 def _first_sentence(text: str) -> str:
     sentence = re.split(r"(?<=[.!?])\s+", text.strip(), maxsplit=1)[0]
     return sentence[:120]
 
 
-def _normalize_label(label: str) -> str:
+def normalize_label(label: str) -> str:
     return re.sub(r"[^a-z0-9]+", "-", label.lower()).strip("-")
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+
+@dataclass
+class StageStats:
+    calls: int = 0
+    seconds: float = 0.0
+    counts: Dict[str, int] = field(default_factory=dict)
+    peak_memory_bytes: Optional[int] = None
+
+    def add(self, name: str, amount: int = 1) -> None:
+        self.counts[name] = self.counts.get(name, 0) + amount
+
+    def to_dict(self) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {"calls": self.calls, "seconds": round(self.seconds, 6), "counts": dict(self.counts)}
+        if self.peak_memory_bytes is not None:
+            payload["peak_memory_bytes"] = self.peak_memory_bytes
+        return payload
+
+
+class PipelineTracer:
+    """Per-stage wall time, call counts and item counts for one pipeline run.
+
+    Stages may nest, and a nested stage's time is also counted in its parent.
+    With ``track_memory`` the tracer runs ``tracemalloc`` while any stage is
+    open and records the peak allocated above each stage's starting point.
+    """
+
+    def __init__(self, track_memory: bool = False) -> None:
+        self.track_memory = track_memory
+        self.stages: Dict[str, StageStats] = {}
+        self._lock = threading.Lock()
+        self._open_memory_frames: List[List[int]] = []
+        self._owns_tracemalloc = False
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageStats]:
+        with self._lock:
+            stats = self.stages.setdefault(name, StageStats())
+            stats.calls += 1
+        frame = self._enter_memory_frame()
+        started = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            elapsed = time.perf_counter() - started
+            peak = self._exit_memory_frame(frame)
+            with self._lock:
+                stats.seconds += elapsed
+                if peak is not None:
+                    stats.peak_memory_bytes = max(stats.peak_memory_bytes or 0, peak)
+
+    def merge(self, other: "PipelineTracer") -> "PipelineTracer":
+        """Fold ``other``'s stages into this tracer and return it."""
+        with self._lock:
+            for name, source in other.stages.items():
+                stats = self.stages.setdefault(name, StageStats())
+                stats.calls += source.calls
+                stats.seconds += source.seconds
+                for count_name, amount in source.counts.items():
+                    stats.add(count_name, amount)
+                if source.peak_memory_bytes is not None:
+                    stats.peak_memory_bytes = max(stats.peak_memory_bytes or 0, source.peak_memory_bytes)
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"stages": {name: stats.to_dict() for name, stats in self.stages.items()}}
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), separators=(",", ":"))
+
+    def _enter_memory_frame(self) -> Optional[List[int]]:
+        if not self.track_memory:
+            return None
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+        self._record_peak()
+        frame = [tracemalloc.get_traced_memory()[0], 0]
+        self._open_memory_frames.append(frame)
+        return frame
+
+    def _exit_memory_frame(self, frame: Optional[List[int]]) -> Optional[int]:
+        if frame is None:
+            return None
+        self._record_peak()
+        self._open_memory_frames.remove(frame)
+        if not self._open_memory_frames and self._owns_tracemalloc:
+            tracemalloc.stop()
+            self._owns_tracemalloc = False
+        return max(0, frame[1] - frame[0])
+
+    def _record_peak(self) -> None:
+        # reset_peak lets each stage see its own peak, so push the peak so far into every open stage first.
+        peak = tracemalloc.get_traced_memory()[1]
+        for frame in self._open_memory_frames:
+            frame[1] = max(frame[1], peak)
+        tracemalloc.reset_peak()
+
+
+class NullTracer(PipelineTracer):
+    """Default tracer that records nothing."""
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageStats]:
+        yield _DISCARDED_STATS
+
+
+class _DiscardedStats(StageStats):
+    def add(self, name: str, amount: int = 1) -> None:
+        return None
+
+
+_DISCARDED_STATS = _DiscardedStats()
+NULL_TRACER = NullTracer()
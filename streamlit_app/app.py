@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import logging
 import sys
 from pathlib import Path
 
@@ -10,17 +11,24 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from cme_core import extract, ingest, rank  # noqa: E402
+from cme_core.cache import ResultCache, default_document_cache, default_http_cache  # noqa: E402
+from cme_core.dedup import dedupe_document  # noqa: E402
 from cme_core.models import AnalysisOptions  # noqa: E402
+from cme_core.tracing import PipelineTracer  # noqa: E402
 from streamlit_app.ui_components import (  # noqa: E402
-    filter_topics,
+    render_dedup_summary,
     render_export_buttons,
     render_topic_details,
-    topic_rows,
+    render_trace_panel,
+    result_view,
 )
 
 APP_KEY = "analysis_result"
 URL_PREVIEW_KEY = "url_preview_document"
+URL_PREVIEW_TRACE_KEY = "url_preview_trace"
 URL_INPUT_KEY = "url_input"
+RESULT_CACHE_KEY = "result_cache"
+LOGGER = logging.getLogger("neurocme.pipeline")
 
 
 def main() -> None:
@@ -38,35 +46,60 @@ def main() -> None:
             desired_depth=desired_depth,
             output_type=output_type,
         )
+        dedupe = st.checkbox(
+            "Drop repeated headers and footers",
+            value=False,
+            help="Removes running headers, page footers and banners repeated across pages before analysis.",
+        )
         st.markdown("Only plain HTML fetch is supported for URLs. Uploads are processed in memory and not stored by default.")
 
     pdf_tab, url_tab = st.tabs(["Upload PDF", "Paste URL"])
     with pdf_tab:
-        render_pdf_tab(options)
+        render_pdf_tab(dedupe)
     with url_tab:
-        render_url_tab(options)
+        render_url_tab(dedupe)
 
     result = st.session_state.get(APP_KEY)
     if result:
-        render_results(result["document"], result["topics"], output_type)
+        trace = PipelineTracer().merge(result["trace"])
+        topics = rank.rank_document(
+            document=result["document"],
+            chunks=result["chunks"],
+            options=options,
+            prepared=result["prepared"],
+            # Keyed by document content, so deduplicated and full documents never share results.
+            result_cache=st.session_state.setdefault(RESULT_CACHE_KEY, ResultCache(max_entries=16)),
+            tracer=trace,
+        )
+        # Reruns that only change filters hit the result cache; log the trace once per analysis.
+        if trace.stages["result_cache"].counts.get("misses"):
+            LOGGER.info(trace.to_json())
+        render_results(
+            result["document"], topics, options, result["prepared"].scoring_config.content_hash, trace, result["dedup"]
+        )
 
 
-def render_pdf_tab(options: AnalysisOptions) -> None:
+def render_pdf_tab(dedupe: bool = False) -> None:
     st.subheader("PDF Ingest")
     uploaded_file = st.file_uploader("Upload a PDF review, guideline, or chapter", type=["pdf"])
     if uploaded_file is not None:
         st.write(f"Selected file: `{uploaded_file.name}`")
         if st.button("Analyze PDF", type="primary", width="content"):
             try:
-                document = ingest.ingest_pdf_bytes(uploaded_file.getvalue(), source_name=uploaded_file.name)
-                topics = analyze_document(document, options)
-                st.session_state[APP_KEY] = {"document": document, "topics": topics}
+                trace = PipelineTracer()
+                document = ingest.ingest_pdf_bytes(
+                    uploaded_file.getvalue(),
+                    source_name=uploaded_file.name,
+                    cache=default_document_cache(),
+                    tracer=trace,
+                )
+                st.session_state[APP_KEY] = analyze_document(document, trace, dedupe=dedupe)
                 st.success("PDF analyzed.")
             except Exception as exc:
                 st.error(f"PDF analysis failed: {exc}")
 
 
-def render_url_tab(options: AnalysisOptions) -> None:
+def render_url_tab(dedupe: bool = False) -> None:
     st.subheader("URL Ingest")
     default_url = st.session_state.get(URL_INPUT_KEY, "")
     url = st.text_input("Open-access article URL", value=default_url, key=URL_INPUT_KEY)
@@ -76,8 +109,10 @@ def render_url_tab(options: AnalysisOptions) -> None:
             st.warning("Enter a URL first.")
         else:
             try:
-                document = ingest.ingest_url(url.strip())
+                trace = PipelineTracer()
+                document = ingest.ingest_url(url.strip(), cache=default_http_cache(), tracer=trace)
                 st.session_state[URL_PREVIEW_KEY] = document
+                st.session_state[URL_PREVIEW_TRACE_KEY] = trace
                 st.success("Fetched URL preview.")
             except Exception as exc:
                 st.error(f"URL fetch failed: {exc}")
@@ -88,10 +123,12 @@ def render_url_tab(options: AnalysisOptions) -> None:
             try:
                 document = st.session_state.get(URL_PREVIEW_KEY)
                 if document is None or document.source_ref != url.strip():
-                    document = ingest.ingest_url(url.strip())
+                    trace = PipelineTracer()
+                    document = ingest.ingest_url(url.strip(), cache=default_http_cache(), tracer=trace)
                     st.session_state[URL_PREVIEW_KEY] = document
-                topics = analyze_document(document, options)
-                st.session_state[APP_KEY] = {"document": document, "topics": topics}
+                    st.session_state[URL_PREVIEW_TRACE_KEY] = trace
+                trace = PipelineTracer().merge(st.session_state.get(URL_PREVIEW_TRACE_KEY) or PipelineTracer())
+                st.session_state[APP_KEY] = analyze_document(document, trace, dedupe=dedupe)
                 st.success("URL analyzed.")
             except Exception as exc:
                 st.error(f"URL analysis failed: {exc}")
@@ -103,25 +140,37 @@ def render_url_tab(options: AnalysisOptions) -> None:
             st.markdown(f"- `{paragraph.anchor.label}`: {paragraph.text[:220]}...")
 
 
-def analyze_document(document, options: AnalysisOptions):
-    chunks = extract.extract_chunks(document)
-    return rank.rank_document(document=document, chunks=chunks, options=options)
+def analyze_document(document, trace=None, dedupe: bool = False):
+    # Keep the option-independent ranking so sidebar changes only re-rank, never re-score.
+    trace = trace or PipelineTracer()
+    dedup_stats = None
+    if dedupe:
+        document, dedup_stats = dedupe_document(document, tracer=trace)
+    chunks = extract.extract_chunks(document, tracer=trace)
+    prepared = rank.prepare_ranking(chunks, tracer=trace)
+    return {"document": document, "chunks": chunks, "prepared": prepared, "trace": trace, "dedup": dedup_stats}
 
 
-def render_results(document, topics, output_type: str) -> None:
+def render_results(
+    document, topics, options: AnalysisOptions, config_hash: str, trace=None, dedup_stats=None
+) -> None:
     st.divider()
     st.subheader("Results")
     st.markdown(f"**Document**: {document.title}")
+    if dedup_stats is not None:
+        render_dedup_summary(dedup_stats)
     priorities = st.multiselect("Filter priority", ["HIGH", "MEDIUM", "LOW"], default=["HIGH", "MEDIUM", "LOW"])
     levels = st.multiselect(
         "Filter level",
         ["BASIC", "INTERMEDIATE", "ADVANCED", "EXPERT"],
         default=["BASIC", "INTERMEDIATE", "ADVANCED", "EXPERT"],
     )
-    filtered_topics = filter_topics(topics, priorities=priorities, levels=levels)
-    st.dataframe(topic_rows(filtered_topics), hide_index=True, width="stretch")
-    render_topic_details(filtered_topics, output_type=output_type)
-    render_export_buttons(document, filtered_topics)
+    view = result_view(st.session_state, document, topics, options, config_hash, priorities, levels)
+    st.dataframe(view.rows, hide_index=True, width="stretch")
+    render_topic_details(view.topics, output_type=options.output_type)
+    render_export_buttons(view)
+    if trace is not None:
+        render_trace_panel(trace)
 
 
 if __name__ == "__main__":
@@ -1,11 +1,72 @@
 from __future__ import annotations
 
-from typing import Dict, Iterable, List, Sequence
+import functools
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, MutableMapping, Sequence, Tuple
 
 import streamlit as st
 
-from cme_core.models import NormalizedDocument, Topic
-from cme_core.outputs import export_anki_tsv, export_topics_csv, export_topics_json, export_topics_markdown
+from cme_core.cache import document_content_hash
+from cme_core.dedup import DedupStats
+from cme_core.models import AnalysisOptions, NormalizedDocument, Topic
+from cme_core.outputs import iter_export_bytes
+from cme_core.tracing import PipelineTracer
+
+RESULT_VIEWS_KEY = "result_views"
+MAX_RESULT_VIEWS = 8
+# (export format, button label, file name, mime type)
+EXPORT_BUTTONS = (
+    ("json", "Download JSON", "neurocme_topics.json", "application/json"),
+    ("csv", "Download CSV", "neurocme_topics.csv", "text/csv"),
+    ("markdown", "Download Markdown", "neurocme_topics.md", "text/markdown"),
+    ("anki", "Download Anki TSV", "neurocme_flashcards.tsv", "text/tab-separated-values"),
+)
+
+
+class ResultView:
+    """Filtered topics, table rows and export payloads for one results view.
+
+    Export payloads are built on first request and then reused, so reruns that
+    land on an already seen view do no export work at all.
+    """
+
+    def __init__(self, document: NormalizedDocument, topics: Sequence[Topic]) -> None:
+        self.document = document
+        self.topics = list(topics)
+        self.rows = topic_rows(self.topics)
+        self._exports: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def export(self, export_format: str) -> bytes:
+        # Download callables run off the script thread, so guard against a concurrent rerun.
+        with self._lock:
+            payload = self._exports.get(export_format)
+            if payload is None:
+                payload = b"".join(iter_export_bytes(export_format, self.document, self.topics))
+                self._exports[export_format] = payload
+            return payload
+
+
+def result_view(
+    memo: MutableMapping[str, object],
+    document: NormalizedDocument,
+    topics: Sequence[Topic],
+    options: AnalysisOptions,
+    config_hash: str,
+    priorities: Iterable[str],
+    levels: Iterable[str],
+) -> ResultView:
+    """Memoized view keyed by (document hash, options, scoring config hash, filter set) in a per-session LRU."""
+    views: "OrderedDict[Tuple[object, ...], ResultView]" = memo.setdefault(RESULT_VIEWS_KEY, OrderedDict())
+    key = (document_content_hash(document), options, config_hash, frozenset(priorities), frozenset(levels))
+    view = views.get(key)
+    if view is None:
+        view = views[key] = ResultView(document, filter_topics(topics, priorities=key[3], levels=key[4]))
+        while len(views) > MAX_RESULT_VIEWS:
+            views.popitem(last=False)
+    views.move_to_end(key)
+    return view
 
 
 def topic_rows(topics: Sequence[Topic]) -> List[Dict[str, str]]:
@@ -50,41 +111,49 @@ def render_topic_details(topics: Sequence[Topic], output_type: str) -> None:
                 _render_list("Key Decision Points", topic.key_decision_points)
 
 
-def render_export_buttons(document: NormalizedDocument, topics: Sequence[Topic]) -> None:
-    json_payload = export_topics_json(document, topics)
-    csv_payload = export_topics_csv(topics)
-    markdown_payload = export_topics_markdown(document, topics)
-    anki_payload = export_anki_tsv(topics)
+def render_export_buttons(view: ResultView) -> None:
+    # Payloads are produced only when a download is clicked, and downloading does not rerun the app.
+    for column, (export_format, label, file_name, mime) in zip(st.columns(len(EXPORT_BUTTONS)), EXPORT_BUTTONS):
+        column.download_button(
+            label,
+            data=functools.partial(view.export, export_format),
+            file_name=file_name,
+            mime=mime,
+            on_click="ignore",
+            width="stretch",
+        )
 
-    col1, col2, col3, col4 = st.columns(4)
-    col1.download_button(
-        "Download JSON",
-        data=json_payload,
-        file_name="neurocme_topics.json",
-        mime="application/json",
-        width="stretch",
-    )
-    col2.download_button(
-        "Download CSV",
-        data=csv_payload,
-        file_name="neurocme_topics.csv",
-        mime="text/csv",
-        width="stretch",
-    )
-    col3.download_button(
-        "Download Markdown",
-        data=markdown_payload,
-        file_name="neurocme_topics.md",
-        mime="text/markdown",
-        width="stretch",
-    )
-    col4.download_button(
-        "Download Anki TSV",
-        data=anki_payload,
-        file_name="neurocme_flashcards.tsv",
-        mime="text/tab-separated-values",
-        width="stretch",
+
+def render_dedup_summary(stats: DedupStats) -> None:
+    st.caption(
+        f"Removed {stats.removed} of {stats.paragraphs} paragraphs as repeated headers, footers or banners "
+        f"({stats.exact_duplicates} exact, {stats.near_duplicates} near-duplicate)."
     )
+    examples = stats.to_dict()["most_repeated"]
+    if examples:
+        with st.expander("Removed paragraphs", expanded=False):
+            st.table([{"Paragraph": item["snippet"], "Copies removed": str(item["removed"])} for item in examples])
+
+
+def trace_rows(trace: PipelineTracer) -> List[Dict[str, str]]:
+    rows = []
+    for name, stats in trace.stages.items():
+        rows.append(
+            {
+                "Stage": name,
+                "Calls": str(stats.calls),
+                "Time (ms)": f"{stats.seconds * 1000:.1f}",
+                "Items": ", ".join(f"{key}: {value}" for key, value in stats.counts.items()),
+                "Peak memory (MB)": "" if stats.peak_memory_bytes is None else f"{stats.peak_memory_bytes / 1e6:.1f}",
+            }
+        )
+    return rows
+
+
+def render_trace_panel(trace: PipelineTracer) -> None:
+    with st.expander("Pipeline timings", expanded=False):
+        st.table(trace_rows(trace))
+        st.code(trace.to_json(), language="json")
 
 
 def _render_list(title: str, items: Sequence[str]) -> None:
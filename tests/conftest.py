@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from cme_core.testing import build_text_pdf, wrap_line
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture
+def chapter_pdf_bytes() -> bytes:
+    chapter = (ROOT / "sample_data" / "sample_chapter.txt").read_text(encoding="utf-8")
+    lines = [line.strip() for line in chapter.splitlines()]
+    pages = []
+    for page_index in range(12):
+        page_lines = [f"Section {page_index + 1} Review", ""]
+        for line in lines:
+            page_lines.extend(wrap_line(line) if line else [""])
+        pages.append(page_lines[:48])
+    return build_text_pdf(pages)
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import json
+import shutil
+from pathlib import Path
+
+from cme_core import batch
+
+
+ROOT = Path(__file__).resolve().parents[1]
+SAMPLE_DIR = ROOT / "sample_data"
+
+
+def test_batch_cli_writes_outputs_and_resumes(tmp_path: Path, capsys) -> None:
+    inputs = tmp_path / "inputs"
+    inputs.mkdir()
+    shutil.copy(SAMPLE_DIR / "sample_page.pdf", inputs)
+    shutil.copy(SAMPLE_DIR / "sample_article.html", inputs)
+    output = tmp_path / "out"
+
+    assert batch.main([str(inputs), "-o", str(output), "-f", "jsonl", "csv", "anki", "-w", "2"]) == 0
+    records = [json.loads(line) for line in (output / "topics.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert sorted(Path(record["input"]).name for record in records) == ["sample_article.html", "sample_page.pdf"]
+    assert all(record["topics"] for record in records)
+    assert len(list(output.glob("*.csv"))) == len(list(output.glob("*.anki.tsv"))) == 2
+    assert "Processed 2 documents" in capsys.readouterr().out
+
+    # Simulate a crash while writing the second record: only the first input is complete.
+    lines = (output / "topics.jsonl").read_text(encoding="utf-8").splitlines(keepends=True)
+    (output / "topics.jsonl").write_text(lines[0] + lines[1][:40], encoding="utf-8")
+    assert batch.main([str(inputs), "-o", str(output), "-f", "jsonl", "csv", "anki", "-w", "1"]) == 0
+    assert "Processed 1 documents" in capsys.readouterr().out
+    assert len((output / "topics.jsonl").read_text(encoding="utf-8").splitlines()) == 2
+
+
+def test_batch_dedupe_is_opt_in_and_reported(tmp_path: Path, capsys) -> None:
+    inputs = tmp_path / "inputs"
+    inputs.mkdir()
+    html = (SAMPLE_DIR / "sample_article.html").read_text(encoding="utf-8")
+    banner = "<p>Subscribe to the Neurocritical Care Review for weekly board-style cases and updates.</p>"
+    (inputs / "banners.html").write_text(html.replace("</h2>", "</h2>" + banner), encoding="utf-8")
+    assert html.count("</h2>") >= 2
+
+    assert batch.main([str(inputs), "-o", str(tmp_path / "plain"), "-w", "1"]) == 0
+    plain = json.loads((tmp_path / "plain" / "topics.jsonl").read_text(encoding="utf-8"))
+    assert "dedup" not in plain["document"]["metadata"]
+    assert "duplicate" not in capsys.readouterr().out
+
+    assert batch.main([str(inputs), "-o", str(tmp_path / "deduped"), "-w", "1", "--dedupe"]) == 0
+    record = json.loads((tmp_path / "deduped" / "topics.jsonl").read_text(encoding="utf-8"))
+    removed = html.count("</h2>") - 1
+    assert record["document"]["metadata"]["dedup"]["exact_duplicates"] == removed
+    assert len(record["document"]["paragraphs"]) == len(plain["document"]["paragraphs"]) - removed
+    assert f"{removed} duplicate paragraphs removed" in capsys.readouterr().out
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import importlib.util
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _stage_benchmarks():
+    spec = importlib.util.spec_from_file_location("stage_benchmarks", ROOT / "benchmarks" / "stage_benchmarks.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_find_regressions_applies_threshold_and_noise_floor() -> None:
+    benchmarks = _stage_benchmarks()
+    baseline = {"1": {"extract_chunks": 0.001, "score_text": 0.100}, "100": {"rank_chunks": 0.200}}
+    results = {
+        "1": {"extract_chunks": 0.0025, "score_text": 0.124},
+        "100": {"rank_chunks": 0.300, "export_topics_csv": 9.0},
+    }
+
+    # 150% slower but only 1.5 ms: noise. 24% slower: within threshold. No baseline: skipped.
+    assert benchmarks.find_regressions(results, baseline) == [("100", "rank_chunks", 0.200, 0.300)]
+    assert benchmarks.find_regressions(results, baseline, threshold=0.6) == []
+    assert benchmarks.find_regressions(results, baseline, threshold=0.2) == [
+        ("1", "score_text", 0.100, 0.124),
+        ("100", "rank_chunks", 0.200, 0.300),
+    ]
+
+
+def test_benchmark_corpus_builds_without_the_test_suite(tmp_path: Path, monkeypatch) -> None:
+    script = "import runpy, sys; runpy.run_path(sys.argv[1]); assert 'pytest' not in sys.modules"
+    subprocess.run([sys.executable, "-c", script, str(ROOT / "benchmarks" / "stage_benchmarks.py")], check=True)
+
+    benchmarks = _stage_benchmarks()
+    corpus = benchmarks.build_corpus(1)
+    assert corpus.pdf_bytes.startswith(b"%PDF-1.4") and "<h2>" in corpus.html
+
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps({"results": {"1": {"score_text": 1e-9}}}), encoding="utf-8")
+    monkeypatch.setattr(benchmarks, "run_suite", lambda *args, **kwargs: {"1": {"score_text": 1.0}})
+    assert benchmarks.main(["--baseline", str(baseline), "--scales", "1"]) == 1
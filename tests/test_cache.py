@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+from cme_core import extract, ingest, rank
+from cme_core.cache import ResultCache, document_content_hash
+from cme_core.models import AnalysisOptions
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_result_cache_memoizes_ranked_topics_across_tiers(tmp_path: Path, monkeypatch) -> None:
+    html = (ROOT / "sample_data" / "sample_article.html").read_text(encoding="utf-8")
+    document = ingest.document_from_html(html=html, url="https://example.test/sample")
+    chunks = extract.extract_chunks(document)
+    options = AnalysisOptions(specialty_focus="ECMO")
+    cache = ResultCache(tmp_path / "results", max_entries=2)
+
+    cold = rank.rank_document(document=document, chunks=chunks, options=options, result_cache=cache)
+
+    def fail_prepare(*args, **kwargs):
+        raise AssertionError("cached results should not be recomputed")
+
+    monkeypatch.setattr(rank, "prepare_ranking", fail_prepare)
+    assert rank.rank_document(document=document, chunks=chunks, options=options, result_cache=cache) == cold
+
+    from_disk = ResultCache(tmp_path / "results")
+    assert rank.rank_document(document=document, chunks=chunks, options=options, result_cache=from_disk) == cold
+
+    from_disk.invalidate(document)
+    assert from_disk.store.keys() == []
+    with pytest.raises(AssertionError, match="should not be recomputed"):
+        rank.rank_document(document=document, chunks=chunks, options=options, result_cache=from_disk)
+
+
+def test_result_cache_write_failures_do_not_fail_ranking(tmp_path: Path) -> None:
+    html = (ROOT / "sample_data" / "sample_article.html").read_text(encoding="utf-8")
+    document = ingest.document_from_html(html=html, url="https://example.test/sample")
+    chunks = extract.extract_chunks(document)
+    cache = ResultCache(tmp_path / "results")
+    # Replace the store directory with a file so every write raises OSError.
+    (tmp_path / "results").rmdir()
+    (tmp_path / "results").write_bytes(b"")
+
+    topics = rank.rank_document(document=document, chunks=chunks, result_cache=cache)
+    assert topics == rank.rank_document(document=document, chunks=chunks)
+    assert rank.rank_document(document=document, chunks=chunks, result_cache=cache) == topics
+
+
+def test_document_content_hash_is_stored_per_document() -> None:
+    html = (ROOT / "sample_data" / "sample_article.html").read_text(encoding="utf-8")
+    document = ingest.document_from_html(html=html, url="https://example.test/sample")
+
+    content_hash = document_content_hash(document)
+    assert document._content_hash == content_hash
+    assert document_content_hash(replace(document, title="Renamed")) == content_hash
+    assert document_content_hash(replace(document, paragraphs=list(document.paragraphs)[1:])) != content_hash
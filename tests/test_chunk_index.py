@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from dataclasses import replace
+from pathlib import Path
+
+from cme_core import extract, ingest
+from cme_core.chunk_index import ChunkIndex
+from cme_core.models import NormalizedDocument, Paragraph, SourceAnchor
+from cme_core.topics import derive_topic_label, normalize_label
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_chunk_index_persists_and_answers_queries(tmp_path: Path) -> None:
+    html = (ROOT / "sample_data" / "sample_article.html").read_text(encoding="utf-8")
+    first = ingest.document_from_html(html=html, url="https://example.test/a")
+    second = replace(first, document_id="second-copy")
+
+    with ChunkIndex(tmp_path / "index") as index:
+        assert index.add_document(first)
+        assert not index.add_document(first)
+        assert index.add_documents([second]) == 1
+        hits = index.search(["herniation", "Intracranial Pressure"])
+        index.compact()
+        assert [hit.chunk_id for hit in index.search(["herniation", "Intracranial Pressure"])] == [
+            hit.chunk_id for hit in hits
+        ]
+
+    chunk = next(chunk for chunk in extract.extract_chunks(first) if "herniation" in chunk.text)
+    assert {hit.document_id for hit in hits} == {first.document_id, "second-copy"}
+    assert chunk.chunk_id in {hit.chunk_id for hit in hits}
+    assert all(hit.hits["term:herniation"] and hit.anchors for hit in hits)
+
+    with ChunkIndex(tmp_path / "index") as reopened:
+        assert len(reopened) == 2 * len(extract.extract_chunks(first))
+        assert second.document_id in reopened
+        assert reopened.search(["no-such-label"]) == []
+        assert len(reopened.search(["herniation", "seizure"], mode="any")) >= len(hits)
+
+
+def test_chunk_index_resolves_topic_names_and_labels(tmp_path: Path) -> None:
+    filler = " Reassess the neurologic examination frequently and document every change in the chart."
+    sections = {
+        "Raised ICP": "Rising ICP with signs of herniation needs hyperosmolar therapy and urgent imaging." + filler * 3,
+        "Pressure Monitoring": "Intracranial pressure monitoring guides therapy after severe brain injury." + filler * 3,
+        "Seizure Control": "Status epilepticus needs benzodiazepines first and rapid escalation." + filler * 3,
+    }
+    paragraphs = [
+        Paragraph(text, SourceAnchor(paragraph=index, section=heading), section_heading=heading)
+        for index, (heading, text) in enumerate(sections.items(), start=1)
+    ]
+    document = NormalizedDocument("doc", "ICU", "text", "icu.txt", paragraphs)
+    chunks = extract.extract_chunks(document)
+    by_heading = {chunk.heading: chunk for chunk in chunks}
+
+    with ChunkIndex(tmp_path / "index") as index:
+        index.add_document(document)
+        assert index.resolve("Intracranial Pressure") == "topic:Intracranial Pressure"
+        assert index.resolve("status epilepticus") == "topic:Status Epilepticus"
+        assert index.resolve("herniation") == "term:herniation"
+
+        topic_hits = {hit.chunk_id for hit in index.search(["Intracranial Pressure"])}
+        phrase_hits = {hit.chunk_id for hit in index.search(["term:intracranial pressure"])}
+        assert topic_hits == {by_heading["Raised ICP"].chunk_id, by_heading["Pressure Monitoring"].chunk_id}
+        assert phrase_hits == {by_heading["Pressure Monitoring"].chunk_id}
+
+        label = derive_topic_label(by_heading["Seizure Control"])
+        assert index.resolve(label) == f"label:{normalize_label(label)}"
+        assert [hit.chunk_id for hit in index.search([label])] == [by_heading["Seizure Control"].chunk_id]
+        assert index.search([f"label:{normalize_label(label)}"]) == index.search([label])
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from cme_core import extract, ingest
+from cme_core.models import Paragraph, SourceAnchor
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_iter_chunks_streams_identical_chunks_from_any_iterable() -> None:
+    html = (ROOT / "sample_data" / "sample_article.html").read_text(encoding="utf-8")
+    document = ingest.document_from_html(html=html, url="https://example.test/sample")
+
+    streamed = extract.iter_chunks(
+        (paragraph for paragraph in document.paragraphs),
+        document_id=document.document_id,
+        source_type=document.source_type,
+    )
+    assert [chunk.to_dict() for chunk in streamed] == [chunk.to_dict() for chunk in extract.extract_chunks(document)]
+
+    consumed = []
+
+    def paragraph_stream():
+        for index in range(10):
+            consumed.append(index)
+            yield Paragraph(text="x" * 600, anchor=SourceAnchor(paragraph=index + 1), section_heading="Long")
+
+    first = next(extract.iter_chunks(paragraph_stream(), max_chars=1100, min_chars=280))
+    assert first.paragraph_count == 1
+    assert len(consumed) == 2
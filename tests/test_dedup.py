@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import pytest
+
+from cme_core import extract
+from cme_core.dedup import ParagraphDeduplicator, dedupe_document
+from cme_core.models import NormalizedDocument, Paragraph, SourceAnchor
+
+
+BODY = [
+    "Status epilepticus needs benzodiazepines first and rapid escalation when seizures continue.",
+    "Intracranial pressure crises are high-stakes because herniation causes irreversible injury.",
+    "Sedation choices should balance hemodynamics, neurologic examination, and ventilator synchrony.",
+]
+DISCLAIMER = "This chapter is for educational use only and must not replace clinical judgment at the bedside."
+CLINICAL_PAIRS = [
+    (
+        "Target ICP below 20 mmHg and CPP above 60 mmHg after severe traumatic brain injury.",
+        "Target ICP below 22 mmHg and CPP above 70 mmHg after severe traumatic brain injury.",
+    ),
+    (
+        "Give lorazepam 4 mg IV for convulsive status epilepticus and repeat once if seizures continue.",
+        "Give lorazepam 0.1 mg/kg IV for convulsive status epilepticus and repeat once if seizures continue.",
+    ),
+    (
+        "Hyperventilation should be used as a bridge to definitive therapy for impending herniation.",
+        "Hyperventilation should not be used as a bridge to definitive therapy for impending herniation.",
+    ),
+]
+
+
+def _paragraph(text: str, page: int) -> Paragraph:
+    return Paragraph(text=text, anchor=SourceAnchor(page=page, section="Body"), section_heading="Body")
+
+
+def _document(paragraphs) -> NormalizedDocument:
+    return NormalizedDocument("doc", "Review", "pdf", "review.pdf", list(paragraphs))
+
+
+def test_repeated_headers_and_disclaimers_are_collapsed() -> None:
+    paragraphs = []
+    for page in range(1, 13):
+        paragraphs.append(_paragraph(f"Neurocritical Care Review | Vol. 12 | Page {page} of 12", page))
+        paragraphs.append(_paragraph(f"{BODY[page % 3]} Case {page} illustrates the point.", page))
+        disclaimer = DISCLAIMER if page % 2 else DISCLAIMER.replace("bedside", "bedside today")
+        paragraphs.append(_paragraph(disclaimer, page))
+    document = _document(paragraphs)
+
+    deduped, stats = dedupe_document(document)
+
+    assert stats.paragraphs == 36
+    assert [paragraph.text for paragraph in deduped.paragraphs[:3]] == [p.text for p in paragraphs[:3]]
+    assert [paragraph.anchor.page for paragraph in deduped.paragraphs] == [1, 1, 1] + list(range(2, 13))
+    assert (stats.exact_duplicates, stats.near_duplicates) == (5, 17)
+    assert deduped.metadata["dedup"]["most_repeated"][0]["removed"] == 11
+    assert len(extract.extract_chunks(document, dedupe=True, min_chars=0)) < len(
+        extract.extract_chunks(document, min_chars=0)
+    )
+
+    distinct = ParagraphDeduplicator()
+    assert all(distinct.admit(_paragraph(text, 1)) for text in BODY)
+
+
+def test_page_counters_only_fold_when_they_follow_the_page() -> None:
+    texts = ["Page 3", "Page 4", "Page 9", "12 of 40", "13 of 40", "Step 2 of 4"]
+    deduped, stats = dedupe_document(_document(_paragraph(text, page) for page, text in enumerate(texts, start=3)))
+    assert [paragraph.text for paragraph in deduped.paragraphs] == ["Page 3", "Page 9", "12 of 40", "Step 2 of 4"]
+    assert stats.near_duplicates == 2
+
+
+@pytest.mark.parametrize("original,variant", CLINICAL_PAIRS)
+def test_paragraphs_differing_in_numbers_or_negation_are_kept(original: str, variant: str) -> None:
+    # Each page holds only the clinical statement, so both copies sit at a page edge.
+    single = _document([_paragraph(original, 1), _paragraph(variant, 2)])
+    assert [paragraph.text for paragraph in dedupe_document(single)[0].paragraphs] == [original, variant]
+
+    # Alternating copies mid-page on every page become boilerplate candidates by repetition.
+    paragraphs = []
+    for page in range(1, 9):
+        paragraphs.append(_paragraph(f"Running header page {page}", page))
+        paragraphs.append(_paragraph(original if page % 2 else variant, page))
+        paragraphs.append(_paragraph(f"{BODY[page % 3]} Case {page}.", page))
+    deduped, stats = dedupe_document(_document(paragraphs))
+    kept = [paragraph.text for paragraph in deduped.paragraphs]
+    assert kept.count(original) == kept.count(variant) == 1
+    assert stats.exact_duplicates == 6
+
+    unpaged = ParagraphDeduplicator()
+    assert unpaged.admit(Paragraph(original, SourceAnchor(paragraph=1), None))
+    assert unpaged.admit(Paragraph(variant, SourceAnchor(paragraph=2), None))
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from dataclasses import replace
+from pathlib import Path
+
+from cme_core import ingest
+from cme_core.library import LibraryRanker, library_topic_key, rank_library
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_rank_library_merges_topics_across_sources() -> None:
+    html = (ROOT / "sample_data" / "sample_article.html").read_text(encoding="utf-8")
+    document = ingest.document_from_html(html=html, url="https://example.test/sample")
+    sources = [replace(document, document_id=f"doc-{index}", title=f"Review {index}") for index in range(3)]
+
+    topics = rank_library(iter(sources), anchors_per_source=2)
+    single = LibraryRanker()
+    single.add_document(document)
+
+    assert len(topics) == single.topic_count
+    assert len({topic.label for topic in topics}) == len(topics)
+    for topic in topics:
+        assert {citation.split(" | ")[0] for citation in topic.citations} == {"Review 0", "Review 1", "Review 2"}
+        assert len(topic.anchors) == len(topic.citations) <= 2 * len(sources)
+        assert len(topic.summary_bullets) == len(set(topic.summary_bullets))
+    assert library_topic_key("Intracranial Pressure Management") == ("intracranial-pressure", "Intracranial Pressure")
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import gc
+import pickle
+from dataclasses import replace
+
+from cme_core.chunking import extract_chunks
+from cme_core.models import NormalizedDocument, Paragraph, ParagraphStore, SourceAnchor, anchor_snippet
+
+
+def test_paragraph_store_round_trips_paragraphs() -> None:
+    text = "Status epilepticus  needs benzodiazepines first. " * 6
+    paragraphs = [
+        Paragraph(
+            text=text,
+            anchor=SourceAnchor(page=1, paragraph=1, section="Seizures", snippet=anchor_snippet(text)),
+            section_heading="Seizures",
+        ),
+        Paragraph(text="Réfractaire ≥ 30 min.", anchor=SourceAnchor(paragraph=2, snippet="custom"), section_heading=None),
+    ]
+    document = NormalizedDocument("doc", "Title", "text", "ref", paragraphs)
+
+    assert isinstance(document.paragraphs, ParagraphStore)
+    assert document.paragraphs == paragraphs
+    assert [paragraph.to_dict() for paragraph in document.paragraphs] == [paragraph.to_dict() for paragraph in paragraphs]
+    assert document.text == "\n\n".join(paragraph.text for paragraph in paragraphs)
+    assert document.paragraphs.text_range(1, 5) == paragraphs[1].text
+    assert document.paragraphs.text_range(2, 1) == ""
+    assert document.paragraphs[0].text is document.paragraphs[0].text
+    assert document.paragraphs[-1].anchor.label == "Paragraph 2"
+    assert replace(document.paragraphs[1].anchor, page=4) == SourceAnchor(page=4, paragraph=2, snippet="custom")
+    assert pickle.loads(pickle.dumps(document)) == document
+    assert pickle.loads(pickle.dumps(document.paragraphs[0])) == paragraphs[0]
+
+
+def _live_stores() -> int:
+    gc.collect()
+    return sum(isinstance(obj, ParagraphStore) for obj in gc.get_objects())
+
+
+def test_paragraph_store_hands_out_plain_objects_that_do_not_pin_the_store() -> None:
+    stores_before = _live_stores()
+    text = "Intracranial pressure crises are high-stakes because herniation causes irreversible injury."
+    document = NormalizedDocument(
+        "doc", "Title", "text", "ref", [Paragraph(text, SourceAnchor(page=3, paragraph=1, snippet=text))]
+    )
+    paragraph = document.paragraphs[0]
+    chunk_anchor = extract_chunks(document, min_chars=0)[0].anchors[0]
+
+    assert type(paragraph) is Paragraph and type(paragraph.anchor) is SourceAnchor and type(chunk_anchor) is SourceAnchor
+    assert type(replace(paragraph.anchor, page=4)) is SourceAnchor
+    del document
+    assert _live_stores() == stores_before
+    assert chunk_anchor.label == "Page 3 | Paragraph 1"
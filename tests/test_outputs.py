@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import io
+import json
+from dataclasses import replace
 from pathlib import Path
 
 from cme_core import extract, ingest, outputs, rank
@@ -24,3 +27,56 @@ def test_exports_include_topic_content() -> None:
     assert "topic,priority,level,score,anchors,rationale" in csv_payload
     assert "# Sample Neurocritical Care Article" in markdown_payload
     assert "front\tback\tanchor\tcard_type" in anki_payload
+
+
+def test_sentence_index_matches_text_builders() -> None:
+    text = (ROOT / "sample_data" / "sample_chapter.txt").read_text(encoding="utf-8")
+    index = outputs.SentenceIndex.from_text(text)
+
+    full_sort = sorted(range(len(index.sentences)), key=index.rank_keys.__getitem__, reverse=True)
+    assert index.top_ranked(4) == [index.sentences[position] for position in full_sort[:4]]
+    assert outputs.build_pitfalls(index, []) == outputs.build_pitfalls(text, [])
+    assert outputs.build_key_decision_points(index, []) == outputs.build_key_decision_points(text, [])
+    assert outputs.build_summary_bullets("Sepsis", index) == outputs.build_summary_bullets("Sepsis", text)
+
+
+def test_streamed_exports_match_string_exporters() -> None:
+    html = (ROOT / "sample_data" / "sample_article.html").read_text(encoding="utf-8")
+    document = ingest.document_from_html(html=html, url="https://example.test/sample")
+    topics = rank.rank_document(document=document, chunks=extract.extract_chunks(document))
+
+    handle = io.StringIO()
+    outputs.write_export(handle, "json", document, topics)
+    assert handle.getvalue() == outputs.export_topics_json(document, topics)
+    assert json.loads(handle.getvalue()) == {
+        "document": document.to_dict(),
+        "topics": [topic.to_dict() for topic in topics],
+    }
+    streamed = b"".join(outputs.iter_export_bytes("markdown", document, topics, chunk_size=256))
+    assert streamed.decode("utf-8") == outputs.export_topics_markdown(document, topics)
+
+    slim = json.loads(outputs.export_topics_json(document, topics, include_paragraphs=False))
+    assert "paragraphs" not in slim["document"]
+
+    handle = io.StringIO()
+    outputs.write_export(handle, "ndjson", document, topics)
+    records = [json.loads(line) for line in handle.getvalue().splitlines()]
+    assert [record["record"] for record in records] == (
+        ["document"] + ["paragraph"] * len(document.paragraphs) + ["topic"] * len(topics)
+    )
+
+
+def test_streamed_json_is_byte_identical_to_json_dumps() -> None:
+    html = (ROOT / "sample_data" / "sample_article.html").read_text(encoding="utf-8")
+    sample = ingest.document_from_html(html=html, url="https://example.test/sample")
+    # Enough paragraphs to span several encoder batches.
+    document = replace(sample, paragraphs=list(sample.paragraphs) * 30)
+    topics = rank.rank_document(document=document, chunks=extract.extract_chunks(document))
+    payload = {"document": document.to_dict(), "topics": [topic.to_dict() for topic in topics]}
+
+    assert len(document.paragraphs) > 2 * 64
+    assert outputs.export_topics_json(document, topics) == json.dumps(payload, indent=2)
+    assert outputs.export_topics_jsonl(document, topics, extra={"input": "a"}) == (
+        json.dumps({"input": "a", **payload}, separators=(",", ":")) + "\n"
+    )
+    assert outputs.export_topics_json(document, []) == json.dumps({**payload, "topics": []}, indent=2)
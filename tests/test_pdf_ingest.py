@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import gc
+import hashlib
+import os
 from pathlib import Path
 
-from cme_core import extract, ingest
+from cme_core import extract, ingest, ingest_pdf
+from cme_core.cache import DiskCache, DocumentCache
 
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -17,3 +21,81 @@ def test_ingest_pdf_extracts_page_anchors() -> None:
     assert len(document.paragraphs) >= 3
     assert document.paragraphs[0].anchor.page == 1
     assert chunks[0].anchors[0].page == 1
+
+
+def test_pdf_stream_yields_paragraphs_page_by_page(chapter_pdf_bytes: bytes) -> None:
+    document = ingest.ingest_pdf_bytes(chapter_pdf_bytes, source_name="chapter.pdf")
+    stream = ingest.stream_pdf_bytes(chapter_pdf_bytes, source_name="chapter.pdf", page_window=2)
+    assert stream.page_count == 12
+    assert stream.title is None
+
+    chunks = list(extract.iter_chunks(stream, document_id=stream.document_id, source_type="pdf"))
+    assert stream.title == document.title
+    assert stream.metadata == document.metadata
+    assert [chunk.to_dict() for chunk in chunks] == [chunk.to_dict() for chunk in extract.extract_chunks(document)]
+
+
+def test_parallel_pdf_extraction_matches_serial_numbering(chapter_pdf_bytes: bytes, tmp_path: Path) -> None:
+    serial = ingest.ingest_pdf_bytes(chapter_pdf_bytes, source_name="chapter.pdf")
+    parallel = ingest.stream_pdf_bytes(chapter_pdf_bytes, source_name="chapter.pdf", page_window=3, workers=2)
+    assert parallel.to_document(list(parallel)).to_dict() == serial.to_dict()
+
+    pdf_path = tmp_path / "chapter.pdf"
+    pdf_path.write_bytes(chapter_pdf_bytes)
+    assert ingest.ingest_pdf_path(pdf_path, workers=2).to_dict() == serial.to_dict()
+
+
+def test_pdf_path_stream_closes_its_file_when_abandoned(chapter_pdf_bytes: bytes, tmp_path: Path) -> None:
+    pdf_path = tmp_path / "chapter.pdf"
+    pdf_path.write_bytes(chapter_pdf_bytes)
+
+    stream = ingest.stream_pdf_path(pdf_path)
+    handle = stream._handle
+    paragraphs = iter(stream)
+    next(paragraphs)
+    paragraphs.close()
+    assert handle.closed
+
+    stream = ingest.stream_pdf_path(pdf_path)
+    handle = stream._handle
+    del stream
+    gc.collect()
+    assert handle.closed
+
+
+def test_document_cache_skips_extraction_for_repeat_content(
+    chapter_pdf_bytes: bytes, tmp_path: Path, monkeypatch
+) -> None:
+    cache = DocumentCache(tmp_path / "documents")
+    first = ingest.ingest_pdf_bytes(chapter_pdf_bytes, source_name="chapter.pdf", cache=cache)
+    assert first.document_id == hashlib.sha1(chapter_pdf_bytes).hexdigest()[:12]
+
+    def fail_extraction(*args, **kwargs):
+        raise AssertionError("cached PDF should not be re-extracted")
+
+    monkeypatch.setattr(ingest_pdf, "PdfParagraphStream", fail_extraction)
+    repeat = ingest.ingest_pdf_bytes(chapter_pdf_bytes, source_name="renamed.pdf", cache=cache)
+    assert repeat.source_ref == "renamed.pdf"
+    assert repeat.to_dict() == {**first.to_dict(), "source_ref": "renamed.pdf"}
+
+
+def test_disk_cache_evicts_least_recently_used_entries(tmp_path: Path) -> None:
+    store = DiskCache(tmp_path, max_bytes=250)
+    for index, key in enumerate(("a", "b", "c")):
+        store.put(key, bytes(100))
+        os.utime(tmp_path / f"{key}.bin", ns=(index * 10**9, index * 10**9))
+    assert store.get("a") is None
+    assert store.get("b") is not None
+    store.put("d", bytes(100))
+    assert store.get("c") is None
+    assert store.get("b") is not None
+    assert store.size_bytes() <= 250
+
+
+def test_cache_write_failures_do_not_fail_ingestion(chapter_pdf_bytes: bytes, tmp_path: Path, monkeypatch) -> None:
+    def disk_full(self, key, payload):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(DiskCache, "put", disk_full)
+    document = ingest.ingest_pdf_bytes(chapter_pdf_bytes, source_name="chapter.pdf", cache=DocumentCache(tmp_path))
+    assert document.to_dict() == ingest.ingest_pdf_bytes(chapter_pdf_bytes, source_name="chapter.pdf").to_dict()
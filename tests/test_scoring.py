@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import json
+import os
+import re
 from pathlib import Path
 
-from cme_core import extract, ingest, rank
+from cme_core import batch_scoring, extract, ingest, rank, scoring
+from cme_core.matching import TermMatcher
 from cme_core.models import AnalysisOptions
 
 
@@ -21,3 +25,85 @@ def test_high_yield_topics_are_ranked_and_classified() -> None:
     assert labels["Status Epilepticus"].level in {"BASIC", "INTERMEDIATE", "ADVANCED"}
     assert any(topic.level == "EXPERT" for topic in topics)
     assert any(topic.priority == "HIGH" for topic in topics)
+
+
+def test_term_matcher_matches_per_term_regex_counts() -> None:
+    text = "significant if targetarget; status epilepticus if refractory status epilepticus, ifif."
+    counts = scoring.count_terms(text)
+    for term in scoring.SCORING_TERMS:
+        assert counts[term] == len(re.findall(re.escape(term), text.lower())), term
+    assert TermMatcher(["target"]).count("targetarget")["target"] == 1
+
+    bounded = scoring.count_terms(text, word_boundary=True)
+    assert bounded["if"] == 2
+    assert bounded["status epilepticus"] == 2
+
+
+def test_term_matcher_is_not_additive_when_a_term_overlaps_the_separator() -> None:
+    for term in ("icp\n", "\nicp", "\n", "a\n\nb"):
+        assert not TermMatcher([term]).is_additive_across("\n\n"), repr(term)
+    assert TermMatcher(["icp", "status epilepticus"]).is_additive_across("\n\n")
+    # "icp\n" spans the join in "icp" + "\n\n" + "x" although it never contains the whole separator.
+    parts = ["icp", "x"]
+    assert TermMatcher(["icp\n"]).count("\n\n".join(parts))["icp\n"] == 1
+
+
+def test_scoring_config_is_cached_and_reloaded_on_change(tmp_path: Path) -> None:
+    default = scoring.load_scoring_config()
+    assert scoring.load_scoring_config() is default
+    assert scoring.load_scoring_weights() == default.to_dict()
+
+    config_path = tmp_path / "scoring_config.json"
+    payload = default.to_dict()
+    config_path.write_text(json.dumps(payload), encoding="utf-8")
+    custom = scoring.load_scoring_config(config_path)
+    assert custom.content_hash == default.content_hash
+    assert scoring.load_scoring_config(config_path) is custom
+
+    payload["weights"]["rare_critical"] = 0.5
+    config_path.write_text(json.dumps(payload), encoding="utf-8")
+    os.utime(config_path, ns=(0, config_path.stat().st_mtime_ns + 1_000_000_000))
+    reloaded = scoring.load_scoring_config(config_path)
+    assert reloaded.weights["rare_critical"] == 0.5
+    assert reloaded.content_hash != default.content_hash
+
+    text = "Rare salvage ECMO is a malignant, decompressive rescue."
+    options = AnalysisOptions()
+    assert scoring.score_text(text, options, scoring_config=reloaded).total > scoring.score_text(text, options).total
+
+
+def test_batch_scoring_matches_scalar_scoring() -> None:
+    chapter = (ROOT / "sample_data" / "sample_chapter.txt").read_text(encoding="utf-8")
+    texts = [part for part in chapter.split("\n\n") if part.strip()] + [chapter, ""]
+    options = AnalysisOptions(specialty_focus="ECMO")
+    expected = [scoring.score_text(text, options) for text in texts]
+
+    assert batch_scoring.score_texts(texts, options) == expected
+    fallback = batch_scoring.TermCountMatrix.from_texts(texts, use_numpy=False)
+    scores = batch_scoring.score_matrix(fallback, options)
+    assert scores.breakdowns() == expected
+    assert scores.priorities == [scoring.priority_from_score(item.total) for item in expected]
+
+
+def test_chunk_term_counts_sum_to_merged_topic_counts() -> None:
+    html = (ROOT / "sample_data" / "sample_article.html").read_text(encoding="utf-8")
+    document = ingest.document_from_html(html=html, url="https://example.test/sample")
+    chunks = extract.extract_chunks(document)
+
+    assert all(chunk.term_counts is not None for chunk in chunks)
+    assert scoring.counts_are_additive("\n\n")
+    merged = scoring.count_terms("\n\n".join(chunk.text for chunk in chunks))
+    summed = scoring.sum_term_counts(scoring.chunk_term_counts(chunk) for chunk in chunks)
+    assert summed == {term: hits for term, hits in merged.items() if hits}
+
+
+def test_prepared_ranking_reranks_for_every_option_variant() -> None:
+    html = (ROOT / "sample_data" / "sample_article.html").read_text(encoding="utf-8")
+    document = ingest.document_from_html(html=html, url="https://example.test/sample")
+    chunks = extract.extract_chunks(document)
+    prepared = rank.prepare_ranking(chunks)
+
+    for specialty_focus in ("Neuro ICU", "General ICU", "ECMO"):
+        for desired_depth in ("boards", "attending"):
+            options = AnalysisOptions(specialty_focus=specialty_focus, desired_depth=desired_depth, max_topics=3)
+            assert rank.rerank(prepared, options) == rank.rank_chunks(chunks, options)
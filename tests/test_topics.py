@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from cme_core.models import Chunk
+from cme_core.topics import derive_topic_label, lexicon_canonical
+
+
+def _chunk(text: str, heading: str = "Overview") -> Chunk:
+    return Chunk(chunk_id="c1", document_id="d1", heading=heading, text=text, anchors=[], paragraph_count=1)
+
+
+def test_lexicon_index_returns_first_canonical_in_lexicon_order() -> None:
+    text = "sedation with propofol, then icp monitoring and later seizure control."
+    assert lexicon_canonical(text) == "Status Epilepticus"
+    assert derive_topic_label(_chunk(text)) == "Status Epilepticus"
+    assert lexicon_canonical("no lexicon terms here") is None
+
+
+def test_ngram_fallback_prefers_frequent_then_longer_phrases() -> None:
+    text = "fluid balance drives renal dosing; fluid balance and renal dosing drift; fluid balance rules."
+    assert derive_topic_label(_chunk(text)) == "Fluid Balance"
+    assert derive_topic_label(_chunk("the of and")) == "Key Topic"
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from cme_core import extract, ingest, rank
+from cme_core.tracing import PipelineTracer
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_tracer_records_stage_timings_counts_and_memory() -> None:
+    tracer = PipelineTracer(track_memory=True)
+    document = ingest.ingest_pdf_path(ROOT / "sample_data" / "sample_page.pdf", tracer=tracer)
+    chunks = extract.extract_chunks(document, tracer=tracer)
+    topics = rank.rank_document(document, chunks, tracer=tracer)
+
+    stages = json.loads(tracer.to_json())["stages"]
+    assert list(stages) == [
+        "ingest_pdf",
+        "extract_chunks",
+        "propose_topic_seeds",
+        "prepare_seeds",
+        "score_topics",
+        "build_topics",
+    ]
+    assert stages["ingest_pdf"]["counts"] == {"pages": 1, "paragraphs": len(document.paragraphs)}
+    assert stages["extract_chunks"]["counts"]["chunks"] == len(chunks)
+    assert stages["build_topics"]["counts"] == {"topics": len(topics)}
+    assert all(stage["calls"] == 1 and stage["peak_memory_bytes"] >= 0 for stage in stages.values())
@@ -1,12 +1,24 @@
 from __future__ import annotations
 
 import functools
+import random
 import http.server
 import socketserver
 import threading
+import time
 from pathlib import Path
 
-from cme_core import ingest
+import pytest
+
+from cme_core import ingest, ingest_url
+from cme_core.cache import CachedResponse, DiskCache, HttpCache
+from cme_core.ingest_url import (
+    StreamingHtmlExtractor,
+    _extract_paragraphs,
+    available_html_backends,
+    parse_html,
+    select_html_backend,
+)
 
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -28,3 +40,253 @@ def test_ingest_url_extracts_paragraph_anchors() -> None:
     assert len(document.paragraphs) >= 5
     assert document.paragraphs[0].anchor.paragraph == 1
     assert document.paragraphs[1].anchor.section == "Status Epilepticus"
+
+
+def test_ingest_urls_returns_documents_and_errors_in_order() -> None:
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=str(SAMPLE_DIR))
+    with http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler) as server:
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        urls = [f"{base}/sample_article.html", f"{base}/missing.html", f"{base}/sample_article.html?copy=2"]
+        results = ingest.ingest_urls(urls, max_concurrency=3, per_host_limit=2)
+        parsed_in_pool = ingest.ingest_urls(urls[:1], parse_workers=2)
+        server.shutdown()
+        thread.join(timeout=2)
+
+    assert [result.url for result in results] == urls
+    assert [result.ok for result in results] == [True, False, True]
+    assert "404" in results[1].error
+    assert results[2].document.source_ref == urls[2]
+    assert parsed_in_pool[0].document.paragraphs == results[0].document.paragraphs
+
+
+def test_ingest_urls_records_unexpected_errors_and_limits_each_host(monkeypatch) -> None:
+    lock = threading.Lock()
+    in_flight = {}
+    peak = {}
+
+    def fake_fetch(url, timeout=15, session=None, cache=None):
+        host = url.split("/")[2]
+        with lock:
+            in_flight[host] = in_flight.get(host, 0) + 1
+            peak[host] = max(peak.get(host, 0), in_flight[host])
+        time.sleep(0.02)
+        with lock:
+            in_flight[host] -= 1
+        return "<html><body><p>" + "Status epilepticus needs benzodiazepines first. " * 3 + "</p></body></html>"
+
+    real_document_from_html = ingest_url.document_from_html
+
+    def flaky_parse(html, url, **kwargs):
+        if url.endswith("/broken"):
+            raise ValueError("parser exploded")
+        return real_document_from_html(html, url, **kwargs)
+
+    monkeypatch.setattr(ingest_url, "fetch_html", fake_fetch)
+    monkeypatch.setattr(ingest_url, "document_from_html", flaky_parse)
+    urls = [f"https://slow.test/{index}" for index in range(6)] + ["https://other.test/broken", "https://other.test/ok"]
+    results = ingest.ingest_urls(urls, max_concurrency=4, per_host_limit=2, session=object())
+
+    assert [result.url for result in results] == urls
+    assert [result.ok for result in results] == [True] * 6 + [False, True]
+    assert results[6].error == "ValueError: parser exploded"
+    assert peak == {"slow.test": 2, "other.test": 2}
+
+
+def test_fetch_html_revalidates_cached_pages(tmp_path: Path) -> None:
+    body = (SAMPLE_DIR / "sample_article.html").read_bytes()
+    statuses = []
+
+    class ConditionalHandler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            status = 304 if self.headers.get("If-None-Match") == '"v1"' else 200
+            statuses.append(status)
+            self.send_response(status)
+            self.send_header("ETag", '"v1"')
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", "0" if status == 304 else str(len(body)))
+            self.end_headers()
+            if status == 200:
+                self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    cache = HttpCache(tmp_path, max_age=60)
+    with http.server.ThreadingHTTPServer(("127.0.0.1", 0), ConditionalHandler) as server:
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        url = f"http://127.0.0.1:{server.server_address[1]}/guideline"
+        first = ingest.fetch_html(url, cache=cache)
+        fresh = ingest.fetch_html(url, cache=cache)
+        cache.max_age = 0
+        revalidated = ingest.fetch_html(url, cache=cache)
+        server.shutdown()
+        thread.join(timeout=2)
+
+    assert first == fresh == revalidated
+    assert statuses == [200, 304]
+
+
+def test_http_cache_write_failures_are_not_fatal(tmp_path: Path, monkeypatch) -> None:
+    def read_only(self, key, payload):
+        raise OSError(30, "Read-only file system")
+
+    monkeypatch.setattr(DiskCache, "put", read_only)
+    cache = HttpCache(tmp_path)
+    entry = CachedResponse(url="https://example.test/page", text="<p>cached</p>", etag='"v1"')
+    cache.put(entry)
+    assert cache.get(entry.url) is None
+    assert cache.refresh(entry, etag='"v2"').text == entry.text
+
+
+def test_html_backends_extract_the_same_paragraphs() -> None:
+    html = (SAMPLE_DIR / "sample_article.html").read_text(encoding="utf-8")
+    reference = ingest.document_from_html(html, url="https://example.test/a", backend="html.parser")
+
+    for backend in available_html_backends():
+        document = ingest.document_from_html(html, url="https://example.test/a", backend=backend)
+        assert document.title == reference.title
+        assert document.paragraphs == reference.paragraphs
+    with pytest.raises(ValueError):
+        select_html_backend("regex")
+    assert select_html_backend() == "html.parser"
+
+
+@pytest.mark.parametrize("backend", ["lxml", "selectolax"])
+def test_optional_html_backends_match_html_parser_on_malformed_markup(backend: str) -> None:
+    line = "Status epilepticus needs benzodiazepines first and rapid escalation when seizures continue."
+    html = f"""<html><head><title>Malformed</title></head><body>
+<h2>Seizures</h2><p>Unclosed one: {line}<p>Unclosed two: {line}
+<p>Before the div: {line}<div>Inside the div: {line}</div>After the div: {line}</p>
+<ul><li>First item: {line}<li>Second item: {line}<p>Paragraph in an item: {line}</ul>
+<ol><li>Outer item: {line}<ul><li>Inner item: {line}</ul>Outer tail: {line}</ol>
+<h3>Dosing</h3><p>Last unclosed: {line}</body></html>"""
+    reference = ingest.document_from_html(html, url="https://example.test/a")
+
+    assert [paragraph.text[:20] for paragraph in reference.paragraphs] == [
+        "Unclosed one: Status",
+        "Unclosed two: Status",
+        "Before the div: Stat",
+        "First item: Status e",
+        "Second item: Status ",
+        "Paragraph in an item",
+        "Outer item: Status e",
+        "Inner item: Status e",
+        "Last unclosed: Statu",
+    ]
+    pytest.importorskip("lxml.html" if backend == "lxml" else "selectolax.lexbor")
+    document = ingest.document_from_html(html, url="https://example.test/a", backend=backend)
+    assert document.paragraphs == reference.paragraphs
+
+
+@pytest.mark.parametrize("backend", ["lxml", "selectolax"])
+def test_optional_html_backends_match_html_parser_on_noisy_markup(backend: str) -> None:
+    pytest.importorskip("lxml.html" if backend == "lxml" else "selectolax.lexbor")
+    line = "Status epilepticus needs benzodiazepines first and rapid escalation when seizures continue."
+    html = f"""<?xml version="1.0" encoding="utf-8"?><!DOCTYPE html>
+<html><head><title>Seizure Guideline</title><style>p {{ color: red }}</style></head>
+<body><!-- banner comment that is long enough to look like a paragraph of text -->
+<h2>Seizures &amp; Status</h2>
+<p>{line} <!-- reviewer note: recheck dosing before publishing --> Give lorazepam 4&nbsp;mg IV.</p>
+<?render sidebar-with-a-long-processing-instruction-payload ?>
+<p>{line}<script>var hidden = "script text that must not leak";</script> Then reassess.</p>
+<ul><li>{line}</li><li>Second item: {line}</li></ul>
+</body></html>"""
+    reference = ingest.document_from_html(html, url="https://example.test/a", backend="html.parser")
+    document = ingest.document_from_html(html, url="https://example.test/a", backend=backend)
+
+    assert document.title == reference.title == "Seizure Guideline"
+    assert document.paragraphs == reference.paragraphs
+    assert not any(noise in document.text for noise in ("reviewer note", "hidden", "sidebar", "banner"))
+
+
+def test_streaming_extractor_matches_full_parse_on_nested_blocks_at_any_chunk_boundary() -> None:
+    line = "L" * 99
+    sentence = "Status epilepticus needs benzodiazepines first. "
+    rng = random.Random(16)
+
+    def nested(depth: int = 0) -> str:
+        parts = []
+        for _ in range(rng.randint(1, 4)):
+            if depth > 3 or rng.random() < 0.35:
+                parts.append(rng.choice([sentence * rng.randint(1, 3), "Give 4&nbsp;mg IV. ", "<br>", "<!-- note -->"]))
+            else:
+                tag = rng.choice(["p", "li", "div", "ul", "h2", "section", "span", "blockquote"])
+                parts.append(f"<{tag}>{nested(depth + 1)}{'' if rng.random() < 0.2 else f'</{tag}>'}")
+        return "".join(parts)
+
+    pages = [f"<p>{line}<div>{line}</div>{line}</p><ul><li>{line}<li>{line}</ul>"]
+    pages += [f"<html><head><title>T</title></head><body>{nested()}</body></html>" for _ in range(60)]
+    for html in pages:
+        reference = _extract_paragraphs(parse_html(html, "html.parser"))
+        extractor = StreamingHtmlExtractor()
+        streamed, position = [], 0
+        while position < len(html):
+            step = rng.randint(1, 40)
+            streamed += extractor.feed(html[position : position + step])
+            position += step
+        streamed += extractor.close()
+        assert streamed == reference, html
+    # HTML5 implied closes: the <div> ends the <p>, and each <li> ends the one before it.
+    assert [len(paragraph.text) for paragraph in _extract_paragraphs(parse_html(pages[0], "html.parser"))] == [99, 99, 99]
+
+
+def test_streaming_extractor_matches_full_parse_and_honours_limits() -> None:
+    html = (SAMPLE_DIR / "sample_article.html").read_text(encoding="utf-8")
+    extractor = StreamingHtmlExtractor()
+    streamed = [paragraph for start in range(0, len(html), 17) for paragraph in extractor.feed(html[start : start + 17])]
+    streamed += extractor.close()
+    reference = ingest.document_from_html(html, url="https://example.test/a", backend="html.parser")
+    assert streamed == reference.paragraphs
+    assert extractor.title == reference.title
+
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=str(SAMPLE_DIR))
+    with socketserver.TCPServer(("127.0.0.1", 0), handler) as server:
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        url = f"http://127.0.0.1:{server.server_address[1]}/sample_article.html"
+        capped = ingest.stream_url(url, max_paragraphs=2)
+        capped_paragraphs = list(capped)
+        budgeted = ingest.stream_url(url, max_bytes=900)
+        budgeted_paragraphs = list(budgeted)
+        server.shutdown()
+        thread.join(timeout=2)
+
+    assert capped_paragraphs == reference.paragraphs[:2]
+    assert capped.to_document(capped_paragraphs).title == reference.title
+    assert budgeted.truncated and budgeted.bytes_read == 900
+    # The element cut off by the byte budget is yielded with the text read so far.
+    *complete, partial = budgeted_paragraphs
+    assert complete == reference.paragraphs[: len(complete)]
+    assert reference.paragraphs[len(complete)].text.startswith(partial.text)
+
+
+def test_stream_url_emits_unclosed_paragraphs_incrementally(tmp_path: Path) -> None:
+    sentence = "intracranial pressure rises when the cerebral perfusion pressure falls below target"
+    body = "".join(f"<p>Paragraph {index}: {sentence}." for index in range(300))
+    html = f"<html><head><title>Unclosed</title></head><body><h2>ICP</h2>{body}</body></html>"
+    (tmp_path / "unclosed.html").write_text(html, encoding="utf-8")
+    reference = ingest.document_from_html(html, url="https://example.test/unclosed")
+    assert len(reference.paragraphs) == 300
+
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=str(tmp_path))
+    with socketserver.TCPServer(("127.0.0.1", 0), handler) as server:
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        url = f"http://127.0.0.1:{server.server_address[1]}/unclosed.html"
+        full = list(ingest.stream_url(url))
+        halved = ingest.stream_url(url, max_bytes=len(html) // 2)
+        halved_paragraphs = list(halved)
+        capped = ingest_url.HtmlParagraphStream(url, max_paragraphs=5, chunk_size=1024)
+        capped_paragraphs = list(capped)
+        server.shutdown()
+        thread.join(timeout=2)
+
+    assert full == reference.paragraphs
+    assert halved.truncated and 140 < len(halved_paragraphs) < 160
+    assert halved_paragraphs[:-1] == reference.paragraphs[: len(halved_paragraphs) - 1]
+    assert reference.paragraphs[len(halved_paragraphs) - 1].text.startswith(halved_paragraphs[-1].text)
+    assert capped_paragraphs == reference.paragraphs[:5]
+    assert capped.bytes_read == 1024